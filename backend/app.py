@@ -3,31 +3,154 @@ Fun-ASR 语音识别批量处理系统 - 后端主应用
 """
 import os
 import sys
-from flask import Flask, request, jsonify, send_from_directory
+import json
+import time
+import signal
+import _thread
+import argparse
+import threading
+from typing import Optional
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 
 # 添加项目根目录到 Python 路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.asr_engine import get_asr_engine, get_device_status
+from backend.asr_engine import get_device_status
+from backend.model_registry import get_model_registry
 from backend.audio_processor import AudioProcessor
-from backend.result_exporter import ResultExporter
-from backend.utils.config import FLASK_CONFIG, OUTPUT_DIR
+from backend.folder_scanner import start_scan_session, get_scan_session
+from backend.result_exporter import ResultExporter, check_formats
+from backend.job_store import get_job_store
+from backend.job_manager import get_job_manager
+from backend.progress_events import progress_events
+from backend.readiness import readiness
+from backend.streaming_asr import streaming_sessions
+from backend.transcription_cache import get_transcription_cache
+from backend.metrics import metrics
+from backend.utils.config import FLASK_CONFIG, SERVER_CONFIG, OUTPUT_DIR, JOB_CONFIG, PROGRESS_CONFIG, SCAN_CONFIG, STREAMING_CONFIG, ASR_MODEL_CONFIG, CACHE_CONFIG
 
 # 创建 Flask 应用
 app = Flask(__name__, static_folder='../frontend', static_url_path='')
 CORS(app)  # 允许跨域请求
+# 服务器是否边接收边把请求体交给应用（/api/stream/recognize 依赖此特性）；
+# waitress 会先读完整个请求体（包括分块传输）再调用应用，生产模式下关闭
+app.config['STREAMING_REQUEST_BODY'] = True
 
-# 全局变量存储处理状态
-processing_state = {
-    "is_processing": False,
-    "current_index": 0,
-    "total": 0,
-    "results": [],
-    "current_file": "",
-    "device": "cpu",  # 当前使用的设备
-    "speaker_diarization": False,  # 是否启用说话人分离
-}
+def _cache_hit_ratio():
+    if not CACHE_CONFIG['enabled']:
+        return None
+    manager = get_job_manager()
+    lookups = manager.cache_hits + manager.cache_misses
+    return round(manager.cache_hits / lookups, 4) if lookups else 0
+
+
+def _cache_lookup_metrics():
+    if not CACHE_CONFIG['enabled']:
+        return None
+    manager = get_job_manager()
+    return [({"result": "hit"}, manager.cache_hits), ({"result": "miss"}, manager.cache_misses)]
+
+
+def _cache_size_metrics():
+    cache = get_transcription_cache()
+    return int(cache.stats()["size_mb"] * 1024 * 1024) if cache is not None else None
+
+
+def _register_metrics():
+    """
+    注册 /metrics 输出时实时采集的指标
+
+    多进程识别时模型加载和缓存查询都在识别子进程中，模型指标由 JobManager 汇总各子进程上报的状态，
+    缓存命中率按识别任务返回结果的 cached 字段统计
+    """
+    metrics.register_gauge("asr_queue_depth", "所有执行中的任务尚未识别的文件数", lambda: get_job_manager().queue_depth())
+    metrics.register_gauge("asr_processing", "正在执行的任务数", lambda: len(get_job_manager().active()))
+    metrics.register_gauge("asr_model_loads", "各识别进程的模型池累计加载流水线次数", lambda: get_job_manager().model_stats()["load_count"])
+    metrics.register_gauge("asr_model_evictions", "各识别进程的模型池累计卸载流水线次数", lambda: get_job_manager().model_stats()["eviction_count"])
+    metrics.register_gauge("asr_models_loaded", "各识别进程已加载的流水线数", lambda: len(get_job_manager().model_stats()["pipelines"]))
+    metrics.register_gauge("asr_model_memory_bytes", "已加载流水线的参数内存（字节）", lambda: [
+        ({"device": p["device"], "speaker_diarization": p["speaker_diarization"], "pid": p["pid"]}, int(p["memory_mb"] * 1024 * 1024))
+        for p in get_job_manager().model_stats()["pipelines"]
+    ])
+    metrics.register_gauge("asr_cache_hit_ratio", "识别任务的结果缓存命中率", _cache_hit_ratio)
+    metrics.register_gauge("asr_cache_lookups", "识别任务的结果缓存查询次数", _cache_lookup_metrics)
+    metrics.register_gauge("asr_cache_size_bytes", "识别结果缓存大小（字节）", _cache_size_metrics)
+    metrics.register_gauge("asr_progress_subscribers", "进度推送订阅数", lambda: progress_events.subscriber_count)
+    metrics.register_gauge("asr_ready", "模型是否已加载完成（1 就绪，0 未就绪）", lambda: int(readiness.ready))
+
+
+_register_metrics()
+
+
+def resume_interrupted_jobs():
+    """恢复服务重启前未完成的任务"""
+    job_ids = get_job_store().get_resumable_jobs()
+    if job_ids:
+        print(f"恢复 {len(job_ids)} 个未完成的任务: {', '.join(job_ids)}")
+    for job_id in job_ids:
+        try:
+            get_job_manager().submit(job_id)
+        except (ValueError, RuntimeError):
+            pass
+
+
+def _parse_progress_args():
+    """
+    解析进度查询参数
+
+    Returns:
+        (since, limit)，参数无效时返回 None
+    """
+    try:
+        since = max(0, int(request.args.get('since', 0)))
+        limit = int(request.args.get('limit', PROGRESS_CONFIG['page_size']))
+    except ValueError:
+        return None
+    return since, max(0, min(limit, PROGRESS_CONFIG['max_page_size']))
+
+
+def _parse_job_options(data: dict, export_default: bool = False) -> dict:
+    """
+    解析创建任务的公共参数
+
+    Args:
+        data: 请求体
+        export_default: 未提供 export_on_complete 时是否自动导出
+
+    Returns:
+        {"device", "speaker_diarization", "export_dir", "export_formats", "priority"}
+
+    Raises:
+        ValueError: 参数无效
+        ImportError: 导出格式缺少依赖
+    """
+    export_dir = None
+    if data.get('export_on_complete', export_default):
+        export_dir = data.get('output_dir') or OUTPUT_DIR
+    export_formats = data.get('export_formats')
+    priority = data.get('priority', JOB_CONFIG['default_priority'])
+
+    if not isinstance(priority, int) or not 1 <= priority <= JOB_CONFIG['max_priority']:
+        raise ValueError(f"priority 必须是 1 到 {JOB_CONFIG['max_priority']} 之间的整数")
+
+    if export_dir and export_formats:
+        export_formats = check_formats(export_formats)
+
+    return {
+        "device": data.get('device', 'cpu'),  # 默认使用 CPU
+        "speaker_diarization": data.get('speaker_diarization', False),  # 默认不启用说话人分离
+        "export_dir": export_dir,
+        "export_formats": export_formats,
+        "priority": priority,
+    }
+
+
+def _job_not_found():
+    return jsonify({
+        "success": False,
+        "error": "任务不存在"
+    }), 404
 
 
 @app.route('/')
@@ -43,7 +166,8 @@ def scan_folder():
 
     请求体:
     {
-        "folder_path": "/path/to/audio/folder"
+        "folder_path": "/path/to/audio/folder",
+        "stream": false  // 可选，为 true 时在后台扫描，通过 /api/scan-folder/<scan_id> 分页读取
     }
 
     返回:
@@ -52,6 +176,17 @@ def scan_folder():
         "files": [...],
         "count": 10
     }
+
+    stream 为 true 时返回:
+    {
+        "success": true,
+        "scan_id": "...",
+        "files": [],
+        "count": 0,
+        "next_index": 0,
+        "has_more": false,
+        "done": false
+    }
     """
     try:
         data = request.get_json()
@@ -63,6 +198,19 @@ def scan_folder():
                 "error": "请提供文件夹路径"
             }), 400
 
+        if data.get('stream', False):
+            if not os.path.isdir(folder_path):
+                return jsonify({
+                    "success": False,
+                    "error": f"文件夹不存在: {folder_path}"
+                }), 404
+
+            session = start_scan_session(folder_path)
+            return jsonify({
+                "success": True,
+                **session.page(0)
+            })
+
         # 扫描文件夹
         files = AudioProcessor.scan_folder(folder_path)
 
@@ -89,6 +237,50 @@ def scan_folder():
         }), 500
 
 
+@app.route('/api/scan-folder/<scan_id>', methods=['GET'])
+def scan_folder_page(scan_id):
+    """
+    分页读取后台扫描结果
+
+    查询参数:
+        since: 结果游标（默认 0）
+        limit: 本页最多返回的文件数（默认 SCAN_CONFIG['page_size']）
+
+    返回:
+    {
+        "success": true,
+        "scan_id": "...",
+        "files": [...],
+        "count": 1200,
+        "since": 500,
+        "next_index": 1000,
+        "has_more": true,
+        "done": false,
+        "error": null
+    }
+    """
+    session = get_scan_session(scan_id)
+    if session is None:
+        return jsonify({
+            "success": False,
+            "error": "扫描会话不存在"
+        }), 404
+
+    try:
+        since = max(0, int(request.args.get('since', 0)))
+        limit = max(1, int(request.args.get('limit', SCAN_CONFIG['page_size'])))
+    except ValueError:
+        return jsonify({
+            "success": False,
+            "error": "since 和 limit 必须是整数"
+        }), 400
+
+    return jsonify({
+        "success": session.error is None,
+        **session.page(since, limit)
+    })
+
+
 @app.route('/api/start-recognition', methods=['POST'])
 def start_recognition():
     """
@@ -101,22 +293,25 @@ def start_recognition():
             {"path": "/path/to/audio2.wav", ...}
         ],
         "device": "cpu",  // 可选，"cpu" 或 "cuda"，默认 "cpu"
-        "speaker_diarization": false  // 可选，是否启用说话人分离，默认 false
+        "speaker_diarization": false,  // 可选，是否启用说话人分离，默认 false
+        "export_on_complete": false,  // 可选，每个文件识别完成后立即导出，任务结束时生成汇总
+        "export_formats": ["markdown", "jsonl"],  // 可选，自动导出的格式，默认 EXPORT_CONFIG['formats']
+        "output_dir": "/custom/output/path",  // 可选，自动导出的目录，默认使用配置的输出目录
+        "priority": 1  // 可选，优先级（权重），多个任务同时执行时按权重分配识别资源，默认 1
     }
 
+    多个任务可以同时执行，共享识别工作池；进度、停止、导出使用 /api/jobs/<job_id>/... 接口
+
     返回:
     {
         "success": true,
+        "job_id": "3f2a9c1b7d4e",
         "message": "开始批量识别"
     }
     """
-    global processing_state
-
     try:
         data = request.get_json()
         files = data.get('files', [])
-        device = data.get('device', 'cpu')  # 默认使用 CPU
-        speaker_diarization = data.get('speaker_diarization', False)  # 默认不启用说话人分离
 
         if not files:
             return jsonify({
@@ -124,68 +319,42 @@ def start_recognition():
                 "error": "没有提供音频文件"
             }), 400
 
-        if processing_state["is_processing"]:
+        try:
+            options = _parse_job_options(data)
+        except (ValueError, ImportError) as e:
             return jsonify({
                 "success": False,
-                "error": "已有任务在处理中"
+                "error": str(e)
             }), 400
 
-        # 重置处理状态
-        processing_state.update({
-            "is_processing": True,
-            "current_index": 0,
-            "total": len(files),
-            "results": [],
-            "current_file": "",
-            "device": device,
-            "speaker_diarization": speaker_diarization,
-        })
+        if not get_job_manager().accepting:
+            return jsonify({
+                "success": False,
+                "error": "服务正在关闭，暂不接受新任务"
+            }), 503
 
-        # 获取音频文件路径列表
+        # 获取音频文件路径列表并持久化为任务
         audio_paths = [f["path"] for f in files]
+        job_id = get_job_store().create_job(audio_paths, **options)
 
-        # 在后台线程中处理
-        def process_batch():
-            global processing_state
-            asr_engine = get_asr_engine(device=device, enable_speaker_diarization=speaker_diarization)
-
-            for i, audio_path in enumerate(audio_paths):
-                if not processing_state["is_processing"]:
-                    # 被中断
-                    break
-
-                processing_state["current_index"] = i
-                processing_state["current_file"] = os.path.basename(audio_path)
-
-                # 识别单个文件
-                result = asr_engine.transcribe(audio_path)
-                processing_state["results"].append(result)
-
-                # 更新文件状态
-                for f in files:
-                    if f["path"] == audio_path:
-                        f["status"] = "completed" if result["success"] else "failed"
-                        f["result"] = result
-                        break
-
-            # 处理完成
-            processing_state["is_processing"] = False
-            processing_state["current_index"] = len(audio_paths)
-
-        # 启动后台线程
-        import threading
-        thread = threading.Thread(target=process_batch)
-        thread.daemon = True
-        thread.start()
+        try:
+            get_job_manager().submit(job_id)
+        except RuntimeError as e:
+            get_job_store().set_job_status(job_id, "stopped")
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 503
 
-        speaker_info = " + 说话人分离" if speaker_diarization else ""
+        speaker_info = " + 说话人分离" if options["speaker_diarization"] else ""
         return jsonify({
             "success": True,
-            "message": f"开始识别 {len(files)} 个音频文件 (使用 {device.upper()}{speaker_info})"
+            "job_id": job_id,
+            "export_dir": options["export_dir"],
+            "message": f"开始识别 {len(files)} 个音频文件 (使用 {options['device'].upper()}{speaker_info})"
         })
 
     except Exception as e:
-        processing_state["is_processing"] = False
         return jsonify({
             "success": False,
             "error": f"启动识别失败: {str(e)}"
@@ -195,42 +364,113 @@ def start_recognition():
 @app.route('/api/progress', methods=['GET'])
 def get_progress():
     """
-    获取识别进度
+    获取最近提交的任务的识别进度（增量），同 /api/jobs/<job_id>/progress
+    只返回计数信息和序号不小于 since 的结果，轮询开销不随批次大小增长
+
+    查询参数:
+        since: 结果游标，返回 results[since:]（默认 0）
+        limit: 本次最多返回的结果数（默认 PROGRESS_CONFIG['page_size']，0 表示只返回计数）
 
     返回:
     {
         "is_processing": true,
         "current_index": 5,
         "total": 10,
-        "current_file": "audio5.wav",
-        "results": [...]
+        "current_file": "audio5.wav 等 2 个文件",  // 正在识别的文件（同一组的文件一起识别）
+        "current_files": ["audio5.wav", "audio6.wav"],
+        "completed_count": 5,
+        "job_id": "3f2a9c1b7d4e",
+        "status": "running",
+        "priority": 1,
+        "queued_count": 3,  // 尚未提交识别的文件数
+        "audio_duration": 3600.0,
+        "processed_duration": 1800.0,
+        "elapsed": 120.5,
+        "rtf": 0.067,
+        "eta_seconds": 120,
+        "export": {"output_dir": "...", "exported_count": 5, "summary_path": null},  // 未启用自动导出时为 null
+        "results": [...],
+        "since": 3,
+        "next_index": 5,
+        "has_more": false
     }
     """
-    return jsonify(processing_state)
+    args = _parse_progress_args()
+    if args is None:
+        return jsonify({
+            "success": False,
+            "error": "since 和 limit 必须是整数"
+        }), 400
+
+    run = get_job_manager().latest()
+    if run is None:
+        return jsonify({
+            "is_processing": False,
+            "current_index": 0,
+            "total": 0,
+            "completed_count": 0,
+            "job_id": None,
+            "results": [],
+            "since": args[0],
+            "next_index": args[0],
+            "has_more": False,
+        })
+
+    return jsonify(run.progress(*args))
+
+
+@app.route('/api/progress/stream', methods=['GET'])
+def progress_stream():
+    """
+    识别进度推送（Server-Sent Events）
+
+    查询参数:
+        job_id: 只推送该任务的事件（默认推送所有任务）
+
+    事件类型:
+        connected   连接建立，客户端应通过 /api/progress 补拉错过的结果
+        job_start   任务开始 {"job_id", "total", "completed_count"}
+        file_start  文件开始处理，组内每个文件一次 {"job_id", "current_index", "total", "file", "current_file"}
+        file_done   文件识别成功 {"job_id", "index", "total", "result"}
+        file_error  文件识别失败 {"job_id", "index", "total", "result"}
+        job_done    任务结束 {"job_id", "status", "total", "completed_count"}
+        idle        所有任务处理完毕
+    """
+    response = Response(
+        stream_with_context(progress_events.subscribe(job_id=request.args.get('job_id') or None)),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @app.route('/api/export-results', methods=['POST'])
 def export_results():
     """
-    导出识别结果到 Markdown 文件
+    导出识别结果
 
     请求体:
     {
         "results": [...],
-        "output_dir": "/custom/output/path"  // 可选
+        "output_dir": "/custom/output/path",  // 可选
+        "formats": ["markdown", "srt", "vtt", "jsonl", "parquet"]  // 可选，默认 EXPORT_CONFIG['formats']
     }
 
     返回:
     {
         "success": true,
-        "exported_count": 10,
-        "summary_path": "/path/to/summary.md"
+        "exported_count": 10,  // 第一个格式导出的结果数
+        "counts": {"markdown": 10, "jsonl": 10},
+        "summary_path": "/path/to/summary.md",  // 仅导出 markdown 时生成
+        "paths": {"jsonl": "/path/to/results.jsonl"}
     }
     """
     try:
         data = request.get_json()
         results = data.get('results', [])
         output_dir = data.get('output_dir', OUTPUT_DIR)
+        formats = data.get('formats')
 
         if not results:
             return jsonify({
@@ -238,44 +478,480 @@ def export_results():
                 "error": "没有可导出的结果"
             }), 400
 
-        # 批量导出
-        exporter = ResultExporter()
-        output_paths = exporter.export_batch(results, output_dir)
+        if formats:
+            try:
+                formats = check_formats(formats)
+            except (ValueError, ImportError) as e:
+                return jsonify({
+                    "success": False,
+                    "error": str(e)
+                }), 400
+
+        start_time = time.time()
 
-        # 创建汇总文件
-        summary_path = exporter.create_summary(results, output_dir)
+        # 按格式导出（含汇总文件）
+        exported = ResultExporter.export(results, output_dir, formats)
 
+        export_time = time.time() - start_time
+        metrics.observe("asr_export_seconds", export_time, "单次导出请求耗时（秒）")
+
+        return jsonify({
+            "success": True,
+            **exported
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"导出失败: {str(e)}"
+        }), 500
+
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """
+    列出最近的批量识别任务
+
+    返回:
+    {
+        "success": true,
+        "jobs": [{"job_id": "...", "status": "completed", "total": 10, ...}]
+    }
+    """
+    try:
         return jsonify({
             "success": True,
-            "exported_count": len(output_paths),
-            "summary_path": summary_path,
-            "output_dir": output_dir
+            "jobs": get_job_store().list_jobs()
         })
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"获取任务列表失败: {str(e)}"
+        }), 500
+
+
+@app.route('/api/jobs', methods=['POST'])
+def create_folder_job():
+    """
+    创建文件夹任务：扫描、识别、导出全部在后台完成，文件列表和结果不经过客户端
+
+    请求体:
+    {
+        "folder_path": "/path/to/audio/folder",
+        "filters": {  // 可选
+            "extensions": [".wav", ".mp3"],
+            "include": ["2024-*/*"],  // 相对路径通配符，匹配其中之一才识别
+            "exclude": ["*/tmp/*"],
+            "min_duration": 1.0,  // 秒，时长未知的文件不按时长筛选
+            "max_duration": 7200,
+            "min_size_mb": 0.01,
+            "max_size_mb": 500
+        },
+        "device": "cpu",
+        "speaker_diarization": false,
+        "export_on_complete": true,  // 可选，默认 true
+        "export_formats": ["markdown", "jsonl"],
+        "output_dir": "/custom/output/path",
+        "priority": 1
+    }
+
+    进度、停止、继续、导出同 /api/jobs/<job_id>/... 接口；扫描过程中 total 会逐步增加，扫描结束前进度中 scanning 为 true
+
+    返回:
+    {
+        "success": true,
+        "job_id": "3f2a9c1b7d4e",
+        "export_dir": "/path/to/outputs",
+        "message": "开始处理文件夹 ..."
+    }
+    """
+    try:
+        data = request.get_json()
+        folder_path = (data.get('folder_path') or '').strip()
+
+        if not folder_path:
+            return jsonify({
+                "success": False,
+                "error": "请提供文件夹路径"
+            }), 400
+
+        try:
+            options = _parse_job_options(data, export_default=True)
+            run = get_job_manager().submit_folder(folder_path, data.get('filters'), **options)
+        except FileNotFoundError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 404
+        except (ValueError, ImportError) as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        except RuntimeError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 503
+
+        return jsonify({
+            "success": True,
+            "job_id": run.job_id,
+            "export_dir": options["export_dir"],
+            "message": f"开始处理文件夹 {folder_path} (使用 {options['device'].upper()})"
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"创建任务失败: {str(e)}"
+        }), 500
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    获取任务详情
+
+    返回:
+    {
+        "success": true,
+        "job": {"job_id": "...", "status": "running", "counts": {"completed": 5, "pending": 5}, ...}
+    }
+    """
+    job = get_job_store().get_job(job_id)
+    if job is None:
+        return jsonify({
+            "success": False,
+            "error": "任务不存在"
+        }), 404
+
+    # 执行中的任务以内存中的文件表为准（包含识别中的文件）
+    for run in get_job_manager().active():
+        if run.job_id == job_id:
+            job["counts"] = run.items.counts()
+            break
+
+    return jsonify({
+        "success": True,
+        "job": job
+    })
+
+
+@app.route('/api/jobs/<job_id>/resume', methods=['POST'])
+def resume_job(job_id):
+    """
+    继续执行任务：跳过已完成的文件，重新识别待处理和失败的文件
+
+    返回:
+    {
+        "success": true,
+        "message": "继续执行任务 ..."
+    }
+    """
+    try:
+        get_job_manager().submit(job_id)
+    except KeyError:
+        return _job_not_found()
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    except RuntimeError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 503
+
+    return jsonify({
+        "success": True,
+        "job_id": job_id,
+        "message": f"继续执行任务 {job_id}"
+    })
+
+
+@app.route('/api/jobs/<job_id>/progress', methods=['GET'])
+def job_progress(job_id):
+    """
+    获取任务的识别进度（增量），查询参数和返回格式同 /api/progress
+    """
+    args = _parse_progress_args()
+    if args is None:
+        return jsonify({
+            "success": False,
+            "error": "since 和 limit 必须是整数"
+        }), 400
+
+    run = get_job_manager().get(job_id)
+    if run is None:
+        return _job_not_found()
+
+    return jsonify(run.progress(*args))
+
+
+@app.route('/api/jobs/<job_id>/stop', methods=['POST'])
+def stop_job(job_id):
+    """
+    停止任务：不再提交新的文件，已在识别的文件完成后任务结束，之后可通过 resume 继续
+
+    返回:
+    {
+        "success": true,
+        "message": "任务 ... 已停止"
+    }
+    """
+    manager = get_job_manager()
+    if manager.get(job_id) is None:
+        return _job_not_found()
+
+    if not manager.stop(job_id):
+        return jsonify({
+            "success": False,
+            "error": "任务未在执行"
+        }), 400
+
+    return jsonify({
+        "success": True,
+        "job_id": job_id,
+        "message": f"任务 {job_id} 已停止"
+    })
+
+
+@app.route('/api/jobs/<job_id>/export', methods=['POST'])
+def export_job(job_id):
+    """
+    导出任务的识别结果（结果从服务端读取，无需上传）
+
+    请求体（可选）:
+    {
+        "output_dir": "/custom/output/path",
+        "formats": ["markdown", "jsonl"]
+    }
+
+    返回格式同 /api/export-results
+    """
+    run = get_job_manager().get(job_id)
+    if run is None:
+        return _job_not_found()
+
+    data = request.get_json(silent=True) or {}
+    output_dir = data.get('output_dir', OUTPUT_DIR)
+    formats = data.get('formats')
+
+    results = run.items.results()
+    if not results:
+        return jsonify({
+            "success": False,
+            "error": "没有可导出的结果"
+        }), 400
+
+    try:
+        if formats:
+            formats = check_formats(formats)
 
+        start_time = time.time()
+        exported = ResultExporter.export(results, output_dir, formats)
+        metrics.observe("asr_export_seconds", time.time() - start_time, "单次导出请求耗时（秒）")
+    except (ValueError, ImportError) as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             "success": False,
             "error": f"导出失败: {str(e)}"
         }), 500
 
+    return jsonify({
+        "success": True,
+        "job_id": job_id,
+        **exported
+    })
+
+
+@app.route('/api/stream/start', methods=['POST'])
+def stream_start():
+    """
+    创建流式识别会话
+
+    请求体:
+    {
+        "device": "cpu"  // 可选，"cpu" 或 "cuda"
+    }
+
+    返回:
+    {
+        "success": true,
+        "session_id": "...",
+        "sample_rate": 16000,
+        "format": "pcm_s16le",
+        "chunk_ms": 600
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        session = streaming_sessions.create(device=data.get('device', 'cpu'))
+
+        return jsonify({
+            "success": True,
+            "session_id": session.session_id,
+            "sample_rate": STREAMING_CONFIG['sample_rate'],
+            "format": "pcm_s16le",
+            "chunk_ms": session.engine.chunk_samples * 1000 // STREAMING_CONFIG['sample_rate'],
+        })
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"创建流式识别会话失败: {str(e)}"
+        }), 500
+
+
+@app.route('/api/stream/<session_id>/chunk', methods=['POST'])
+def stream_chunk(session_id):
+    """
+    上传一段音频（请求体为 16kHz 单声道 16 位小端 PCM 原始字节）
+
+    返回:
+    {
+        "success": true,
+        "events": [
+            {"type": "partial", "text": "今天天气"},
+            {"type": "final", "text": "今天天气不错。", "start": 120, "end": 2400}
+        ]
+    }
+    """
+    session = streaming_sessions.get(session_id)
+    if session is None:
+        return jsonify({
+            "success": False,
+            "error": "流式识别会话不存在或已过期"
+        }), 404
+
+    try:
+        with session.lock:
+            events = session.feed(request.get_data())
+        return jsonify({
+            "success": True,
+            "events": events
+        })
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"流式识别失败: {str(e)}"
+        }), 500
+
+
+@app.route('/api/stream/<session_id>/finish', methods=['POST'])
+def stream_finish(session_id):
+    """
+    结束流式识别会话，返回最后的事件和完整文本
+
+    返回:
+    {
+        "success": true,
+        "events": [...],
+        "text": "完整文本",
+        "sentences": [{"text": "...", "start": 0, "end": 2400}]
+    }
+    """
+    session = streaming_sessions.get(session_id)
+    if session is None:
+        return jsonify({
+            "success": False,
+            "error": "流式识别会话不存在或已过期"
+        }), 404
+
+    try:
+        with session.lock:
+            events = session.finish()
+        return jsonify({
+            "success": True,
+            "events": events,
+            "text": session.text,
+            "sentences": session.sentences
+        })
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"流式识别失败: {str(e)}"
+        }), 500
+    finally:
+        streaming_sessions.close(session_id)
+
+
+@app.route('/api/stream/recognize', methods=['POST'])
+def stream_recognize():
+    """
+    单请求流式识别：以分块传输（Transfer-Encoding: chunked）上传 PCM 音频，
+    响应为逐行 JSON（NDJSON），边读取边返回识别事件
+
+    仅在开发模式（Flask 服务器）下可用：生产模式的 waitress 要等请求体上传完毕才调用应用，
+    无法边上传边返回结果，此时返回 501，请改用 /api/stream/start + /api/stream/<session_id>/chunk
+
+    查询参数:
+        device: 可选，"cpu" 或 "cuda"
+    """
+    if not app.config['STREAMING_REQUEST_BODY']:
+        return jsonify({
+            "success": False,
+            "error": "当前服务器不支持边上传边识别，请使用 /api/stream/start 和 /api/stream/<session_id>/chunk"
+        }), 501
+
+    try:
+        session = streaming_sessions.create(device=request.args.get('device', 'cpu'))
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"创建流式识别会话失败: {str(e)}"
+        }), 500
+
+    read_size = session.engine.chunk_samples * 2
+
+    def generate():
+        try:
+            while True:
+                data = request.stream.read(read_size)
+                if not data:
+                    break
+                for event in session.feed(data):
+                    yield json.dumps(event, ensure_ascii=False) + "\n"
+
+            for event in session.finish():
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+            yield json.dumps({"type": "end", "text": session.text}, ensure_ascii=False) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "error": str(e)}, ensure_ascii=False) + "\n"
+        finally:
+            streaming_sessions.close(session.session_id)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 
 @app.route('/api/model-status', methods=['GET'])
 def model_status():
     """
-    检查模型状态
+    检查模型状态（只读取本进程的模型池，不会触发模型加载；
+    多进程识别时模型加载在工作池的子进程中，以 readiness 为准）
 
     返回:
     {
         "loaded": true,
-        "model_name": "paraformer-zh"
+        "model_name": "paraformer-zh",
+        "device": "cpu",
+        "pipelines": [{"device": "cpu", "speaker_diarization": false, "memory_mb": 880.2, ...}]
     }
     """
     try:
-        asr_engine = get_asr_engine()
+        registry = get_model_registry()
+        asr_engine = registry.peek()
         return jsonify({
-            "loaded": asr_engine.is_loaded,
-            "model_name": "paraformer-zh",
-            "device": asr_engine._device
+            "loaded": asr_engine is not None and asr_engine.is_loaded,
+            "model_name": ASR_MODEL_CONFIG['model_name'],
+            "device": asr_engine._device if asr_engine is not None else None,
+            "pipelines": registry.loaded(),
+            "readiness": readiness.snapshot()
         })
     except Exception as e:
         return jsonify({
@@ -284,19 +960,61 @@ def model_status():
         }), 500
 
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    运行指标（Prometheus 文本格式）
+
+    包含各阶段耗时直方图（asr_stage_seconds{stage="decode|vad|asr|punc|spk_embedding|spk_cluster|export|..."}）、
+    单文件耗时、模型加载耗时与次数、队列深度、缓存命中率和进程内存
+    """
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.route('/api/health', methods=['GET'])
+def health():
+    """存活检查：进程能处理请求即返回 200（不等待模型加载）"""
+    return jsonify({
+        "status": "ok",
+        "uptime": readiness.snapshot()["uptime"]
+    })
+
+
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """
+    就绪检查：模型加载完成返回 200，加载中或加载失败返回 503
+
+    返回:
+    {
+        "ready": true,
+        "state": "ready",  // starting, loading, ready, failed
+        "error": null,
+        "uptime": 12.3,
+        "load_seconds": 10.8
+    }
+    """
+    snapshot = readiness.snapshot()
+    return jsonify(snapshot), 200 if snapshot["ready"] else 503
+
+
 @app.route('/api/device-status', methods=['GET'])
 def device_status():
     """
     获取设备状态
 
+    模型加载期间不导入 torch（避免请求等待导入完成），cuda_available 为 null，客户端稍后重试。
+
     返回:
     {
         "cuda_available": false,
-        "current_device": "cpu"
+        "current_device": "cpu",
+        "model_state": "ready"
     }
     """
     try:
-        status = get_device_status()
+        status = get_device_status(import_torch=not readiness.loading)
+        status["model_state"] = readiness.state
         return jsonify(status)
     except Exception as e:
         return jsonify({
@@ -309,7 +1027,7 @@ def device_status():
 @app.route('/api/stop-recognition', methods=['POST'])
 def stop_recognition():
     """
-    停止当前的识别任务
+    停止最近提交的识别任务，同 /api/jobs/<job_id>/stop
 
     返回:
     {
@@ -317,9 +1035,9 @@ def stop_recognition():
         "message": "识别任务已停止"
     }
     """
-    global processing_state
-
-    processing_state["is_processing"] = False
+    run = get_job_manager().latest()
+    if run is not None:
+        get_job_manager().stop(run.job_id)
 
     return jsonify({
         "success": True,
@@ -327,32 +1045,141 @@ def stop_recognition():
     })
 
 
-def main():
-    """启动服务器"""
+def _preload_model():
+    """
+    后台加载默认识别模型（首次导入 funasr / torch 也在这里完成）
+    多进程识别时在工作池的各子进程中加载，服务进程本身不保留一份用不到的模型
+    """
+    try:
+        print("\n正在后台预加载模型...")
+        workers = get_job_manager().warm_up()
+        print(f"模型加载完成（{workers} 个识别进程）！服务已就绪（启动后 {readiness.snapshot()['uptime']:.1f} 秒）\n")
+    except Exception as e:
+        print(f"警告: 模型加载失败 - {e}")
+        print("请确保已安装 funasr: pip install funasr\n")
+        raise
+
+
+def prepare_server():
+    """
+    服务开始监听后的准备：在后台线程加载模型，恢复中断的任务（每个服务进程调用一次）
+
+    模型加载完成前页面和查询接口照常响应，提交的任务在加载完成后开始识别，就绪状态见 /api/ready。
+    """
+    # 先开始加载：恢复的任务等待加载完成后再调度
+    readiness.start(_preload_model)
+
+    if JOB_CONFIG['resume_on_startup']:
+        resume_interrupted_jobs()
+
+
+def serve(host: str, port: int, threads: Optional[int] = None) -> int:
+    """
+    生产模式：waitress 多线程 WSGI 服务
+
+    任务、进度推送和流式识别会话都保存在本进程内，因此只运行一个服务进程，
+    并发请求由线程处理，识别计算由工作池的多个进程完成。
+    waitress 会先读完请求体再调用应用，因此单请求流式识别（/api/stream/recognize）在此模式下不可用。
+    收到 SIGTERM / SIGINT 后不再接受新任务，等待执行中的任务完成（最长 SERVER_CONFIG['drain_timeout_s'] 秒）再退出；
+    再次收到信号时立即退出。
+
+    Args:
+        host: 监听地址
+        port: 监听端口
+        threads: 请求处理线程数（默认使用 SERVER_CONFIG['threads']）
+
+    Returns:
+        退出码：0 任务全部完成后退出，1 等待超时（未完成的任务下次启动时继续）或再次收到信号立即退出
+    """
+    try:
+        from waitress import create_server
+    except ImportError:
+        print("警告: 未安装 waitress（pip install waitress），改用 Flask 内置服务器")
+        prepare_server()
+        app.run(host=host, port=port, debug=False, threaded=True)
+        return 0
+
+    # waitress 读完整个请求体后才调用应用，单请求流式识别无法实时返回
+    app.config['STREAMING_REQUEST_BODY'] = False
+
+    # 先绑定端口再加载模型，启动后立即可以访问页面
+    server = create_server(
+        app,
+        host=host,
+        port=port,
+        threads=threads or SERVER_CONFIG['threads'],
+        connection_limit=SERVER_CONFIG['connection_limit'],
+    )
+    prepare_server()
+    draining = threading.Event()
+    drained = threading.Event()
+    exit_code = 1
+
+    def drain_and_exit():
+        nonlocal exit_code
+        print(f"正在等待执行中的任务完成（最长 {SERVER_CONFIG['drain_timeout_s']} 秒）...")
+        if get_job_manager().drain(SERVER_CONFIG['drain_timeout_s']):
+            print("所有任务已完成")
+            exit_code = 0
+        else:
+            print("未完成的任务将在下次启动时继续")
+        # 由主线程的信号处理函数停止服务循环（waitress 捕获 SystemExit 后关闭请求线程）
+        drained.set()
+        _thread.interrupt_main()
+
+    def handle_signal(signum, frame):
+        if drained.is_set():
+            raise SystemExit(exit_code)
+        if draining.is_set():
+            raise SystemExit(1)
+        draining.set()
+        threading.Thread(target=drain_and_exit, daemon=True).start()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    server.run()
+    print("服务已停止")
+    return exit_code if drained.is_set() else 1
+
+
+def main(argv=None) -> int:
+    """
+    启动服务器
+
+    Returns:
+        退出码（见 serve）
+    """
+    parser = argparse.ArgumentParser(description="Fun-ASR 语音识别批量处理系统")
+    parser.add_argument("--dev", action="store_true", help="使用 Flask 开发服务器（FLASK_CONFIG['debug'] 时启用调试和自动重载）")
+    parser.add_argument("--host", default=FLASK_CONFIG['host'], help="监听地址")
+    parser.add_argument("--port", type=int, default=FLASK_CONFIG['port'], help="监听端口")
+    parser.add_argument("--threads", type=int, help="请求处理线程数（生产模式）")
+    args = parser.parse_args(argv)
+
     print("=" * 50)
     print("Fun-ASR 语音识别批量处理系统")
     print("=" * 50)
-    print(f"服务器地址: http://{FLASK_CONFIG['host']}:{FLASK_CONFIG['port']}")
+    print(f"服务器地址: http://{args.host}:{args.port}")
     print(f"输出目录: {OUTPUT_DIR}")
+    print(f"运行模式: {'开发' if args.dev else '生产'}")
     print("=" * 50)
 
-    # 预加载模型
-    try:
-        print("\n正在预加载模型...")
-        get_asr_engine()
-        print("模型加载完成！\n")
-    except Exception as e:
-        print(f"警告: 模型加载失败 - {e}")
-        print("请确保已安装 funasr: pip install funasr\n")
+    if not args.dev:
+        return serve(args.host, args.port, args.threads)
+
+    # 开发模式：自动重载时父进程只负责监视文件，模型和任务只在重载子进程中加载
+    if not FLASK_CONFIG['debug'] or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        prepare_server()
 
-    # 启动 Flask 服务器
     app.run(
-        host=FLASK_CONFIG['host'],
-        port=FLASK_CONFIG['port'],
+        host=args.host,
+        port=args.port,
         debug=FLASK_CONFIG['debug'],
         threaded=FLASK_CONFIG['threaded']
     )
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
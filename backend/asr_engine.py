@@ -3,56 +3,116 @@ ASR 引擎模块
 封装 Fun-ASR 模型进行语音识别
 """
 import os
+import sys
 import time
-from typing import Optional, Dict, Any
-from threading import Lock
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Tuple
 
-try:
-    from funasr import AutoModel
-except ImportError:
-    AutoModel = None
-    print("警告: funasr 未安装，请运行: pip install funasr")
+from backend.utils.config import BATCH_CONFIG, ASR_MODEL_CONFIG, MODEL_LOAD_CONFIG
+from backend.transcription_cache import get_transcription_cache
+from backend.model_components import get_model_components, get_auto_model
+from backend.audio_probe import probe_audio
+from backend.metrics import metrics
+
+# 长音频模式下，窗口末尾这段时间内仍在持续的语音视为未结束，留到下一个窗口处理
+_WINDOW_TAIL_MS = 300
+
+# 当前线程正在统计的分阶段耗时（见 _collect_timings）
+_stage_context = threading.local()
+
+
+@contextmanager
+def _collect_timings(timings: Dict[str, float]):
+    """在此范围内，经过计时包装的子模型调用把耗时累加到 timings"""
+    previous = getattr(_stage_context, "timings", None)
+    _stage_context.timings = timings
+    try:
+        yield timings
+    finally:
+        _stage_context.timings = previous
+
+
+def _add_timing(timings: Optional[Dict[str, float]], stage: str, seconds: float):
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def _instrument_pipeline(pipeline):
+    """
+    为流水线加上分阶段计时
+
+    generate 内部对 VAD、ASR、标点和说话人嵌入的调用都经过 pipeline.inference，按传入的子模型区分阶段；
+    说话人聚类直接调用 cb_model。只有处于 _collect_timings 范围内的调用才会计时。
+    """
+    # 说话人流水线是 base 的浅拷贝，会复制 base 的包装，需要重新包装自身
+    if pipeline.__dict__.get("_instrumented_for") is not pipeline:
+        original = type(pipeline).inference
+
+        def timed_inference(*args, **kwargs):
+            timings = getattr(_stage_context, "timings", None)
+            if timings is None:
+                return original(pipeline, *args, **kwargs)
+
+            model = kwargs.get("model")
+            stage = "asr"
+            if model is not None:
+                if model is getattr(pipeline, "vad_model", None):
+                    stage = "vad"
+                elif model is getattr(pipeline, "punc_model", None):
+                    stage = "punc"
+                elif model is getattr(pipeline, "spk_model", None):
+                    stage = "spk_embedding"
+
+            start_time = time.time()
+            try:
+                return original(pipeline, *args, **kwargs)
+            finally:
+                _add_timing(timings, stage, time.time() - start_time)
+
+        pipeline.inference = timed_inference
+        pipeline._instrumented_for = pipeline
+
+    cb_model = getattr(pipeline, "cb_model", None)
+    if cb_model is not None and not getattr(cb_model, "_instrumented", False):
+        forward = cb_model.forward
+
+        def timed_forward(*args, **kwargs):
+            start_time = time.time()
+            try:
+                return forward(*args, **kwargs)
+            finally:
+                _add_timing(getattr(_stage_context, "timings", None), "spk_cluster", time.time() - start_time)
+
+        cb_model.forward = timed_forward
+        cb_model._instrumented = True
+
+
+def _round_timings(timings: Dict[str, float]) -> Dict[str, float]:
+    return {stage: round(seconds, 3) for stage, seconds in timings.items()}
 
 
 class ASREngine:
     """Fun-ASR 语音识别引擎"""
 
-    _instance = None
-    _lock = Lock()
     _model = None
     _device = "cpu"  # 默认使用 CPU
 
-    def __new__(cls, device="cpu", enable_speaker_diarization=False):
-        """
-        单例模式，确保模型只加载一次
-
-        Args:
-            device: 设备类型，"cpu" 或 "cuda"
-            enable_speaker_diarization: 是否启用说话人分离
-        """
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._device = device
-                    cls._instance._enable_speaker_diarization = enable_speaker_diarization
-        return cls._instance
-
     def __init__(self, device="cpu", enable_speaker_diarization=False):
         """
-        初始化 ASR 引擎
+        初始化 ASR 引擎并加载模型
+        同一进程内的多个配置由模型池（ModelRegistry）统一管理，请通过 get_asr_engine 获取
 
         Args:
             device: 设备类型，"cpu" 或 "cuda"
             enable_speaker_diarization: 是否启用说话人分离
         """
+        self._device = device
         self._enable_speaker_diarization = enable_speaker_diarization
-        # 如果设备改变了或模型未加载，重新加载模型
-        if not hasattr(self, '_initialized') or self._device != device or getattr(self, '_speaker_enabled', False) != enable_speaker_diarization:
-            self._device = device
-            self._load_model()
-            self._initialized = True
-            self._speaker_enabled = enable_speaker_diarization
+        self._speaker_enabled = enable_speaker_diarization
+        self.loaded_at = None
+        self.component_keys = ()
+        self._load_model()
 
     @property
     def _current_device(self):
@@ -66,8 +126,7 @@ class ASREngine:
 
     def _load_model(self):
         """加载 Fun-ASR 模型"""
-        if AutoModel is None:
-            raise RuntimeError("funasr 库未安装，请先安装: pip install funasr")
+        get_auto_model()  # funasr 未安装时直接报错
 
         speaker_info = " + 说话人分离" if self._enable_speaker_diarization else ""
         print(f"正在加载 Fun-ASR 模型 (设备: {self._device}{speaker_info})...")
@@ -85,24 +144,13 @@ class ASREngine:
                     print("警告: PyTorch 未安装 CUDA 支持，切换到 CPU 模式")
                     self._device = "cpu"
 
-            # 加载模型（首次运行会自动下载）
-            model_kwargs = {
-                "model": "paraformer-zh",  # 中文语音识别
-                "vad_model": "fsmn-vad",   # 语音活动检测
-                "punc_model": "ct-punc",   # 标点恢复
-                "disable_update": True,    # 禁用自动更新
-            }
-
-            # 添加说话人分离模型
-            if self._enable_speaker_diarization:
-                model_kwargs["spk_model"] = "cam++"
-
-            # 只有在设备是 cuda 且可用时才添加 device 参数
-            if self._device == "cuda":
-                model_kwargs["device"] = "cuda"
-
-            self._model = AutoModel(**model_kwargs)
+            # 由共享的子模型组合流水线（首次运行会自动下载模型）
+            components = get_model_components()
+            self._model = components.compose(self._device, self._enable_speaker_diarization)
+            _instrument_pipeline(self._model)
+            self.component_keys = components.component_keys(self._device, self._enable_speaker_diarization)
             self._current_device = self._device
+            self.loaded_at = time.time()
 
             load_time = time.time() - start_time
             print(f"模型加载完成 (使用 {self._device.upper()}{speaker_info}), 耗时: {load_time:.2f} 秒")
@@ -111,6 +159,40 @@ class ASREngine:
             print(f"模型加载失败: {e}")
             raise
 
+        if MODEL_LOAD_CONFIG['warmup']:
+            self._warm_up()
+
+    def _warm_up(self):
+        """
+        预热：用一段合成音频依次调用 VAD、识别和标点模型
+
+        首次推理时的算子初始化、内存分配等开销在加载阶段完成，不计入第一个文件的识别耗时。
+        预热失败不影响识别。
+        """
+        import numpy as np
+
+        start_time = time.time()
+        try:
+            seconds = max(0.1, MODEL_LOAD_CONFIG['warmup_seconds'])
+            # 固定种子的噪声，结果可复现；不经过缓存和分阶段耗时统计
+            speech = (np.random.default_rng(0).standard_normal(int(16000 * seconds)) * 0.1).astype(np.float32)
+            if getattr(self._model, "vad_model", None) is not None:
+                self._detect_segments(speech)
+            self._model.inference(
+                [speech],
+                model=self._model.model,
+                kwargs=dict(self._model.kwargs),
+                batch_size=1,
+            )
+            self._punctuate("预热", "warmup")
+        except Exception as e:
+            print(f"模型预热失败（不影响识别）: {e}")
+            return
+
+        warmup_time = time.time() - start_time
+        metrics.observe("asr_model_warmup_seconds", warmup_time, "模型预热耗时（秒）", device=self._device)
+        print(f"模型预热完成, 耗时: {warmup_time:.2f} 秒")
+
     def transcribe(
         self,
         audio_path: str,
@@ -132,16 +214,45 @@ class ASREngine:
         if self._model is None:
             raise RuntimeError("模型未加载")
 
+        if self._supports_long_audio() and self._is_long_audio(audio_path):
+            return self.transcribe_long(audio_path)
+
+        cache_key, cached = self._cache_lookup(audio_path, "pipeline")
+        if cached is not None:
+            return cached
+
+        return self._generate(audio_path, audio_path, cache_key)
+
+    def _generate(
+        self,
+        audio_path: str,
+        audio_input,
+        cache_key: Optional[str],
+        decode_time: float = 0.0
+    ) -> Dict[str, Any]:
+        """
+        调用完整流水线识别一个文件
+
+        Args:
+            audio_path: 音频文件路径（写入结果）
+            audio_input: 传给模型的输入，文件路径或已解码的 16kHz float32 采样
+            cache_key: 结果缓存键
+            decode_time: 预先解码花费的时间（秒）
+        """
         start_time = time.time()
+        timings = {"decode": decode_time} if decode_time else {}
 
         try:
             # 调用模型进行识别
-            result = self._model.generate(
-                input=audio_path,
-                batch_size_s=300,
-            )
+            with _collect_timings(timings):
+                result = self._model.generate(
+                    input=audio_input,
+                    batch_size_s=300,
+                )
 
             process_time = time.time() - start_time
+            # generate 内部按路径解码、句子对齐等未单独计时的部分
+            timings["other"] = max(0.0, process_time + decode_time - sum(timings.values()))
 
             # 解析结果
             if result and len(result) > 0:
@@ -152,6 +263,7 @@ class ASREngine:
                     "text": text,
                     "audio_path": audio_path,
                     "process_time": round(process_time, 2),
+                    "timings": _round_timings(timings),
                     "speaker_diarization_enabled": self._enable_speaker_diarization,
                 }
 
@@ -176,6 +288,7 @@ class ASREngine:
                     response["speaker_count"] = len(unique_speakers)
                     response["speakers"] = list(unique_speakers)
 
+                self._cache_store(cache_key, response)
                 return response
             else:
                 return {
@@ -195,10 +308,532 @@ class ASREngine:
                 "error": str(e)
             }
 
+    def transcribe_batch(
+        self,
+        audio_paths: list,
+        batch_size_s: Optional[int] = None
+    ) -> list:
+        """
+        跨文件批量识别
+
+        先对每个文件做 VAD 切分，再把多个文件的语音片段按时长排序、
+        打包成总时长不超过 batch_size_s 的批次送入模型，最后按文件拼回结果。
+        每攒够 BATCH_CONFIG['buffered_files'] 个文件的片段就推理一次，推理期间后台继续解码后面的文件。
+        短音频较多时可以显著减少模型调用次数。启用说话人分离时逐个文件识别，
+        超长音频单独走分窗口识别（见 transcribe_long）。
+
+        Args:
+            audio_paths: 音频文件路径列表
+            batch_size_s: 每批次的音频总时长上限（秒，按补齐后的长度计算）
+
+        Returns:
+            识别结果列表，与 audio_paths 一一对应，格式同 transcribe
+        """
+        if self._model is None:
+            raise RuntimeError("模型未加载")
+
+        if self._enable_speaker_diarization or getattr(self._model, "vad_model", None) is None:
+            return self._transcribe_each(audio_paths)
+
+        from backend.audio_processor import AudioPrefetcher
+
+        if batch_size_s is None:
+            batch_size_s = BATCH_CONFIG['batch_size_s']
+        batch_size_ms = batch_size_s * 1000
+        sample_rate = 16000
+        samples_per_ms = sample_rate // 1000
+
+        results = [None] * len(audio_paths)
+        cache_keys = [None] * len(audio_paths)
+        file_times = [0.0] * len(audio_paths)
+        file_timings = [{} for _ in audio_paths]
+        file_texts = [[] for _ in audio_paths]
+        file_spans = [[] for _ in audio_paths]  # 与 file_texts 对应的片段起止时间 (beg_ms, end_ms)
+        segments = []  # (时长ms, 文件索引, 片段序号, 采样)
+
+        # 1. 查缓存，超长音频单独分窗口识别
+        pending = []
+        for i, audio_path in enumerate(audio_paths):
+            start_time = time.time()
+            try:
+                if not os.path.exists(audio_path):
+                    raise FileNotFoundError(f"音频文件不存在: {audio_path}")
+
+                if self._is_long_audio(audio_path):
+                    results[i] = self.transcribe_long(audio_path)
+                else:
+                    cache_keys[i], results[i] = self._cache_lookup(audio_path, "segments")
+                    if results[i] is None:
+                        pending.append(i)
+            except Exception as e:
+                results[i] = {
+                    "success": False,
+                    "text": "",
+                    "audio_path": audio_path,
+                    "process_time": 0,
+                    "error": str(e)
+                }
+            file_times[i] += time.time() - start_time
+
+        # 2. 解码（后台预取）+ VAD 切分；已切分的文件攒够 buffered_files 个就先推理，
+        #    推理期间预取线程继续解码后面的文件，同时持有的解码结果有上限
+        max_buffered = max(1, BATCH_CONFIG['buffered_files'])
+        buffered = set()  # 片段尚未推理的文件索引
+        prefetcher = AudioPrefetcher([audio_paths[i] for i in pending], sample_rate)
+        for i, (audio_path, speech, decode_error, decode_time) in zip(pending, prefetcher):
+            start_time = time.time()
+            file_timings[i]["decode"] = decode_time
+            try:
+                if decode_error is not None:
+                    raise decode_error
+
+                vad_segments = self._detect_segments(speech)
+                file_timings[i]["vad"] = time.time() - start_time
+
+                for beg_ms, end_ms in vad_segments:
+                    segment = speech[int(beg_ms * samples_per_ms):int(end_ms * samples_per_ms)]
+                    if len(segment) > 0:
+                        segments.append((end_ms - beg_ms, i, len(file_texts[i]), segment))
+                        file_texts[i].append("")
+                        file_spans[i].append((beg_ms, end_ms))
+                        buffered.add(i)
+
+            except Exception as e:
+                results[i] = {
+                    "success": False,
+                    "text": "",
+                    "audio_path": audio_path,
+                    "process_time": round(time.time() - start_time, 2),
+                    "error": str(e)
+                }
+            file_times[i] += time.time() - start_time
+            del speech
+
+            if len(buffered) >= max_buffered:
+                self._infer_segments(segments, batch_size_ms, audio_paths, results, file_times, file_timings, file_texts)
+                segments = []
+                buffered.clear()
+
+        # 3. 剩余片段
+        self._infer_segments(segments, batch_size_ms, audio_paths, results, file_times, file_timings, file_texts)
+
+        # 4. 拼接文本并恢复标点
+        for i, audio_path in enumerate(audio_paths):
+            if results[i] is not None:
+                results[i]["process_time"] = round(file_times[i], 2)
+                continue
+
+            start_time = time.time()
+            text = self._join_texts(file_texts[i])
+
+            if not text:
+                results[i] = {
+                    "success": False,
+                    "text": "",
+                    "audio_path": audio_path,
+                    "process_time": round(file_times[i], 2),
+                    "error": "未识别到语音内容"
+                }
+                continue
+
+            text = self._punctuate(text, audio_path)
+            file_timings[i]["punc"] = time.time() - start_time
+
+            # 与 transcribe_long 一致的句子级时间戳（毫秒），供字幕导出使用
+            sentences = [
+                {"text": piece.strip(), "start": beg_ms, "end": end_ms}
+                for (beg_ms, end_ms), piece in zip(file_spans[i], file_texts[i])
+                if piece.strip()
+            ]
+
+            file_times[i] += time.time() - start_time
+            results[i] = {
+                "success": True,
+                "text": text,
+                "audio_path": audio_path,
+                "process_time": round(file_times[i], 2),
+                "timings": _round_timings(file_timings[i]),
+                "sentences": sentences,
+                "speaker_diarization_enabled": False,
+            }
+            self._cache_store(cache_keys[i], results[i])
+
+        return results
+
+    def _infer_segments(
+        self,
+        segments: list,
+        batch_size_ms: int,
+        audio_paths: list,
+        results: list,
+        file_times: list,
+        file_timings: list,
+        file_texts: list
+    ):
+        """
+        把多个文件的语音片段按时长降序打包成批次推理，识别文本写回 file_texts
+
+        Args:
+            segments: [(时长ms, 文件索引, 片段序号, 采样), ...]
+            batch_size_ms: 每批次的音频总时长上限（毫秒，按补齐后的长度计算）
+            其余参数为 transcribe_batch 中按文件索引记录的结果、耗时和文本，原地更新
+        """
+        # 批次代价 = 最长片段 × 片段数
+        segments.sort(key=lambda s: s[0], reverse=True)
+        batches = []
+        for segment in segments:
+            if batches:
+                batch = batches[-1]
+                if batch[0][0] * (len(batch) + 1) <= batch_size_ms:
+                    batch.append(segment)
+                    continue
+            batches.append([segment])
+
+        for batch in batches:
+            start_time = time.time()
+            try:
+                batch_result = self._model.inference(
+                    [segment[3] for segment in batch],
+                    model=self._model.model,
+                    kwargs=dict(self._model.kwargs),
+                    batch_size=len(batch),
+                )
+                error = None
+            except Exception as e:
+                batch_result, error = [], e
+
+            batch_time = time.time() - start_time
+            batch_duration = sum(segment[0] for segment in batch) or 1
+
+            for k, (duration_ms, i, j, _) in enumerate(batch):
+                # 按片段时长分摊本批次耗时
+                file_times[i] += batch_time * duration_ms / batch_duration
+                _add_timing(file_timings[i], "asr", batch_time * duration_ms / batch_duration)
+                if results[i] is not None:
+                    continue
+                if error is not None:
+                    results[i] = {
+                        "success": False,
+                        "text": "",
+                        "audio_path": audio_paths[i],
+                        "process_time": 0,
+                        "error": str(error)
+                    }
+                elif k < len(batch_result):
+                    file_texts[i][j] = batch_result[k].get("text", "")
+
+    def _transcribe_each(self, audio_paths: list) -> list:
+        """
+        逐个文件调用完整流水线（说话人分离等无法跨文件打包的情况）
+        未命中缓存的文件在后台提前解码，模型直接使用解码好的采样
+        """
+        from backend.audio_processor import AudioPrefetcher
+
+        results = [None] * len(audio_paths)
+        cache_keys = [None] * len(audio_paths)
+        pending = []
+
+        for i, audio_path in enumerate(audio_paths):
+            if not os.path.exists(audio_path):
+                results[i] = {
+                    "success": False,
+                    "text": "",
+                    "audio_path": audio_path,
+                    "process_time": 0,
+                    "error": f"音频文件不存在: {audio_path}"
+                }
+                continue
+
+            if self._supports_long_audio() and self._is_long_audio(audio_path):
+                results[i] = self.transcribe_long(audio_path)
+                continue
+
+            cache_keys[i], results[i] = self._cache_lookup(audio_path, "pipeline")
+            if results[i] is None:
+                pending.append(i)
+
+        prefetcher = AudioPrefetcher([audio_paths[i] for i in pending])
+        for i, (audio_path, speech, decode_error, decode_time) in zip(pending, prefetcher):
+            # 解码失败时交给模型按路径读取，保持原有的错误信息
+            audio_input = speech if decode_error is None else audio_path
+            results[i] = self._generate(audio_path, audio_input, cache_keys[i], decode_time)
+
+        return results
+
+    def transcribe_long(
+        self,
+        audio_path: str,
+        window_s: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        分窗口识别长音频，内存占用只与窗口大小有关
+
+        每次解码 window_s 秒音频并做 VAD，已结束的语音片段立即识别；
+        延伸到窗口末尾的片段拼到下一个窗口重新切分，避免句子在窗口边界被截断。
+        说话人聚类需要整段音频，因此不支持说话人分离。
+
+        Args:
+            audio_path: 音频文件路径
+            window_s: 窗口时长（秒，默认使用 BATCH_CONFIG['chunk_size']）
+
+        Returns:
+            识别结果字典，格式同 transcribe，另含按片段划分的 sentences（start/end 为毫秒）
+        """
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"音频文件不存在: {audio_path}")
+
+        if not self._supports_long_audio():
+            raise RuntimeError("长音频模式需要 VAD 模型且不支持说话人分离")
+
+        cache_key, cached = self._cache_lookup(audio_path, "segments")
+        if cached is not None:
+            return cached
+
+        import numpy as np
+        from backend.audio_processor import AudioProcessor
+
+        if window_s is None:
+            window_s = BATCH_CONFIG['chunk_size']
+        sample_rate = 16000
+        samples_per_ms = sample_rate // 1000
+        max_speech_ms = 2 * window_s * 1000
+
+        start_time = time.time()
+        timings = {}
+        texts = []
+        sentences = []
+        carry = None  # 上一个窗口中尚未结束的语音
+        carry_start_ms = 0
+        decoded_samples = 0
+
+        try:
+            windows = AudioProcessor.iter_audio_windows(audio_path, window_s, sample_rate)
+            while True:
+                decode_start = time.time()
+                window = next(windows, None)
+                _add_timing(timings, "decode", time.time() - decode_start)
+                if window is None:
+                    break
+
+                if carry is not None:
+                    speech = np.concatenate([carry, window])
+                    base_ms = carry_start_ms
+                else:
+                    speech = window
+                    base_ms = decoded_samples // samples_per_ms
+                decoded_samples += len(window)
+
+                with _collect_timings(timings):
+                    segments = self._detect_segments(speech)
+                speech_ms = len(speech) // samples_per_ms
+                carry = None
+
+                # 持续超过两个窗口的语音不再等待，直接在窗口边界切开
+                if segments and segments[-1][1] >= speech_ms - _WINDOW_TAIL_MS and speech_ms < max_speech_ms:
+                    beg_ms = segments.pop()[0]
+                    carry = speech[int(beg_ms * samples_per_ms):]
+                    carry_start_ms = base_ms + beg_ms
+
+                with _collect_timings(timings):
+                    self._transcribe_window(speech, segments, base_ms, texts, sentences, audio_path, samples_per_ms)
+
+            if carry is not None:
+                with _collect_timings(timings):
+                    self._transcribe_window(
+                        carry, self._detect_segments(carry), carry_start_ms, texts, sentences, audio_path, samples_per_ms
+                    )
+
+        except Exception as e:
+            return {
+                "success": False,
+                "text": "",
+                "audio_path": audio_path,
+                "process_time": round(time.time() - start_time, 2),
+                "error": str(e)
+            }
+
+        text = self._join_texts(texts)
+        if not text:
+            return {
+                "success": False,
+                "text": "",
+                "audio_path": audio_path,
+                "process_time": round(time.time() - start_time, 2),
+                "error": "未识别到语音内容"
+            }
+
+        response = {
+            "success": True,
+            "text": text,
+            "audio_path": audio_path,
+            "process_time": round(time.time() - start_time, 2),
+            "timings": _round_timings(timings),
+            "speaker_diarization_enabled": False,
+            "sentences": sentences,
+        }
+        self._cache_store(cache_key, response)
+        return response
+
+    def _transcribe_window(
+        self,
+        speech,
+        segments: list,
+        base_ms: int,
+        texts: list,
+        sentences: list,
+        audio_path: str,
+        samples_per_ms: int
+    ):
+        """
+        识别一个窗口内已结束的语音片段，标点恢复后追加到 texts，片段时间戳追加到 sentences
+
+        Args:
+            speech: 窗口采样
+            segments: 窗口内的 VAD 片段 [[开始ms, 结束ms], ...]
+            base_ms: 窗口起点在整段音频中的位置（毫秒）
+            samples_per_ms: 每毫秒的采样数（采样率 / 1000）
+        """
+        pieces = []
+        for beg_ms, end_ms in segments:
+            segment = speech[int(beg_ms * samples_per_ms):int(end_ms * samples_per_ms)]
+            if len(segment) > 0:
+                pieces.append((beg_ms, end_ms, segment))
+        if not pieces:
+            return
+
+        result = self._model.inference(
+            [piece[2] for piece in pieces],
+            model=self._model.model,
+            kwargs=dict(self._model.kwargs),
+            batch_size=len(pieces),
+        )
+
+        window_texts = []
+        for (beg_ms, end_ms, _), item in zip(pieces, result or []):
+            text = item.get("text", "").strip()
+            if not text:
+                continue
+            window_texts.append(text)
+            sentences.append({
+                "text": text,
+                "start": base_ms + beg_ms,
+                "end": base_ms + end_ms,
+            })
+
+        text = self._join_texts(window_texts)
+        if text:
+            texts.append(self._punctuate(text, audio_path))
+
+    def _detect_segments(self, speech) -> list:
+        """对一段采样做 VAD，返回 [[开始ms, 结束ms], ...]"""
+        if len(speech) == 0:
+            return []
+        vad_result = self._model.inference(
+            speech,
+            model=self._model.vad_model,
+            kwargs=dict(self._model.vad_kwargs),
+        )
+        return [list(segment) for segment in (vad_result[0].get("value", []) if vad_result else [])]
+
+    def _punctuate(self, text: str, audio_path: str) -> str:
+        """恢复标点，失败时返回原文"""
+        try:
+            if getattr(self._model, "punc_model", None) is not None:
+                punc_result = self._model.inference(
+                    text,
+                    model=self._model.punc_model,
+                    kwargs=dict(self._model.punc_kwargs),
+                )
+                if punc_result:
+                    text = punc_result[0].get("text", text)
+        except Exception as e:
+            print(f"标点恢复失败 {audio_path}: {e}")
+        return text
+
+    def _supports_long_audio(self) -> bool:
+        """长音频模式需要单独调用 VAD，且说话人聚类需要整段音频"""
+        return not self._enable_speaker_diarization and getattr(self._model, "vad_model", None) is not None
+
+    @staticmethod
+    def _is_long_audio(audio_path: str) -> bool:
+        """时长是否超过 BATCH_CONFIG['long_audio_threshold_s']"""
+        threshold = BATCH_CONFIG['long_audio_threshold_s']
+        if not threshold:
+            return False
+
+        info = probe_audio(audio_path)
+        return info is not None and info["duration"] > threshold
+
+    def model_signature(self) -> Dict[str, Any]:
+        """当前流水线的模型配置（模型组合 + 设备），作为结果缓存键的一部分"""
+        return {
+            "model": ASR_MODEL_CONFIG['model_name'],
+            "vad_model": ASR_MODEL_CONFIG['vad_model'],
+            "punc_model": ASR_MODEL_CONFIG['punc_model'],
+            "spk_model": ASR_MODEL_CONFIG['spk_model'] if self._enable_speaker_diarization else None,
+            "device": self._device,
+        }
+
+    def _cache_lookup(self, audio_path: str, variant: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        查询结果缓存
+
+        Args:
+            audio_path: 音频文件路径
+            variant: 结果的生成方式，"pipeline"（完整流水线 generate，无说话人分离时不含 sentences）
+                或 "segments"（按 VAD 片段识别，含片段级 sentences）；两种结果格式不同，分别缓存
+
+        Returns:
+            (缓存键, 命中的识别结果)，未启用缓存或未命中时结果为 None
+        """
+        cache = get_transcription_cache()
+        if cache is None:
+            return None, None
+
+        start_time = time.time()
+        try:
+            cache_key = cache.make_key(audio_path, {**self.model_signature(), "variant": variant})
+            cached = cache.get(cache_key)
+        except Exception as e:
+            print(f"读取识别缓存失败 {audio_path}: {e}")
+            return None, None
+
+        if cached is not None:
+            # 相同内容可能来自不同路径
+            cached["audio_path"] = audio_path
+            cached["cached"] = True
+            cached["timings"] = {"cache": round(time.time() - start_time, 3)}
+        return cache_key, cached
+
+    def _cache_store(self, cache_key: Optional[str], result: Dict[str, Any]):
+        """只缓存识别成功的结果，失败可能是临时错误"""
+        cache = get_transcription_cache()
+        if cache is None or cache_key is None or not result.get("success"):
+            return
+
+        try:
+            cache.put(cache_key, result)
+        except Exception as e:
+            print(f"写入识别缓存失败 {result.get('audio_path')}: {e}")
+
+    @staticmethod
+    def _join_texts(texts: list) -> str:
+        """拼接片段文本，仅在两侧都是英文/数字时插入空格"""
+        joined = ""
+        for text in texts:
+            text = text.strip()
+            if not text:
+                continue
+            if joined and joined[-1].isascii() and joined[-1].isalnum() and text[0].isascii() and text[0].isalnum():
+                joined += " "
+            joined += text
+        return joined
+
     def batch_transcribe(
         self,
         audio_paths: list,
-        callback=None
+        callback=None,
+        max_workers: Optional[int] = None
     ) -> list:
         """
         批量识别音频文件
@@ -206,19 +841,35 @@ class ASREngine:
         Args:
             audio_paths: 音频文件路径列表
             callback: 进度回调函数 callback(current, total, result)
+            max_workers: 并行进程数（默认使用 BATCH_CONFIG['max_workers']，1 表示在当前进程中逐个识别）
 
         Returns:
             识别结果列表
         """
+        from backend.worker_pool import ASRWorkerPool
+
+        if max_workers is None:
+            max_workers = BATCH_CONFIG['max_workers']
+
         results = []
         total = len(audio_paths)
 
-        for i, audio_path in enumerate(audio_paths):
-            result = self.transcribe(audio_path)
-            results.append(result)
+        if max_workers <= 1 or total <= 1:
+            group_size = max(1, BATCH_CONFIG['files_per_batch'])
+            for start_index in range(0, total, group_size):
+                for result in self.transcribe_batch(audio_paths[start_index:start_index + group_size]):
+                    results.append(result)
 
-            if callback:
-                callback(i + 1, total, result)
+                    if callback:
+                        callback(len(results), total, result)
+            return results
+
+        with ASRWorkerPool(self._device, self._enable_speaker_diarization, min(max_workers, total)) as pool:
+            for i, result in pool.imap(audio_paths):
+                results.append(result)
+
+                if callback:
+                    callback(i + 1, total, result)
 
         return results
 
@@ -227,14 +878,33 @@ class ASREngine:
         """检查模型是否已加载"""
         return self._model is not None
 
+    def modules(self) -> list:
+        """流水线包含的子模型（与其他流水线共享的子模型是同一对象）"""
+        modules = []
+        for name in ("model", "vad_model", "punc_model", "spk_model"):
+            module = getattr(self._model, name, None)
+            if module is not None and hasattr(module, "parameters"):
+                modules.append(module)
+        return modules
+
+    def memory_bytes(self) -> int:
+        """估算模型参数占用的内存（字节）"""
+        return module_memory_bytes(self.modules())
 
-# 全局 ASR 引擎实例
-_asr_engine: Optional[ASREngine] = None
+
+def module_memory_bytes(modules) -> int:
+    """估算一组子模型的参数内存（字节），同一子模型只计算一次"""
+    unique = {id(module): module for module in modules}
+    return sum(
+        p.numel() * p.element_size()
+        for module in unique.values()
+        for p in module.parameters()
+    )
 
 
 def get_asr_engine(device="cpu", enable_speaker_diarization=False) -> ASREngine:
     """
-    获取 ASR 引擎单例
+    从模型池获取 ASR 引擎，未加载时加载
 
     Args:
         device: 设备类型，"cpu" 或 "cuda"
@@ -243,24 +913,32 @@ def get_asr_engine(device="cpu", enable_speaker_diarization=False) -> ASREngine:
     Returns:
         ASR 引擎实例
     """
-    global _asr_engine
-    if _asr_engine is None or _asr_engine._device != device or getattr(_asr_engine, '_speaker_enabled', False) != enable_speaker_diarization:
-        _asr_engine = ASREngine(device=device, enable_speaker_diarization=enable_speaker_diarization)
-    return _asr_engine
+    from backend.model_registry import get_model_registry
+    return get_model_registry().get(device=device, enable_speaker_diarization=enable_speaker_diarization)
 
 
-def get_device_status() -> dict:
+def get_device_status(import_torch: bool = True) -> dict:
     """
-    获取设备状态信息
+    获取设备状态信息（不会触发模型加载）
+
+    Args:
+        import_torch: torch 尚未导入时是否导入（导入可能需要数秒到数十秒）；
+            为 False 且尚未导入时 cuda_available 为 None
 
     Returns:
         设备状态字典
     """
+    from backend.model_registry import get_model_registry
+
     status = {
         "cuda_available": False,
         "current_device": "cpu"
     }
 
+    if not import_torch and "torch" not in sys.modules:
+        status["cuda_available"] = None
+        return status
+
     try:
         import torch
         status["cuda_available"] = torch.cuda.is_available()
@@ -270,7 +948,8 @@ def get_device_status() -> dict:
     except ImportError:
         pass
 
-    if _asr_engine:
-        status["current_device"] = _asr_engine._device
+    engine = get_model_registry().peek()
+    if engine is not None:
+        status["current_device"] = engine._device
 
     return status
@@ -0,0 +1,120 @@
+"""
+音频探测模块
+只读取容器头部获取时长和采样率，不解码音频数据
+"""
+import os
+import json
+import wave
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
+
+from backend.utils.config import SCAN_CONFIG
+
+# 可选依赖和外部命令只探测一次
+_mutagen_available = None
+_ffprobe_available = None
+
+
+def _probe_wave(file_path: str) -> Optional[Dict[str, Any]]:
+    """标准库 wave 解析 PCM WAV 头部"""
+    with wave.open(file_path, 'rb') as wav:
+        sample_rate = wav.getframerate()
+        return {"duration": wav.getnframes() / sample_rate, "sample_rate": sample_rate}
+
+
+def _probe_soundfile(file_path: str) -> Optional[Dict[str, Any]]:
+    """soundfile 解析 WAV/FLAC/OGG 头部（libsndfile 1.1+ 也支持 MP3）"""
+    import soundfile as sf
+    info = sf.info(file_path)
+    return {"duration": info.duration, "sample_rate": info.samplerate}
+
+
+def _probe_mutagen(file_path: str) -> Optional[Dict[str, Any]]:
+    """mutagen 解析 MP3/M4A/AAC/WMA 等压缩格式的头部"""
+    global _mutagen_available
+    if _mutagen_available is False:
+        return None
+    try:
+        import mutagen
+        _mutagen_available = True
+    except ImportError:
+        _mutagen_available = False
+        return None
+
+    audio = mutagen.File(file_path)
+    if audio is None or audio.info is None or not getattr(audio.info, "length", 0):
+        return None
+    return {"duration": audio.info.length, "sample_rate": getattr(audio.info, "sample_rate", None)}
+
+
+def _probe_ffprobe(file_path: str) -> Optional[Dict[str, Any]]:
+    """ffprobe 读取容器信息（最后的后备方案）"""
+    global _ffprobe_available
+    if _ffprobe_available is False:
+        return None
+
+    command = [
+        'ffprobe', '-v', 'error', '-select_streams', 'a:0',
+        '-show_entries', 'format=duration:stream=sample_rate', '-of', 'json', file_path
+    ]
+    try:
+        output = subprocess.run(command, capture_output=True, timeout=10, check=True).stdout
+        _ffprobe_available = True
+    except FileNotFoundError:
+        _ffprobe_available = False
+        return None
+
+    info = json.loads(output or b"{}")
+    duration = info.get("format", {}).get("duration")
+    if duration is None:
+        return None
+    streams = info.get("streams") or [{}]
+    sample_rate = streams[0].get("sample_rate")
+    return {"duration": float(duration), "sample_rate": int(sample_rate) if sample_rate else None}
+
+
+def probe_audio(file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    获取音频时长和采样率
+
+    Args:
+        file_path: 音频文件路径
+
+    Returns:
+        {"duration": 时长（秒）, "sample_rate": 采样率}，无法获取时返回 None
+    """
+    probes = [_probe_soundfile, _probe_mutagen, _probe_ffprobe]
+    if os.path.splitext(file_path)[1].lower() == '.wav':
+        probes.insert(0, _probe_wave)
+
+    for probe in probes:
+        try:
+            info = probe(file_path)
+        except Exception:
+            continue
+        if info is not None and info["duration"] is not None:
+            info["duration"] = round(info["duration"], 2)
+            return info
+    return None
+
+
+def probe_durations(file_paths: List[str], max_workers: Optional[int] = None) -> List[Optional[float]]:
+    """
+    并行获取多个文件的时长
+
+    Args:
+        file_paths: 音频文件路径列表
+        max_workers: 线程数（默认使用 SCAN_CONFIG['probe_workers']）
+
+    Returns:
+        时长列表（秒），与 file_paths 一一对应，无法获取时为 None
+    """
+    if max_workers is None:
+        max_workers = SCAN_CONFIG['probe_workers']
+    if not file_paths:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        infos = list(executor.map(probe_audio, file_paths))
+    return [info["duration"] if info else None for info in infos]
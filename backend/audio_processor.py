@@ -3,10 +3,16 @@
 负责扫描文件夹、获取音频信息
 """
 import os
-from typing import List, Dict, Any
+import time
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from pathlib import Path
 
-from backend.utils.config import SUPPORTED_AUDIO_FORMATS
+from backend.utils.config import SUPPORTED_AUDIO_FORMATS, BATCH_CONFIG
+from backend.folder_scanner import FolderScanner, make_file_info
+from backend.audio_probe import probe_audio
 
 
 class AudioProcessor:
@@ -16,6 +22,7 @@ class AudioProcessor:
     def scan_folder(folder_path: str) -> List[Dict[str, Any]]:
         """
         扫描文件夹，获取所有音频文件
+        子目录并行扫描，未变化的目录直接使用持久化索引（见 FolderScanner）
 
         Args:
             folder_path: 文件夹路径
@@ -23,30 +30,7 @@ class AudioProcessor:
         Returns:
             音频文件信息列表
         """
-        if not os.path.exists(folder_path):
-            raise FileNotFoundError(f"文件夹不存在: {folder_path}")
-
-        if not os.path.isdir(folder_path):
-            raise ValueError(f"路径不是文件夹: {folder_path}")
-
-        audio_files = []
-
-        try:
-            # 遍历文件夹
-            for root, dirs, files in os.walk(folder_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    file_ext = os.path.splitext(file)[1].lower()
-
-                    # 检查是否是支持的音频格式
-                    if file_ext in SUPPORTED_AUDIO_FORMATS:
-                        info = AudioProcessor.get_audio_info(file_path)
-                        audio_files.append(info)
-
-        except PermissionError as e:
-            raise PermissionError(f"没有权限访问文件夹: {folder_path}")
-
-        return audio_files
+        return FolderScanner().scan(folder_path)
 
     @staticmethod
     def get_audio_info(file_path: str) -> Dict[str, Any]:
@@ -64,42 +48,124 @@ class AudioProcessor:
 
         # 获取文件基本信息
         stat = os.stat(file_path)
-        file_size = stat.st_size
-
-        # 获取文件名
-        file_name = os.path.basename(file_path)
+        info = probe_audio(file_path) or {}
 
-        return {
-            "name": file_name,
-            "path": file_path,
-            "size": file_size,
-            "size_mb": round(file_size / (1024 * 1024), 2),
-            "extension": os.path.splitext(file_name)[1].lower(),
-            "status": "pending",  # pending, processing, completed, failed
-            "result": None,
-        }
+        return make_file_info(file_path, stat.st_size, info.get("duration"), info.get("sample_rate"))
 
     @staticmethod
     def get_audio_duration(file_path: str) -> float:
         """
         获取音频时长（秒）
-        需要 librosa 或其他音频库
+        只读取文件头，不解码音频（见 audio_probe.probe_audio）
 
         Args:
             file_path: 音频文件路径
 
         Returns:
-            音频时长（秒）
+            音频时长（秒），无法获取时返回 None
         """
+        info = probe_audio(file_path)
+        return info["duration"] if info else None
+
+    @staticmethod
+    def load_audio(file_path: str, sample_rate: int = 16000):
+        """
+        解码音频文件为单声道 float32 PCM
+        WAV/FLAC/OGG 直接用 soundfile 读取，其他格式交给 librosa（ffmpeg）解码
+
+        Args:
+            file_path: 音频文件路径
+            sample_rate: 目标采样率
+
+        Returns:
+            numpy.ndarray 音频采样
+        """
+        import numpy as np
+
+        data, sr = None, None
         try:
+            import soundfile as sf
+            data, sr = sf.read(file_path, dtype='float32', always_2d=True)
+            data = data.mean(axis=1)
+        except Exception:
+            data = None
+
+        if data is None:
+            import librosa
+            data, sr = librosa.load(file_path, sr=sample_rate, mono=True)
+
+        if sr != sample_rate:
             import librosa
-            duration = librosa.get_duration(filename=file_path)
-            return round(duration, 2)
-        except ImportError:
-            # 如果没有 librosa，返回 None
-            return None
+            data = librosa.resample(data, orig_sr=sr, target_sr=sample_rate)
+
+        return np.ascontiguousarray(data, dtype=np.float32)
+
+    @staticmethod
+    def iter_audio_windows(file_path: str, window_s: float, sample_rate: int = 16000):
+        """
+        按固定时长窗口逐段解码音频，内存占用与文件时长无关
+        WAV/FLAC/OGG 用 soundfile 分块读取，其他格式通过 ffmpeg 管道解码；
+        采样率不同时用流式重采样器跨块保留滤波状态，窗口边界处不会出现不连续
+
+        Args:
+            file_path: 音频文件路径
+            window_s: 窗口时长（秒）
+            sample_rate: 目标采样率
+
+        Yields:
+            numpy.ndarray 单声道 float32 采样（最后一个窗口可能较短）
+        """
+        import numpy as np
+
+        try:
+            import soundfile as sf
+            info = sf.info(file_path)
         except Exception:
-            return None
+            info = None
+
+        if info is not None:
+            resampler = None
+            if info.samplerate != sample_rate:
+                import soxr  # librosa>=0.10 的依赖，与 load_audio 使用同一重采样算法
+                resampler = soxr.ResampleStream(info.samplerate, sample_rate, 1, dtype='float32')
+
+            blocksize = max(1, int(window_s * info.samplerate))
+            blocks = sf.blocks(file_path, blocksize=blocksize, dtype='float32', always_2d=True)
+            block = next(blocks, None)
+            while block is not None:
+                # 提前读取下一块，最后一块重采样时输出滤波器中剩余的采样
+                next_block = next(blocks, None)
+                data = np.ascontiguousarray(block.mean(axis=1), dtype=np.float32)
+                if resampler is not None:
+                    data = resampler.resample_chunk(data, last=next_block is None)
+                if len(data) > 0:
+                    yield np.ascontiguousarray(data, dtype=np.float32)
+                block = next_block
+            return
+
+        command = [
+            'ffmpeg', '-nostdin', '-v', 'error', '-i', file_path,
+            '-f', 'f32le', '-ac', '1', '-ar', str(sample_rate), '-'
+        ]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        window_bytes = max(1, int(window_s * sample_rate)) * 4
+        decoded = False
+
+        try:
+            while True:
+                data = process.stdout.read(window_bytes)
+                if not data:
+                    break
+                decoded = True
+                yield np.frombuffer(data[:len(data) // 4 * 4], dtype=np.float32).copy()
+        finally:
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+
+        if not decoded and process.returncode != 0:
+            raise RuntimeError(f"无法解码音频文件: {file_path}")
 
     @staticmethod
     def format_size(size_bytes: int) -> str:
@@ -138,3 +204,87 @@ class AudioProcessor:
         """
         ext = os.path.splitext(file_path)[1].lower()
         return ext in SUPPORTED_AUDIO_FORMATS
+
+
+class AudioPrefetcher:
+    """
+    后台预解码：模型处理当前文件时，线程池提前把后续文件解码、重采样为 16kHz float32
+
+    解码主要耗时在 ffmpeg 子进程和重采样中，不受 GIL 限制；
+    最多只保留 prefetch 个已解码的文件，内存占用有上限。
+    """
+
+    def __init__(
+        self,
+        audio_paths: List[str],
+        sample_rate: int = 16000,
+        prefetch: Optional[int] = None,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            audio_paths: 音频文件路径列表
+            sample_rate: 目标采样率
+            prefetch: 提前解码的文件数（默认使用 BATCH_CONFIG['prefetch_files']）
+            max_workers: 解码线程数（默认使用 BATCH_CONFIG['decode_workers']）
+        """
+        if prefetch is None:
+            prefetch = BATCH_CONFIG['prefetch_files']
+        if max_workers is None:
+            max_workers = BATCH_CONFIG['decode_workers']
+
+        self.audio_paths = list(audio_paths)
+        self.sample_rate = sample_rate
+        self.prefetch = max(0, prefetch)
+        self.max_workers = max(1, max_workers)
+
+    def _load(self, audio_path: str) -> Tuple[Any, float]:
+        """解码并记录耗时"""
+        start_time = time.time()
+        speech = AudioProcessor.load_audio(audio_path, self.sample_rate)
+        return speech, time.time() - start_time
+
+    def __iter__(self) -> Iterator[Tuple[str, Any, Optional[Exception], float]]:
+        """
+        按输入顺序返回解码结果
+
+        Yields:
+            (文件路径, 采样数组, 异常, 解码耗时秒)，解码失败时采样为 None
+        """
+        if self.prefetch == 0:
+            for audio_path in self.audio_paths:
+                try:
+                    speech, decode_time = self._load(audio_path)
+                except Exception as e:
+                    yield audio_path, None, e, 0.0
+                    continue
+                yield audio_path, speech, None, decode_time
+            return
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, self.prefetch))
+        remaining = iter(self.audio_paths)
+        in_flight = deque()
+
+        def submit_next():
+            audio_path = next(remaining, None)
+            if audio_path is not None:
+                in_flight.append((audio_path, executor.submit(self._load, audio_path)))
+
+        try:
+            for _ in range(self.prefetch):
+                submit_next()
+
+            while in_flight:
+                audio_path, future = in_flight.popleft()
+                # 先补充下一个解码任务，调用方处理当前文件时它已在后台运行
+                submit_next()
+                try:
+                    speech, decode_time = future.result()
+                except Exception as e:
+                    yield audio_path, None, e, 0.0
+                    continue
+                yield audio_path, speech, None, decode_time
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=False)
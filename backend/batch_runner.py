@@ -0,0 +1,253 @@
+"""
+离线批量识别模块
+不经过 HTTP 服务和任务数据库，直接用多进程工作池识别文件夹或文件清单，适合定时任务和多机集群：
+按路径哈希分片（--shard i/N），每个分片把识别结果逐行追加到输出目录的清单文件，中断后从清单继续
+"""
+import os
+import json
+import time
+import zlib
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+
+from backend.audio_processor import AudioProcessor
+from backend.audio_probe import probe_durations
+from backend.folder_scanner import make_file_filter
+from backend.result_exporter import BackgroundExporter
+from backend.worker_pool import iter_transcribe
+
+MANIFEST_NAME = "manifest.jsonl"
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    解析分片参数
+
+    Args:
+        value: "i/N"，i 从 0 开始，如 "0/4" ~ "3/4"
+
+    Returns:
+        (i, N)
+
+    Raises:
+        ValueError: 格式无效
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"分片格式应为 i/N: {value}")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"分片序号应在 0 到 N-1 之间: {value}")
+    return index, count
+
+
+def in_shard(key: str, shard: Tuple[int, int]) -> bool:
+    """
+    文件是否属于该分片
+
+    按 key 的 CRC32 取模：与文件顺序和机器无关，各节点对同一份文件集合的划分一致，
+    归档中新增文件也不会改变已有文件所属的分片。
+    """
+    index, count = shard
+    return count == 1 or zlib.crc32(key.encode("utf-8")) % count == index
+
+
+def collect_folder(folder_path: str, filters: Optional[Dict[str, Any]] = None) -> List[Tuple[str, str, Optional[float]]]:
+    """
+    扫描文件夹
+
+    Returns:
+        [(音频路径, 分片键（相对文件夹的路径）, 时长), ...]，按分片键排序
+    """
+    accept = make_file_filter(folder_path, filters)
+    root = os.path.abspath(folder_path)
+    entries = [
+        (info["path"], os.path.relpath(os.path.abspath(info["path"]), root).replace(os.sep, "/"), info.get("duration"))
+        for info in AudioProcessor.scan_folder(folder_path)
+        if accept(info)
+    ]
+    return sorted(entries, key=lambda entry: entry[1])
+
+
+def collect_manifest(manifest_path: str) -> List[Tuple[str, str, Optional[float]]]:
+    """
+    读取文件清单：每行一个音频路径，或每行一个 JSON 对象（取 path / audio_path 字段，可直接使用其他运行的输出清单）；
+    相对路径相对清单所在目录，空行和 # 开头的行跳过
+
+    Returns:
+        [(音频路径, 分片键（清单中的原始路径）, 时长), ...]，按清单顺序，重复的路径只保留一次
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    entries = []
+    seen = set()
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            duration = None
+            if line.startswith("{"):
+                record = json.loads(line)
+                key = record.get("path") or record.get("audio_path")
+                duration = record.get("duration")
+                if not key:
+                    continue
+            else:
+                key = line
+            if key in seen:
+                continue
+            seen.add(key)
+            entries.append((os.path.join(base_dir, key), key, duration))
+    return entries
+
+
+def read_output_manifest(manifest_path: str) -> Iterator[Dict[str, Any]]:
+    """读取输出清单中的识别结果（中断时写了一半的行跳过）"""
+    if not os.path.exists(manifest_path):
+        return
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(result, dict) and result.get("audio_path"):
+                yield result
+
+
+def repair_output_manifest(manifest_path: str) -> int:
+    """
+    截掉输出清单末尾写了一半的行（中断时最后一行可能没有换行符），之后追加的记录不会与其拼在同一行
+
+    Returns:
+        截掉的字节数
+    """
+    if not os.path.exists(manifest_path):
+        return 0
+    with open(manifest_path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        end = size
+        # 从末尾向前找最后一个换行符
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        if end < size:
+            f.truncate(end)
+    return size - end
+
+
+class BatchRunner:
+    """一个分片的离线批量识别"""
+
+    def __init__(
+        self,
+        entries: List[Tuple[str, str, Optional[float]]],
+        output_dir: str,
+        shard: Tuple[int, int] = (0, 1),
+        device: str = "cpu",
+        speaker_diarization: bool = False,
+        formats: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+        resume: bool = True
+    ):
+        """
+        Args:
+            entries: collect_folder / collect_manifest 的返回值
+            output_dir: 输出目录；分片数大于 1 时每个分片写入其中的 shard-i-of-N 子目录，互不冲突
+            shard: (i, N)
+            device: 设备类型
+            speaker_diarization: 是否启用说话人分离
+            formats: 导出格式（默认使用 EXPORT_CONFIG['formats']）
+            max_workers: 识别进程数（默认使用 BATCH_CONFIG['max_workers']）
+            resume: 跳过输出清单中已成功的文件（失败的文件重新识别）
+        """
+        index, count = shard
+        if count > 1:
+            output_dir = os.path.join(output_dir, f"shard-{index}-of-{count}")
+
+        self.entries = [entry for entry in entries if in_shard(entry[1], shard)]
+        self.output_dir = output_dir
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self.device = device
+        self.speaker_diarization = speaker_diarization
+        self.formats = formats
+        self.max_workers = max_workers
+        self.resume = resume
+
+        self.stop_requested = False
+        self.skipped_count = 0
+        self.success_count = 0
+        self.failed_count = 0
+
+    def run(self, on_result: Optional[Callable[[int, int, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        识别本分片的文件：结果逐行追加到输出清单，同时在后台导出
+
+        Args:
+            on_result: 每个文件完成后的回调 (已完成数, 待识别总数, 识别结果)
+
+        Returns:
+            {"manifest_path", "skipped_count", "success_count", "failed_count", "stopped", "elapsed",
+             "export": 导出信息（见 BackgroundExporter.close）}
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        exporter = BackgroundExporter(self.output_dir, self.formats)
+
+        # 已成功的文件只计入汇总，不再识别
+        done = {}
+        if self.resume:
+            repair_output_manifest(self.manifest_path)
+            for result in read_output_manifest(self.manifest_path):
+                if result.get("success"):
+                    done[result["audio_path"]] = result
+                else:
+                    done.pop(result["audio_path"], None)
+        for result in done.values():
+            exporter.submit(result, write_file=False)
+
+        todo = [entry for entry in self.entries if entry[0] not in done]
+        self.skipped_count = len(self.entries) - len(todo)
+
+        # 按时长从长到短识别，最后不会只剩一个长文件占用时间
+        missing = [k for k, entry in enumerate(todo) if entry[2] is None]
+        durations = [entry[2] for entry in todo]
+        for k, duration in zip(missing, probe_durations([todo[k][0] for k in missing])):
+            durations[k] = duration
+        order = sorted(range(len(todo)), key=lambda k: -(durations[k] or 0))
+        paths = [todo[k][0] for k in order]
+        durations = [durations[k] for k in order]
+
+        start_time = time.time()
+        with open(self.manifest_path, "a" if self.resume else "w", encoding="utf-8") as manifest:
+            if paths:
+                results = iter_transcribe(
+                    paths, self.device, self.speaker_diarization, self.max_workers,
+                    should_stop=lambda: self.stop_requested
+                )
+                for completed, (index, result) in enumerate(results, 1):
+                    if durations[index] is not None:
+                        result.setdefault("duration", durations[index])
+                    manifest.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    manifest.flush()
+                    exporter.submit(result)
+
+                    if result.get("success"):
+                        self.success_count += 1
+                    else:
+                        self.failed_count += 1
+                    if on_result is not None:
+                        on_result(completed, len(paths), result)
+
+        return {
+            "manifest_path": self.manifest_path,
+            "skipped_count": self.skipped_count,
+            "success_count": self.success_count,
+            "failed_count": self.failed_count,
+            "stopped": self.stop_requested,
+            "elapsed": round(time.time() - start_time, 1),
+            "export": exporter.close(),
+        }
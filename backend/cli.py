@@ -0,0 +1,245 @@
+"""
+Fun-ASR 语音识别批量处理系统 - 命令行入口
+不启动 HTTP 服务，在本进程内完成 扫描 → 识别 → 导出
+
+    run / resume: 任务保存在任务数据库中，可随时继续，也可在 Web 界面中查看
+    batch: 不使用任务数据库，按 --shard i/N 在多台机器间划分文件，进度保存在输出目录的清单文件中
+
+用法:
+    python backend/cli.py run /path/to/audio --formats markdown jsonl --exclude "*/tmp/*"
+    python backend/cli.py resume 3f2a9c1b7d4e
+    python backend/cli.py batch --folder /archive --output-dir /shared/out --shard 0/8 --workers 4
+"""
+import os
+import sys
+import time
+import signal
+import argparse
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.batch_runner import BatchRunner, parse_shard, collect_folder, collect_manifest
+from backend.job_manager import get_job_manager, JobRun
+from backend.result_exporter import check_formats
+from backend.utils.config import OUTPUT_DIR, JOB_CONFIG
+
+
+def _build_filters(args) -> dict:
+    """命令行参数 → 文件夹任务筛选条件"""
+    filters = {}
+    if args.ext:
+        filters["extensions"] = args.ext
+    if args.include:
+        filters["include"] = args.include
+    if args.exclude:
+        filters["exclude"] = args.exclude
+    for key in ("min_duration", "max_duration", "min_size_mb", "max_size_mb"):
+        if getattr(args, key) is not None:
+            filters[key] = getattr(args, key)
+    return filters
+
+
+def _format_seconds(seconds) -> str:
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def wait_for_job(run: JobRun, interval: float = 1.0) -> int:
+    """
+    等待任务结束，期间输出进度和失败的文件
+
+    第一次 Ctrl+C 停止任务（已提交的文件识别完成后退出，可用 resume 继续），第二次立即退出。
+
+    Args:
+        run: 执行中的任务
+        interval: 进度刷新间隔（秒）
+
+    Returns:
+        退出码：0 全部成功，1 有失败的文件，2 任务被停止或出错
+    """
+    manager = get_job_manager()
+
+    def handle_signal(signum, frame):
+        if run.stop_requested:
+            raise SystemExit(2)
+        print("\n正在停止任务，等待已提交的文件识别完成（再次按 Ctrl+C 立即退出）...")
+        manager.stop(run.job_id)
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    since = 0
+    while True:
+        progress = run.progress(since, limit=1000)
+        for result in progress["results"]:
+            if not result.get("success"):
+                print(f"\n失败: {result.get('audio_path')} - {result.get('error')}")
+        since = progress["next_index"]
+
+        scanning = " (扫描中)" if progress["scanning"] else ""
+        sys.stdout.write(
+            f"\r进度: {progress['completed_count']}/{progress['total']}{scanning}"
+            f"  已用 {_format_seconds(progress['elapsed'])}  剩余 {_format_seconds(progress['eta_seconds'])}   "
+        )
+        sys.stdout.flush()
+
+        if not progress["is_processing"] and not progress["has_more"]:
+            break
+        time.sleep(interval)
+
+    print()
+    counts = run.items.counts()
+    print(f"任务 {run.job_id} {run.status}: 成功 {counts['completed']}，失败 {counts['failed']}，未处理 {counts['pending']}")
+    if run.export:
+        print(f"导出目录: {run.export.get('output_dir')}")
+        if run.export.get("summary_path"):
+            print(f"汇总文件: {run.export['summary_path']}")
+    if run.error:
+        print(f"错误: {run.error}")
+
+    manager.drain(timeout=0)
+
+    if run.status != "completed" or run.error:
+        print(f"继续执行: python backend/cli.py resume {run.job_id}")
+        return 2
+    return 1 if counts["failed"] else 0
+
+
+def run_batch(args) -> int:
+    """
+    离线批量识别（batch 子命令）
+
+    Returns:
+        退出码：0 全部成功，1 有失败的文件，2 被中断或参数错误
+    """
+    try:
+        shard = parse_shard(args.shard)
+        formats = check_formats(args.formats) if args.formats else None
+        if args.folder:
+            entries = collect_folder(args.folder, _build_filters(args))
+        else:
+            entries = collect_manifest(args.manifest)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"错误: {e}")
+        return 2
+
+    runner = BatchRunner(
+        entries,
+        args.output_dir,
+        shard=shard,
+        device=args.device,
+        speaker_diarization=args.speaker_diarization,
+        formats=formats,
+        max_workers=args.workers,
+        resume=not args.restart,
+    )
+    print(f"分片 {shard[0]}/{shard[1]}: {len(runner.entries)} 个文件（共 {len(entries)} 个），输出目录: {runner.output_dir}")
+
+    def handle_signal(signum, frame):
+        if runner.stop_requested:
+            raise SystemExit(2)
+        print("\n正在停止，已识别的结果保存在清单中，重新运行同一命令即可继续（再次按 Ctrl+C 立即退出）...")
+        runner.stop_requested = True
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    def on_result(completed, total, result):
+        if not result.get("success"):
+            print(f"\n失败: {result.get('audio_path')} - {result.get('error')}")
+        sys.stdout.write(f"\r进度: {completed}/{total}   ")
+        sys.stdout.flush()
+
+    summary = runner.run(on_result)
+
+    print()
+    print(f"跳过（已完成）{summary['skipped_count']}，成功 {summary['success_count']}，失败 {summary['failed_count']}，"
+          f"耗时 {_format_seconds(summary['elapsed'])}")
+    print(f"清单文件: {summary['manifest_path']}")
+    if summary["export"].get("summary_path"):
+        print(f"汇总文件: {summary['export']['summary_path']}")
+
+    if summary["stopped"]:
+        return 2
+    return 1 if summary["failed_count"] else 0
+
+
+def _add_filter_arguments(parser):
+    parser.add_argument("--ext", nargs="+", help="只识别这些扩展名，如 .wav .mp3")
+    parser.add_argument("--include", nargs="+", help="相对路径通配符，匹配其中之一才识别")
+    parser.add_argument("--exclude", nargs="+", help="相对路径通配符，匹配其中之一则跳过")
+    parser.add_argument("--min-duration", type=float, help="最短时长（秒）")
+    parser.add_argument("--max-duration", type=float, help="最长时长（秒）")
+    parser.add_argument("--min-size-mb", type=float, help="最小文件大小（MB）")
+    parser.add_argument("--max-size-mb", type=float, help="最大文件大小（MB）")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fun-ASR 语音识别批量处理（命令行）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="识别文件夹中的音频并导出")
+    run_parser.add_argument("folder", help="音频文件夹")
+    run_parser.add_argument("--device", default="cpu", help="设备类型: cpu 或 cuda")
+    run_parser.add_argument("--speaker-diarization", action="store_true", help="启用说话人分离")
+    run_parser.add_argument("--formats", nargs="+", help="导出格式（默认 EXPORT_CONFIG['formats']）")
+    run_parser.add_argument("--output-dir", default=OUTPUT_DIR, help="导出目录")
+    run_parser.add_argument("--no-export", action="store_true", help="不导出文件，只保存到任务数据库")
+    run_parser.add_argument("--priority", type=int, default=JOB_CONFIG['default_priority'], help="优先级（权重）")
+    _add_filter_arguments(run_parser)
+
+    resume_parser = subparsers.add_parser("resume", help="继续执行中断的任务")
+    resume_parser.add_argument("job_id", help="任务 ID")
+
+    batch_parser = subparsers.add_parser("batch", help="离线批量识别（可分片，不使用任务数据库）")
+    source = batch_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--folder", help="音频文件夹")
+    source.add_argument("--manifest", help="文件清单：每行一个路径，或 JSONL（path / audio_path 字段）")
+    batch_parser.add_argument("--output-dir", default=OUTPUT_DIR, help="输出目录（多个分片时各自写入 shard-i-of-N 子目录）")
+    batch_parser.add_argument("--shard", default="0/1", help="分片 i/N（i 从 0 开始），各节点按路径哈希划分文件")
+    batch_parser.add_argument("--workers", type=int, help="识别进程数（默认 BATCH_CONFIG['max_workers']）")
+    batch_parser.add_argument("--device", default="cpu", help="设备类型: cpu 或 cuda")
+    batch_parser.add_argument("--speaker-diarization", action="store_true", help="启用说话人分离")
+    batch_parser.add_argument("--formats", nargs="+", help="导出格式（默认 EXPORT_CONFIG['formats']）")
+    batch_parser.add_argument("--restart", action="store_true", help="忽略已有的输出清单，全部重新识别")
+    _add_filter_arguments(batch_parser)
+
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        return run_batch(args)
+
+    manager = get_job_manager()
+
+    try:
+        if args.command == "run":
+            formats = None
+            if args.formats and not args.no_export:
+                formats = check_formats(args.formats)
+            run = manager.submit_folder(
+                args.folder,
+                _build_filters(args),
+                device=args.device,
+                speaker_diarization=args.speaker_diarization,
+                export_dir=None if args.no_export else args.output_dir,
+                export_formats=formats,
+                priority=args.priority,
+            )
+        else:
+            run = manager.submit(args.job_id)
+    except KeyError:
+        print(f"错误: 任务不存在: {args.job_id}")
+        return 2
+    except (FileNotFoundError, ValueError, ImportError) as e:
+        print(f"错误: {e}")
+        return 2
+
+    print(f"任务 ID: {run.job_id}")
+    return wait_for_job(run)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
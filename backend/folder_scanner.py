@@ -0,0 +1,467 @@
+"""
+文件夹扫描模块
+基于 os.scandir 并行扫描子目录，并用持久化的目录索引跳过未变化的目录
+"""
+import os
+import json
+import time
+import uuid
+import fnmatch
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from threading import Lock, Thread
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple
+
+from backend.utils.config import SUPPORTED_AUDIO_FORMATS, SCAN_CONFIG
+from backend.audio_probe import probe_audio
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    files TEXT NOT NULL,
+    subdirs TEXT NOT NULL
+);
+"""
+
+
+def make_file_info(
+    file_path: str,
+    file_size: int,
+    duration: Optional[float] = None,
+    sample_rate: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    构造音频文件信息字典（格式同 AudioProcessor.get_audio_info）
+
+    Args:
+        file_path: 音频文件路径
+        file_size: 文件大小（字节）
+        duration: 音频时长（秒，未知时为 None）
+        sample_rate: 采样率（未知时为 None）
+    """
+    file_name = os.path.basename(file_path)
+    return {
+        "name": file_name,
+        "path": file_path,
+        "size": file_size,
+        "size_mb": round(file_size / (1024 * 1024), 2),
+        "duration": duration,
+        "sample_rate": sample_rate,
+        "extension": os.path.splitext(file_name)[1].lower(),
+        "status": "pending",  # pending, processing, completed, failed
+        "result": None,
+    }
+
+
+def make_file_filter(folder_path: str, filters: Optional[Dict[str, Any]] = None) -> Callable[[Dict[str, Any]], bool]:
+    """
+    构造扫描结果的筛选函数
+
+    Args:
+        folder_path: 扫描的文件夹（include / exclude 按相对该文件夹的路径匹配）
+        filters: 筛选条件，均为可选:
+            extensions: 只保留这些扩展名，如 [".wav", ".mp3"]
+            include: 通配符列表，相对路径匹配其中之一才保留，如 ["2024-*/*.wav"]
+            exclude: 通配符列表，相对路径匹配其中之一则跳过
+            min_duration / max_duration: 时长范围（秒），时长未知的文件不按时长筛选
+            min_size_mb / max_size_mb: 文件大小范围（MB）
+
+    Returns:
+        filter(file_info) -> bool
+
+    Raises:
+        ValueError: 筛选条件无效
+    """
+    filters = dict(filters or {})
+    unknown = set(filters) - {"extensions", "include", "exclude", "min_duration", "max_duration", "min_size_mb", "max_size_mb"}
+    if unknown:
+        raise ValueError(f"不支持的筛选条件: {', '.join(sorted(unknown))}")
+
+    extensions = filters.get("extensions")
+    if extensions is not None:
+        if not isinstance(extensions, list):
+            raise ValueError("extensions 必须是列表")
+        extensions = {ext.lower() if ext.startswith(".") else "." + ext.lower() for ext in extensions}
+        unsupported = extensions - set(SUPPORTED_AUDIO_FORMATS)
+        if unsupported:
+            raise ValueError(f"不支持的音频格式: {', '.join(sorted(unsupported))}")
+
+    include = filters.get("include") or []
+    exclude = filters.get("exclude") or []
+    if not isinstance(include, list) or not isinstance(exclude, list):
+        raise ValueError("include 和 exclude 必须是列表")
+
+    ranges = {}
+    for key in ("min_duration", "max_duration", "min_size_mb", "max_size_mb"):
+        value = filters.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise ValueError(f"{key} 必须是数字")
+        ranges[key] = value
+
+    root = os.path.abspath(folder_path)
+
+    def accept(info: Dict[str, Any]) -> bool:
+        if extensions is not None and info["extension"] not in extensions:
+            return False
+        if include or exclude:
+            rel_path = os.path.relpath(os.path.abspath(info["path"]), root).replace(os.sep, "/")
+            if include and not any(fnmatch.fnmatch(rel_path, pattern) for pattern in include):
+                return False
+            if any(fnmatch.fnmatch(rel_path, pattern) for pattern in exclude):
+                return False
+        duration = info.get("duration")
+        if duration is not None:
+            if ranges["min_duration"] is not None and duration < ranges["min_duration"]:
+                return False
+            if ranges["max_duration"] is not None and duration > ranges["max_duration"]:
+                return False
+        if ranges["min_size_mb"] is not None and info["size"] < ranges["min_size_mb"] * 1024 * 1024:
+            return False
+        if ranges["max_size_mb"] is not None and info["size"] > ranges["max_size_mb"] * 1024 * 1024:
+            return False
+        return True
+
+    return accept
+
+
+class ScanIndex:
+    """
+    目录索引：记录每个目录的修改时间、其中的音频文件和子目录
+
+    目录的修改时间只在增删、重命名条目时变化，因此未变化的目录可以直接复用上次的列表；
+    原地改写文件不会改变目录的修改时间，因此每个文件另记录自身的修改时间和大小，变化时重新读取文件头。
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        初始化目录索引
+
+        Args:
+            db_path: 索引文件路径（默认使用 SCAN_CONFIG['index_path']）
+        """
+        if db_path is None:
+            db_path = SCAN_CONFIG['index_path']
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self._lock = Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def get(self, dir_path: str) -> Optional[Tuple[int, list, list]]:
+        """
+        读取目录记录
+
+        Returns:
+            (mtime_ns, [(文件名, 大小, 时长, 采样率, 文件 mtime_ns), ...], [子目录名, ...])，不存在时返回 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime_ns, files, subdirs FROM dirs WHERE path = ?", (dir_path,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), json.loads(row[2])
+
+    def update(self, records: List[Tuple[str, int, list, list]], removed: List[str]):
+        """
+        批量写入目录记录
+
+        Args:
+            records: [(目录路径, mtime_ns, 文件列表, 子目录列表), ...]
+            removed: 已删除的目录（连同其下所有子目录一起移除）
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO dirs (path, mtime_ns, files, subdirs) VALUES (?, ?, ?, ?)",
+                [(path, mtime_ns, json.dumps(files, ensure_ascii=False), json.dumps(subdirs, ensure_ascii=False))
+                 for path, mtime_ns, files, subdirs in records]
+            )
+            for path in removed:
+                prefix = path.rstrip(os.sep) + os.sep
+                self._conn.execute(
+                    "DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?",
+                    (path, len(prefix), prefix)
+                )
+
+
+class FolderScanner:
+    """并行、增量的音频文件夹扫描器"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        index: Optional[ScanIndex] = None,
+        probe_duration: Optional[bool] = None
+    ):
+        """
+        初始化扫描器
+
+        Args:
+            max_workers: 并行扫描的线程数（默认使用 SCAN_CONFIG['max_workers']）
+            index: 目录索引（默认使用全局索引，SCAN_CONFIG['use_index'] 为 False 时不使用）
+            probe_duration: 是否读取文件头获取时长（默认使用 SCAN_CONFIG['probe_duration']）
+        """
+        if max_workers is None:
+            max_workers = SCAN_CONFIG['max_workers']
+        if index is None and SCAN_CONFIG['use_index']:
+            index = get_scan_index()
+        if probe_duration is None:
+            probe_duration = SCAN_CONFIG['probe_duration']
+
+        self.max_workers = max(1, max_workers)
+        self.index = index
+        self.probe_duration = probe_duration
+
+    def _scan_dir(self, dir_path: str, probe_executor: Optional[ThreadPoolExecutor] = None) -> Tuple[list, list, Optional[tuple]]:
+        """
+        扫描单个目录（不递归）
+
+        Args:
+            dir_path: 目录路径
+            probe_executor: 读取文件头的线程池，为 None 时不获取时长
+
+        Returns:
+            (音频文件列表 [(文件名, 大小, 时长, 采样率, 文件 mtime_ns)], 子目录名列表, 需要写回索引的记录或 None)
+        """
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+
+        cached = self.index.get(dir_path) if self.index is not None else None
+        # 旧版本索引没有时长或文件修改时间，需要重新扫描
+        if cached is not None and not all(len(f) >= 5 for f in cached[1]):
+            cached = None
+        known = {f[0]: f for f in cached[1]} if cached is not None else {}
+
+        if cached is not None and cached[0] == mtime_ns:
+            # 目录未变化：沿用文件列表，只核对每个文件的修改时间和大小
+            subdirs = cached[2]
+            stats = []
+            for name in known:
+                try:
+                    stat = os.stat(os.path.join(dir_path, name))
+                except OSError:
+                    continue
+                stats.append((name, stat.st_size, stat.st_mtime_ns))
+        else:
+            stats = []
+            subdirs = []
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif os.path.splitext(entry.name)[1].lower() in SUPPORTED_AUDIO_FORMATS:
+                            # DirEntry 会缓存 stat 结果（Windows 上无需额外系统调用）
+                            stat = entry.stat()
+                            stats.append((entry.name, stat.st_size, stat.st_mtime_ns))
+                    except OSError:
+                        continue
+            stats.sort()
+            subdirs.sort()
+
+        # 大小和修改时间都未变的文件沿用索引中的时长
+        reused = {
+            name: known[name] for name, size, file_mtime_ns in stats
+            if name in known and known[name][1] == size and known[name][4] == file_mtime_ns
+        }
+        if cached is not None and cached[0] == mtime_ns and len(reused) == len(cached[1]):
+            return cached[1], cached[2], None
+
+        # 文件头在单独的线程池中读取，单个目录文件很多时也能并行
+        changed = [name for name, _, _ in stats if name not in reused]
+        infos = {}
+        if probe_executor is not None and changed:
+            paths = [os.path.join(dir_path, name) for name in changed]
+            infos = dict(zip(changed, probe_executor.map(probe_audio, paths)))
+
+        files = []
+        for name, size, file_mtime_ns in stats:
+            if name in reused:
+                files.append(tuple(reused[name]))
+                continue
+            info = infos.get(name)
+            files.append((name, size, info["duration"] if info else None, info["sample_rate"] if info else None, file_mtime_ns))
+
+        removed = []
+        if cached is not None:
+            removed = [os.path.join(dir_path, name) for name in set(cached[2]) - set(subdirs)]
+
+        return files, subdirs, (dir_path, mtime_ns, files, subdirs, removed)
+
+    def iter_scan(self, folder_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        扫描文件夹，边扫描边返回音频文件信息
+
+        子目录在线程池中并行扫描，返回顺序为各目录完成的顺序。
+
+        Args:
+            folder_path: 文件夹路径
+
+        Yields:
+            音频文件信息字典
+        """
+        if not os.path.exists(folder_path):
+            raise FileNotFoundError(f"文件夹不存在: {folder_path}")
+
+        if not os.path.isdir(folder_path):
+            raise ValueError(f"路径不是文件夹: {folder_path}")
+
+        if not os.access(folder_path, os.R_OK | os.X_OK):
+            raise PermissionError(f"没有权限访问文件夹: {folder_path}")
+
+        records = []
+        removed = []
+
+        probe_executor = None
+        if self.probe_duration:
+            probe_executor = ThreadPoolExecutor(max_workers=SCAN_CONFIG['probe_workers'])
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {executor.submit(self._scan_dir, folder_path, probe_executor): folder_path}
+
+            try:
+                while pending:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        dir_path = pending.pop(future)
+                        try:
+                            files, subdirs, record = future.result()
+                        except PermissionError:
+                            if dir_path == folder_path:
+                                raise PermissionError(f"没有权限访问文件夹: {folder_path}")
+                            continue
+                        except OSError:
+                            # 扫描过程中被删除或无法访问的子目录直接跳过
+                            continue
+
+                        if record is not None:
+                            records.append(record[:4])
+                            removed.extend(record[4])
+
+                        for name in subdirs:
+                            sub_path = os.path.join(dir_path, name)
+                            pending[executor.submit(self._scan_dir, sub_path, probe_executor)] = sub_path
+
+                        for name, size, duration, sample_rate, _ in files:
+                            yield make_file_info(os.path.join(dir_path, name), size, duration, sample_rate)
+            finally:
+                for future in pending:
+                    future.cancel()
+                if probe_executor is not None:
+                    probe_executor.shutdown(wait=False)
+
+                if self.index is not None and (records or removed):
+                    self.index.update(records, removed)
+
+    def scan(self, folder_path: str) -> List[Dict[str, Any]]:
+        """扫描文件夹，返回全部音频文件信息"""
+        return list(self.iter_scan(folder_path))
+
+
+class ScanSession:
+    """后台扫描会话：扫描结果边产生边追加，客户端按游标分页读取"""
+
+    def __init__(self, folder_path: str):
+        self.scan_id = uuid.uuid4().hex[:12]
+        self.folder_path = folder_path
+        self.files = []
+        self.done = False
+        self.error = None
+        self.error_type = None
+        self.started_at = time.time()
+        self.finished_at = None
+
+    def run(self):
+        """执行扫描（在后台线程中调用）"""
+        try:
+            for info in FolderScanner().iter_scan(self.folder_path):
+                self.files.append(info)
+        except Exception as e:
+            self.error = str(e)
+            self.error_type = type(e).__name__
+        finally:
+            self.finished_at = time.time()
+            self.done = True
+
+    def page(self, since: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        读取 since 之后的一页扫描结果
+
+        Args:
+            since: 结果游标
+            limit: 本页最多返回的文件数（默认使用 SCAN_CONFIG['page_size']）
+        """
+        if limit is None:
+            limit = SCAN_CONFIG['page_size']
+
+        # 先读取完成标记，保证 done 为 True 时 count 已是最终数量
+        done = self.done
+        count = len(self.files)
+        files = self.files[since:min(since + limit, count)]
+        next_index = since + len(files)
+
+        return {
+            "scan_id": self.scan_id,
+            "files": files,
+            "count": count,
+            "since": since,
+            "next_index": next_index,
+            "has_more": next_index < count,
+            "done": done,
+            "error": self.error,
+        }
+
+
+_scan_sessions = OrderedDict()
+_scan_sessions_lock = Lock()
+
+
+def start_scan_session(folder_path: str) -> ScanSession:
+    """
+    在后台线程中开始扫描
+
+    Args:
+        folder_path: 文件夹路径
+
+    Returns:
+        扫描会话
+    """
+    session = ScanSession(folder_path)
+
+    with _scan_sessions_lock:
+        _scan_sessions[session.scan_id] = session
+        # 只保留最近的会话
+        while len(_scan_sessions) > SCAN_CONFIG['max_sessions']:
+            _scan_sessions.popitem(last=False)
+
+    thread = Thread(target=session.run)
+    thread.daemon = True
+    thread.start()
+
+    return session
+
+
+def get_scan_session(scan_id: str) -> Optional[ScanSession]:
+    """获取扫描会话"""
+    with _scan_sessions_lock:
+        return _scan_sessions.get(scan_id)
+
+
+# 全局目录索引实例
+_scan_index: Optional[ScanIndex] = None
+_scan_index_lock = Lock()
+
+
+def get_scan_index() -> ScanIndex:
+    """获取目录索引单例"""
+    global _scan_index
+    if _scan_index is None:
+        with _scan_index_lock:
+            if _scan_index is None:
+                _scan_index = ScanIndex()
+    return _scan_index
@@ -0,0 +1,863 @@
+"""
+任务调度模块
+多个批量识别任务同时执行：每个任务独立的进度和结果，共享一个识别工作池，
+按优先级（权重）公平分配识别资源，大任务不会阻塞其他任务；
+文件夹任务在后台边扫描边识别边导出，文件列表不经过客户端
+"""
+import os
+import time
+import threading
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from threading import Lock
+from typing import Optional, Dict, Any, List, Iterable
+
+from backend.audio_probe import probe_durations
+from backend.folder_scanner import FolderScanner, make_file_filter
+from backend.job_store import get_job_store
+from backend.metrics import metrics, record_timings
+from backend.progress_events import progress_events
+from backend.readiness import readiness
+from backend.result_exporter import BackgroundExporter
+from backend.worker_pool import ASRWorkerPool, _failed_result
+from backend.utils.config import BATCH_CONFIG, JOB_CONFIG, CACHE_CONFIG
+
+
+# 文件状态码（JobItemTable 中每个文件占一个字节）
+PENDING, RUNNING, COMPLETED, FAILED = range(4)
+STATUS_NAMES = ("pending", "running", "completed", "failed")
+
+
+class JobItemTable:
+    """
+    任务文件表：按文件序号索引的紧凑记录，是任务进度、文件状态和导出的唯一数据来源
+
+    每个文件只保存路径、状态码（bytearray）、识别次数（array）和结果；
+    另按完成顺序记录文件序号作为进度游标。所有更新和计数都是 O(1)，并由一把锁保护。
+    同一路径出现多次时按序号区分，互不影响。
+    """
+
+    def __init__(self, paths: Iterable[str] = ()):
+        self._lock = Lock()
+        self._paths = list(paths)
+        count = len(self._paths)
+        self._status = bytearray(count)
+        self._attempts = array("H", bytes(2 * count))
+        self._results = [None] * count
+        self._done = array("l")  # 按完成顺序的文件序号
+        self._counts = [count, 0, 0, 0]
+
+    @classmethod
+    def from_store(cls, items: List[Dict[str, Any]], max_attempts: Optional[int] = None) -> "JobItemTable":
+        """
+        由任务存储的文件记录构建
+
+        Args:
+            items: JobStore.get_items 的返回值
+            max_attempts: 失败文件的重试上限，未超过的失败文件恢复为待处理（None 表示保持原状态）
+        """
+        table = cls(item["path"] for item in items)
+        for item in items:
+            index = item["index"]
+            status = STATUS_NAMES.index(item["status"]) if item["status"] in STATUS_NAMES else PENDING
+            table._attempts[index] = min(item["attempts"], 0xFFFF)
+            if status == FAILED and max_attempts is not None and item["attempts"] < max_attempts:
+                status = PENDING
+            if status in (COMPLETED, FAILED) and item["result"] is not None:
+                table._finish(index, status, item["result"])
+        return table
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def path(self, index: int) -> str:
+        return self._paths[index]
+
+    def paths(self) -> List[str]:
+        """所有文件路径（副本）"""
+        with self._lock:
+            return list(self._paths)
+
+    def append(self, paths: List[str]) -> int:
+        """
+        追加待处理文件（文件夹任务边扫描边追加）
+
+        Returns:
+            第一个追加文件的序号
+        """
+        with self._lock:
+            start = len(self._paths)
+            self._paths.extend(paths)
+            self._status.extend(bytes(len(paths)))
+            self._attempts.frombytes(bytes(2 * len(paths)))
+            self._results.extend([None] * len(paths))
+            self._counts[PENDING] += len(paths)
+            return start
+
+    def status(self, index: int) -> str:
+        return STATUS_NAMES[self._status[index]]
+
+    def pending_indexes(self) -> List[int]:
+        """待处理文件的序号（按文件顺序）"""
+        with self._lock:
+            return [index for index, status in enumerate(self._status) if status == PENDING]
+
+    def mark_running(self, indexes: Iterable[int]):
+        """文件已提交识别"""
+        with self._lock:
+            for index in indexes:
+                self._set_status(index, RUNNING)
+
+    def mark_pending(self, indexes: Iterable[int]):
+        """已提交但未识别的文件（如任务停止）恢复为待处理"""
+        with self._lock:
+            for index in indexes:
+                if self._status[index] == RUNNING:
+                    self._set_status(index, PENDING)
+
+    def set_result(self, index: int, result: Dict[str, Any]) -> int:
+        """
+        记录识别结果
+
+        Returns:
+            结果在完成顺序中的位置（进度游标）
+        """
+        result["file_index"] = index
+        with self._lock:
+            self._attempts[index] = min(self._attempts[index] + 1, 0xFFFF)
+            return self._finish(index, COMPLETED if result.get("success") else FAILED, result)
+
+    def _finish(self, index: int, status: int, result: Dict[str, Any]) -> int:
+        result.setdefault("file_index", index)
+        self._set_status(index, status)
+        self._results[index] = result
+        self._done.append(index)
+        return len(self._done) - 1
+
+    def _set_status(self, index: int, status: int):
+        self._counts[self._status[index]] -= 1
+        self._counts[status] += 1
+        self._status[index] = status
+
+    @property
+    def done_count(self) -> int:
+        """已有结果的文件数"""
+        return len(self._done)
+
+    def counts(self) -> Dict[str, int]:
+        """各状态文件数"""
+        with self._lock:
+            return dict(zip(STATUS_NAMES, self._counts))
+
+    def page(self, since: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """按完成顺序返回第 since 条起的结果"""
+        with self._lock:
+            end = len(self._done) if limit is None else min(since + limit, len(self._done))
+            return [self._results[index] for index in self._done[since:end]]
+
+    def results(self) -> List[Dict[str, Any]]:
+        """所有已有结果（按文件顺序）"""
+        with self._lock:
+            return [result for result in self._results if result is not None]
+
+
+class JobRun:
+    """一个任务的运行状态（进度、结果和待识别文件）"""
+
+    def __init__(self, job: Dict[str, Any]):
+        self.job_id = job["job_id"]
+        self.device = job["device"]
+        self.speaker_diarization = job["speaker_diarization"]
+        self.priority = max(1, job.get("priority") or 1)
+        self.total = job["total"]
+        self.export_dir = job.get("export_dir")
+        self.export_formats = job.get("export_formats")
+        self.status = job["status"]
+        self.source = job.get("source")  # 文件夹任务的来源 {"folder", "filters"}
+
+        self.items = JobItemTable()  # 文件表，_prepare 时从任务存储加载
+        self.running_files = {}  # 已提交识别、尚未返回的文件 {文件序号: 文件名}，按提交顺序
+        self.started_at = None
+        self.finished_at = None
+        self.files_todo = 0
+        self.files_done = 0
+        self.audio_duration = 0.0
+        self.processed_duration = 0.0
+        self.export = None
+        self.error = None
+
+        self.ready = False  # 时长探测完成、可以调度
+        self.scanning = False  # 文件夹任务正在扫描，扫描结束前任务不会结束
+        self.stop_requested = False
+        self.pending = deque()  # 待提交的 [(文件序号, 时长)]，按调度顺序
+        self.in_flight = 0  # 已提交、尚未返回的文件组数
+        self.vruntime = 0.0  # 已分配的识别量（秒）/ 优先级，公平调度取最小者
+        self.exporter = None
+
+    @property
+    def is_processing(self) -> bool:
+        return self.status in ("pending", "running") and self.finished_at is None
+
+    @property
+    def current_files(self) -> list:
+        """正在识别的文件名（同一组的文件一起识别，可能有多个）"""
+        return list(self.running_files.values())
+
+    @property
+    def current_file(self) -> str:
+        """正在识别的文件的简要描述（如 "a.wav 等 4 个文件"）"""
+        names = self.current_files
+        if len(names) > 1:
+            return f"{names[0]} 等 {len(names)} 个文件"
+        return names[0] if names else ""
+
+    def progress_timing(self) -> dict:
+        """
+        本次运行的耗时统计
+
+        Returns:
+            elapsed: 已用时间（秒）
+            rtf: 实时率（墙钟耗时 / 已识别音频时长，多个任务同时执行时偏大）
+            eta_seconds: 预计剩余时间（秒），按剩余音频时长 × 实时率估算，时长未知时按文件数估算
+        """
+        if self.started_at is None:
+            return {"elapsed": None, "rtf": None, "eta_seconds": None}
+
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        processed = self.processed_duration
+        rtf = elapsed / processed if processed > 0 else None
+
+        eta = None
+        if self.is_processing:
+            if rtf is not None:
+                eta = max(0.0, self.audio_duration - processed) * rtf
+            elif self.files_done:
+                eta = elapsed / self.files_done * (self.files_todo - self.files_done)
+
+        return {
+            "elapsed": round(elapsed, 1),
+            "rtf": round(rtf, 3) if rtf is not None else None,
+            "eta_seconds": round(eta) if eta is not None else None,
+        }
+
+    def progress(self, since: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        增量进度：计数信息和序号不小于 since 的结果
+
+        Args:
+            since: 结果游标
+            limit: 本次最多返回的结果数（None 表示不限）
+        """
+        # 完成顺序只会追加，先取结果页再取计数，保证游标一致
+        page = self.items.page(since, limit)
+        next_index = since + len(page)
+        counts = self.items.counts()
+        completed_count = counts["completed"] + counts["failed"]
+
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "is_processing": self.is_processing,
+            "scanning": self.scanning,
+            "current_index": completed_count,
+            "total": self.total,
+            "current_file": self.current_file,
+            "current_files": self.current_files,
+            "device": self.device,
+            "speaker_diarization": self.speaker_diarization,
+            "priority": self.priority,
+            "completed_count": completed_count,
+            "counts": counts,
+            "queued_count": len(self.pending),
+            "audio_duration": round(self.audio_duration, 2),
+            "processed_duration": round(self.processed_duration, 2),
+            **self.progress_timing(),
+            "export": self.export,
+            "error": self.error,
+            "results": page,
+            "since": since,
+            "next_index": next_index,
+            "has_more": next_index < completed_count,
+        }
+
+
+class JobManager:
+    """
+    任务调度器
+
+    单个调度线程从所有可运行的任务中挑选文件组提交给共享的工作池：
+    每次选择 vruntime（已分配音频时长 / 优先级）最小的任务，优先级为 2 的任务获得的识别量约为优先级 1 的两倍；
+    新任务的 vruntime 从当前最小值开始，不会因为“欠账”长期独占工作池。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, group_size: Optional[int] = None):
+        """
+        Args:
+            max_workers: 识别进程数（默认使用 BATCH_CONFIG['max_workers']，1 表示在本进程内识别）
+            group_size: 每次提交的文件数（默认使用 BATCH_CONFIG['files_per_batch']）
+        """
+        if max_workers is None:
+            max_workers = BATCH_CONFIG['max_workers']
+        if group_size is None:
+            group_size = BATCH_CONFIG['files_per_batch']
+
+        self.max_workers = max(1, int(max_workers))
+        self.group_size = max(1, group_size)
+
+        self._runs = OrderedDict()  # job_id -> JobRun（执行中及最近结束的任务）
+        self._latest_id = None
+        self._lock = Lock()
+        self._wakeup = threading.Event()
+        self._scheduler = None
+        self._pool = None  # 多进程工作池（max_workers > 1）
+        self._local = None  # 本进程内识别的线程（max_workers == 1）
+        self.accepting = True  # 关闭服务时置为 False，不再接受新任务
+        self._draining = False  # 置为 True 后不再提交新的文件组
+        # 识别结果缓存的命中/未命中次数（缓存在识别子进程中查询，由返回结果的 cached 字段汇总）
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # ==================== 任务 ====================
+
+    def submit(self, job_id: str) -> JobRun:
+        """
+        开始（或继续）执行任务：已完成的文件直接跳过，待处理和失败（未超过重试次数）的文件重新识别
+
+        Raises:
+            KeyError: 任务不存在
+            ValueError: 任务已在执行中
+            RuntimeError: 服务正在关闭
+        """
+        if not self.accepting:
+            raise RuntimeError("服务正在关闭，暂不接受新任务")
+
+        store = get_job_store()
+        job = store.get_job(job_id)
+        if job is None:
+            raise KeyError(job_id)
+
+        with self._lock:
+            run = self._runs.get(job_id)
+            if run is not None and run.is_processing:
+                raise ValueError(f"任务 {job_id} 已在执行中")
+            job["status"] = "pending"
+            run = JobRun(job)
+            self._runs[job_id] = run
+            self._runs.move_to_end(job_id)
+            self._latest_id = job_id
+
+        threading.Thread(target=self._prepare, args=(run,), daemon=True).start()
+        return run
+
+    def submit_folder(
+        self,
+        folder_path: str,
+        filters: Optional[Dict[str, Any]] = None,
+        device: str = "cpu",
+        speaker_diarization: bool = False,
+        export_dir: Optional[str] = None,
+        export_formats: Optional[List[str]] = None,
+        priority: int = 1
+    ) -> JobRun:
+        """
+        创建并执行文件夹任务：在后台扫描文件夹，扫描到的文件分批进入识别队列，识别完成即导出
+
+        Args:
+            folder_path: 音频文件夹
+            filters: 筛选条件（见 folder_scanner.make_file_filter）
+            device: 设备类型
+            speaker_diarization: 是否启用说话人分离
+            export_dir: 导出目录（None 表示不导出）
+            export_formats: 导出格式（None 表示使用默认格式）
+            priority: 优先级（权重）
+
+        Raises:
+            FileNotFoundError: 文件夹不存在
+            ValueError: 筛选条件无效
+            RuntimeError: 服务正在关闭
+        """
+        if not self.accepting:
+            raise RuntimeError("服务正在关闭，暂不接受新任务")
+        if not os.path.isdir(folder_path):
+            raise FileNotFoundError(f"文件夹不存在: {folder_path}")
+        make_file_filter(folder_path, filters)
+
+        source = {"folder": os.path.abspath(folder_path), "filters": filters or {}}
+        job_id = get_job_store().create_job([], device, speaker_diarization, export_dir, export_formats, priority, source)
+        try:
+            return self.submit(job_id)
+        except RuntimeError:
+            get_job_store().set_job_status(job_id, "stopped")
+            raise
+
+    def _prepare(self, run: JobRun):
+        """读取任务记录、探测时长并排序，然后交给调度线程；文件夹任务随后继续扫描"""
+        try:
+            store = get_job_store()
+            # 已完成和失败次数达到上限的文件直接跳过，其余文件（重新）识别
+            run.items = JobItemTable.from_store(store.get_items(run.job_id), JOB_CONFIG['max_attempts'])
+            todo = run.items.pending_indexes()
+
+            # 按时长从长到短调度：长文件先开始，不会在最后只剩一个长文件占用时间；时长同时用于估算剩余时间和公平调度
+            durations = probe_durations([run.items.path(index) for index in todo])
+            order = sorted(range(len(todo)), key=lambda k: -(durations[k] or 0))
+
+            run.pending.extend((todo[k], durations[k]) for k in order)
+            run.files_todo = len(todo)
+            run.audio_duration = sum(d for d in durations if d)
+
+            # 识别完成即导出：之前运行已完成的结果只计入汇总
+            if run.export_dir:
+                run.exporter = BackgroundExporter(run.export_dir, run.export_formats)
+                run.export = {"output_dir": run.export_dir, "exported_count": 0, "summary_path": None}
+                for result in run.items.results():
+                    run.exporter.submit(result, write_file=False)
+
+            # 服务启动时模型在后台加载，加载完成后再开始识别（未启动预加载时直接返回）
+            readiness.wait()
+            if readiness.failed:
+                raise RuntimeError(f"模型加载失败: {readiness.error}")
+            run.started_at = time.time()
+
+            store.set_job_status(run.job_id, "running")
+            progress_events.publish("job_start", {
+                "job_id": run.job_id,
+                "total": run.total,
+                "completed_count": run.items.done_count,
+                "priority": run.priority,
+            })
+        except Exception as e:
+            print(f"任务 {run.job_id} 准备失败: {e}")
+            run.error = str(e)
+            run.stop_requested = True
+
+        with self._lock:
+            # 新任务从当前最小 vruntime 开始排队
+            active = [r.vruntime for r in self._runs.values() if r.ready and r.is_processing]
+            run.vruntime = min(active) if active else 0.0
+            run.status = "running"
+            run.scanning = bool(run.source) and run.error is None
+            run.ready = True
+
+        self._ensure_scheduler()
+        self._wakeup.set()
+
+        if run.scanning:
+            self._scan_source(run)
+
+    def _scan_source(self, run: JobRun):
+        """
+        扫描文件夹任务的来源目录，边扫描边追加文件
+
+        已在任务中的路径跳过（继续执行时重新扫描，只追加新出现的文件）。
+        工作池空闲时立即提交已扫描到的文件，否则攒满 JOB_CONFIG['scan_batch_size'] 个再按时长从长到短入队。
+        """
+        folder = run.source["folder"]
+        known = set(run.items.paths())
+        batch = []
+        scan = FolderScanner().iter_scan(folder)
+        try:
+            accept = make_file_filter(folder, run.source.get("filters"))
+            for info in scan:
+                if run.stop_requested or self._draining:
+                    break
+                if info["path"] in known or not accept(info):
+                    continue
+                known.add(info["path"])
+                batch.append(info)
+                if len(batch) >= JOB_CONFIG['scan_batch_size'] or not run.pending:
+                    self._enqueue_scanned(run, batch)
+                    batch = []
+
+            if batch and not (run.stop_requested or self._draining):
+                self._enqueue_scanned(run, batch)
+            print(f"任务 {run.job_id} 扫描完成: {folder}，共 {run.total} 个文件")
+        except Exception as e:
+            print(f"任务 {run.job_id} 扫描文件夹失败: {e}")
+            run.error = str(e)
+        finally:
+            scan.close()
+            run.scanning = False
+            self._wakeup.set()
+
+    def _enqueue_scanned(self, run: JobRun, batch: List[Dict[str, Any]]):
+        """保存一批扫描到的文件并加入调度队列"""
+        paths = [info["path"] for info in batch]
+        durations = [info.get("duration") for info in batch]
+        missing = [k for k, duration in enumerate(durations) if duration is None]
+        if missing:
+            for k, duration in zip(missing, probe_durations([paths[k] for k in missing])):
+                durations[k] = duration
+
+        get_job_store().add_items(run.job_id, paths)
+        start = run.items.append(paths)
+        order = sorted(range(len(paths)), key=lambda k: -(durations[k] or 0))
+
+        with self._lock:
+            run.pending.extend((start + k, durations[k]) for k in order)
+            run.total += len(paths)
+            run.files_todo += len(paths)
+            run.audio_duration += sum(d for d in durations if d)
+        self._wakeup.set()
+
+    def stop(self, job_id: str) -> bool:
+        """
+        停止任务：不再提交新的文件，已提交的文件识别完成后任务结束
+
+        Returns:
+            任务是否在执行中
+        """
+        with self._lock:
+            run = self._runs.get(job_id)
+            if run is None or not run.is_processing:
+                return False
+            run.stop_requested = True
+        self._wakeup.set()
+        return True
+
+    def get(self, job_id: str) -> Optional[JobRun]:
+        """获取任务状态，不在内存中的任务从数据库加载（只读）"""
+        with self._lock:
+            run = self._runs.get(job_id)
+        if run is not None:
+            return run
+
+        store = get_job_store()
+        job = store.get_job(job_id)
+        if job is None:
+            return None
+
+        run = JobRun(job)
+        run.items = JobItemTable.from_store(store.get_items(job_id))
+        run.finished_at = job["updated_at"]
+        with self._lock:
+            run = self._runs.setdefault(job_id, run)
+            self._trim_finished()
+        return run
+
+    def latest(self) -> Optional[JobRun]:
+        """最近提交的任务"""
+        with self._lock:
+            return self._runs.get(self._latest_id) if self._latest_id else None
+
+    def active(self) -> List[JobRun]:
+        """执行中的任务"""
+        with self._lock:
+            return [run for run in self._runs.values() if run.is_processing]
+
+    def queue_depth(self) -> int:
+        """所有执行中的任务尚未识别完成的文件数"""
+        total = 0
+        for run in self.active():
+            counts = run.items.counts()
+            total += counts["pending"] + counts["running"]
+        return total
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        关闭前排空：不再接受新任务，等待执行中的任务完成
+
+        超时后不再提交新的文件组，只等待已提交的文件识别完成并保存；
+        未完成的任务在数据库中保持 running 状态，下次启动时自动继续。
+
+        Args:
+            timeout: 等待任务完成的最长时间（秒），None 表示一直等待
+
+        Returns:
+            所有任务是否都已完成
+        """
+        self.accepting = False
+        deadline = None if timeout is None else time.time() + timeout
+
+        while self.active() and (deadline is None or time.time() < deadline):
+            time.sleep(0.5)
+
+        completed = not self.active()
+        if not completed:
+            self._draining = True
+            self._wakeup.set()
+            while True:
+                with self._lock:
+                    if not any(run.in_flight for run in self._runs.values()):
+                        break
+                time.sleep(0.2)
+
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+        if self._local is not None:
+            self._local.shutdown(wait=True)
+        return completed
+
+    def _trim_finished(self):
+        """只在内存中保留最近结束的若干任务（调用方持有锁）"""
+        finished = [job_id for job_id, run in self._runs.items() if not run.is_processing]
+        for job_id in finished[:max(0, len(finished) - JOB_CONFIG['max_recent_jobs'])]:
+            if job_id != self._latest_id:
+                del self._runs[job_id]
+
+    # ==================== 调度 ====================
+
+    def _ensure_scheduler(self):
+        with self._lock:
+            if self._scheduler is None or not self._scheduler.is_alive():
+                self._scheduler = threading.Thread(target=self._schedule_loop, daemon=True)
+                self._scheduler.start()
+
+    def _pick_group(self):
+        """
+        选择下一组要识别的文件（公平调度）
+
+        Returns:
+            (JobRun, [(文件记录, 时长), ...])，没有可调度的文件时返回 None
+        """
+        if self._draining:
+            return None
+
+        with self._lock:
+            candidates = [
+                run for run in self._runs.values()
+                if run.ready and run.pending and not run.stop_requested
+            ]
+            if not candidates:
+                return None
+
+            run = min(candidates, key=lambda r: r.vruntime)
+            group = [run.pending.popleft() for _ in range(min(self.group_size, len(run.pending)))]
+            run.items.mark_running(index for index, _ in group)
+            cost = sum(duration or JOB_CONFIG['unknown_duration_s'] for _, duration in group)
+            run.vruntime += cost / run.priority
+            run.in_flight += 1
+            return run, group
+
+    def _get_pool(self, device: str = "cpu", enable_speaker_diarization: bool = False) -> ASRWorkerPool:
+        """共享的多进程工作池（首次调用时按给定配置创建，子进程启动时加载该配置的模型）"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ASRWorkerPool(device, enable_speaker_diarization, self.max_workers)
+            return self._pool
+
+    def warm_up(self) -> int:
+        """
+        预先加载识别模型（服务启动时在后台调用）
+
+        模型加载在实际执行识别的进程中：多进程识别时启动工作池并等待各子进程加载完成，
+        否则在本进程内加载。
+
+        Returns:
+            已加载模型的进程数
+        """
+        if self.max_workers > 1:
+            pool = self._get_pool()
+            try:
+                workers = pool.warm_up()
+                pool.poll_status()
+                return workers
+            except Exception:
+                # 子进程加载失败后进程池不可再用，下次提交时重新创建
+                with self._lock:
+                    if self._pool is pool:
+                        self._pool = None
+                pool.shutdown(wait=False)
+                raise
+
+        from backend.asr_engine import get_asr_engine
+        get_asr_engine()
+        return 1
+
+    def model_stats(self) -> Dict[str, Any]:
+        """
+        识别进程的模型池统计（多进程识别时汇总各子进程上报的状态）
+
+        Returns:
+            {"load_count", "eviction_count", "pipelines": [{"device", "speaker_diarization", "memory_mb", "loaded_at", "pid"}]}
+        """
+        if self.max_workers > 1:
+            pool = self._pool
+            workers = list(pool.poll_status().values()) if pool is not None else []
+        else:
+            from backend.model_registry import get_model_registry
+            registry = get_model_registry()
+            workers = [{
+                "pid": os.getpid(),
+                "load_count": registry.load_count,
+                "eviction_count": registry.eviction_count,
+                "pipelines": registry.loaded(),
+            }]
+
+        return {
+            "load_count": sum(worker["load_count"] for worker in workers),
+            "eviction_count": sum(worker["eviction_count"] for worker in workers),
+            "pipelines": [
+                {**pipeline, "pid": worker["pid"]}
+                for worker in workers for pipeline in worker["pipelines"]
+            ],
+        }
+
+    def _submit_group(self, run: JobRun, paths: list) -> Future:
+        """提交到共享工作池"""
+        if self.max_workers > 1:
+            return self._get_pool(run.device, run.speaker_diarization).submit(paths, run.device, run.speaker_diarization)
+
+        if self._local is None:
+            self._local = ThreadPoolExecutor(max_workers=1)
+        return self._local.submit(_transcribe_local, paths, run.device, run.speaker_diarization)
+
+    def _schedule_loop(self):
+        """调度线程：保持工作池满载，结果返回后写入对应任务"""
+        window = self.max_workers * 2
+        in_flight = {}  # Future -> (JobRun, 文件组)
+
+        while True:
+            # 补充在途任务
+            while len(in_flight) < window:
+                picked = self._pick_group()
+                if picked is None:
+                    break
+                run, group = picked
+                # 组内文件一起识别：每个文件各推送一次开始事件，current_file 描述所有在识别的文件
+                for index, _ in group:
+                    run.running_files[index] = os.path.basename(run.items.path(index))
+                for index, _ in group:
+                    progress_events.publish("file_start", {
+                        "job_id": run.job_id,
+                        "current_index": run.items.done_count,
+                        "total": run.total,
+                        "file": run.running_files[index],
+                        "current_file": run.current_file,
+                    })
+                try:
+                    future = self._submit_group(run, [run.items.path(index) for index, _ in group])
+                except Exception as e:
+                    future = Future()
+                    future.set_exception(e)
+                in_flight[future] = (run, group)
+
+            # 已停止任务中尚未开始的文件组直接取消（文件保持待处理状态，可继续执行）
+            for future, (run, _) in in_flight.items():
+                if run.stop_requested:
+                    future.cancel()
+
+            self._finish_idle_runs()
+
+            if not in_flight:
+                self._wakeup.wait(timeout=1.0)
+                self._wakeup.clear()
+                continue
+
+            done, _ = wait(list(in_flight), timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                run, group = in_flight.pop(future)
+                if future.cancelled():
+                    for index, _ in group:
+                        run.running_files.pop(index, None)
+                    run.items.mark_pending(index for index, _ in group)
+                    with self._lock:
+                        run.in_flight -= 1
+                    continue
+                try:
+                    group_results = future.result()
+                except Exception as e:
+                    group_results = [_failed_result(run.items.path(index), e) for index, _ in group]
+
+                for (index, duration), result in zip(group, group_results):
+                    try:
+                        self._complete_item(run, index, duration, result)
+                    except Exception as e:
+                        print(f"保存识别结果失败 {run.items.path(index)}: {e}")
+                with self._lock:
+                    run.in_flight -= 1
+
+            # 汇总子进程上报的模型加载（按需加载其他配置的流水线时）
+            if done and self._pool is not None:
+                self._pool.poll_status()
+
+    def _complete_item(self, run: JobRun, index: int, duration: Optional[float], result: Dict[str, Any]):
+        """保存单个文件的识别结果并推送进度"""
+        if duration is not None:
+            result.setdefault("duration", duration)
+        position = run.items.set_result(index, result)
+        run.running_files.pop(index, None)
+        get_job_store().save_result(run.job_id, index, result)
+
+        if run.exporter:
+            run.exporter.submit(result)
+            run.export["exported_count"] = run.exporter.exported_count
+
+        run.processed_duration += duration or 0
+        run.files_done += 1
+
+        record_timings(result.get("timings"))
+        if result.get("cached"):
+            self.cache_hits += 1
+        elif CACHE_CONFIG['enabled']:
+            self.cache_misses += 1
+        metrics.inc("asr_files_total", help_text="已识别的文件数", status="success" if result.get("success") else "failed")
+        metrics.observe("asr_file_seconds", result.get("process_time", 0), "单个文件识别耗时（秒）")
+        if duration:
+            metrics.inc("asr_audio_seconds_total", duration, "已识别的音频时长（秒）")
+
+        progress_events.publish("file_done" if result.get("success") else "file_error", {
+            "job_id": run.job_id,
+            "index": position,
+            "total": run.total,
+            "result": result,
+            **run.progress_timing(),
+        })
+
+    def _finish_idle_runs(self):
+        """结束没有待识别文件（或已请求停止）且没有在途文件组的任务"""
+        with self._lock:
+            finished = [
+                run for run in self._runs.values()
+                if run.ready and run.is_processing and run.in_flight == 0 and not run.scanning
+                and (not run.pending or run.stop_requested)
+            ]
+
+        for run in finished:
+            completed = not run.pending and run.files_done >= run.files_todo and run.error is None
+            status = "completed" if completed else "stopped"
+            run.pending.clear()
+            if run.exporter:
+                try:
+                    run.export = run.exporter.close()
+                except Exception as e:
+                    print(f"任务 {run.job_id} 导出失败: {e}")
+            get_job_store().set_job_status(run.job_id, status)
+            run.status = status
+            run.finished_at = time.time()
+            progress_events.publish("job_done", {
+                "job_id": run.job_id,
+                "status": status,
+                "total": run.total,
+                "completed_count": run.items.done_count,
+                "export": run.export,
+                **run.progress_timing(),
+            })
+
+        if finished:
+            with self._lock:
+                self._trim_finished()
+            if not self.active():
+                progress_events.publish("idle", {})
+
+
+def _transcribe_local(audio_paths: list, device: str, enable_speaker_diarization: bool) -> list:
+    """在本进程内跨文件批量识别一组文件"""
+    from backend.asr_engine import get_asr_engine
+    return get_asr_engine(device=device, enable_speaker_diarization=enable_speaker_diarization).transcribe_batch(audio_paths)
+
+
+# 全局任务调度器
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = Lock()
+
+
+def get_job_manager() -> JobManager:
+    """获取任务调度器单例"""
+    global _job_manager
+    if _job_manager is None:
+        with _job_manager_lock:
+            if _job_manager is None:
+                _job_manager = JobManager()
+    return _job_manager
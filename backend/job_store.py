@@ -0,0 +1,257 @@
+"""
+任务持久化模块
+使用 SQLite（WAL 模式）保存批量识别任务，每个文件一行，服务重启后可断点续跑
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+from threading import Lock
+from typing import Optional, Dict, Any, List
+
+from backend.utils.config import JOB_CONFIG
+
+# 任务状态: pending, running, completed, stopped
+# 文件状态: pending, completed, failed
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    device TEXT NOT NULL,
+    speaker_diarization INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    export_dir TEXT,
+    export_formats TEXT,
+    priority INTEGER NOT NULL DEFAULT 1,
+    source TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS idx_job_items_status ON job_items (job_id, status);
+"""
+
+
+class JobStore:
+    """批量识别任务存储"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        初始化任务存储
+
+        Args:
+            db_path: 数据库文件路径（默认使用 JOB_CONFIG['db_path']）
+        """
+        if db_path is None:
+            db_path = JOB_CONFIG['db_path']
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self._lock = Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # 旧版数据库缺少的列
+        columns = [row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+        for column, definition in (
+            ("export_dir", "TEXT"),
+            ("export_formats", "TEXT"),
+            ("priority", "INTEGER NOT NULL DEFAULT 1"),
+            ("source", "TEXT"),
+        ):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+        self._conn.commit()
+
+    def create_job(
+        self,
+        audio_paths: List[str],
+        device: str = "cpu",
+        speaker_diarization: bool = False,
+        export_dir: Optional[str] = None,
+        export_formats: Optional[List[str]] = None,
+        priority: int = 1,
+        source: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        创建任务
+
+        Args:
+            audio_paths: 音频文件路径列表
+            device: 设备类型
+            speaker_diarization: 是否启用说话人分离
+            export_dir: 识别完成即导出的目录（None 表示不自动导出）
+            export_formats: 自动导出的格式（None 表示使用默认格式）
+            priority: 优先级（权重），多个任务同时执行时按权重分配识别资源
+            source: 文件来源（文件夹任务为 {"folder": 文件夹路径, "filters": 筛选条件}），
+                任务执行时扫描该文件夹并用 add_items 追加文件
+
+        Returns:
+            任务 ID
+        """
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, device, speaker_diarization, total, export_dir, export_formats, "
+                "priority, source, created_at, updated_at) VALUES (?, 'pending', ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, device, int(speaker_diarization), len(audio_paths), export_dir,
+                 ",".join(export_formats) if export_formats else None, priority,
+                 json.dumps(source, ensure_ascii=False) if source else None, now, now)
+            )
+            self._conn.executemany(
+                "INSERT INTO job_items (job_id, idx, path, status, updated_at) VALUES (?, ?, ?, 'pending', ?)",
+                [(job_id, i, path, now) for i, path in enumerate(audio_paths)]
+            )
+
+        return job_id
+
+    def add_items(self, job_id: str, audio_paths: List[str]) -> int:
+        """
+        向任务追加文件（序号接在已有文件之后）
+
+        Args:
+            job_id: 任务 ID
+            audio_paths: 音频文件路径列表
+
+        Returns:
+            第一个追加文件的序号
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            start = self._conn.execute("SELECT total FROM jobs WHERE job_id = ?", (job_id,)).fetchone()[0]
+            self._conn.executemany(
+                "INSERT INTO job_items (job_id, idx, path, status, updated_at) VALUES (?, ?, ?, 'pending', ?)",
+                [(job_id, start + i, path, now) for i, path in enumerate(audio_paths)]
+            )
+            self._conn.execute(
+                "UPDATE jobs SET total = ?, updated_at = ? WHERE job_id = ?",
+                (start + len(audio_paths), now, job_id)
+            )
+        return start
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务信息及各状态文件数"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            counts = self._conn.execute(
+                "SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall()
+
+        job = self._row_to_job(row)
+        job["counts"] = {status: count for status, count in counts}
+        return job
+
+    def list_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """按创建时间倒序列出任务"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def get_items(self, job_id: str) -> List[Dict[str, Any]]:
+        """
+        获取任务的所有文件记录（按文件顺序）
+
+        Returns:
+            [{"index", "path", "status", "attempts", "result"}, ...]
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx, path, status, attempts, result FROM job_items WHERE job_id = ? ORDER BY idx",
+                (job_id,)
+            ).fetchall()
+
+        return [{
+            "index": row["idx"],
+            "path": row["path"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+        } for row in rows]
+
+    def get_resumable_jobs(self) -> List[str]:
+        """获取中断（服务崩溃或重启时仍在运行）的任务 ID，按创建时间排序"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id FROM jobs WHERE status IN ('pending', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [row["job_id"] for row in rows]
+
+    def set_job_status(self, job_id: str, status: str):
+        """更新任务状态"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+                (status, time.time(), job_id)
+            )
+
+    def save_result(self, job_id: str, index: int, result: Dict[str, Any]):
+        """
+        保存单个文件的识别结果
+
+        Args:
+            job_id: 任务 ID
+            index: 文件在任务中的序号
+            result: 识别结果字典
+        """
+        status = "completed" if result.get("success") else "failed"
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE job_items SET status = ?, attempts = attempts + 1, result = ?, updated_at = ? "
+                "WHERE job_id = ? AND idx = ?",
+                (status, json.dumps(result, ensure_ascii=False), time.time(), job_id, index)
+            )
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "job_id": row["job_id"],
+            "status": row["status"],
+            "device": row["device"],
+            "speaker_diarization": bool(row["speaker_diarization"]),
+            "total": row["total"],
+            "export_dir": row["export_dir"],
+            "export_formats": row["export_formats"].split(",") if row["export_formats"] else None,
+            "priority": row["priority"],
+            "source": json.loads(row["source"]) if row["source"] else None,
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+
+# 全局任务存储实例
+_job_store: Optional[JobStore] = None
+_job_store_lock = Lock()
+
+
+def get_job_store() -> JobStore:
+    """获取任务存储单例"""
+    global _job_store
+    if _job_store is None:
+        with _job_store_lock:
+            if _job_store is None:
+                _job_store = JobStore()
+    return _job_store
@@ -0,0 +1,147 @@
+"""
+运行指标模块
+收集各阶段耗时直方图和计数器，按 Prometheus 文本格式输出（/metrics）
+"""
+import os
+import sys
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, Any, Callable, List, Tuple
+
+# 耗时直方图的默认分桶（秒）
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """直方图 + 计数器 + 渲染时采集的仪表"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._histograms = {}  # 名称 -> (说明, 分桶, {标签: [各桶计数, 总和, 次数]})
+        self._counters = {}  # 名称 -> (说明, {标签: 数值})
+        self._gauges = []  # [(名称, 说明, 采集函数)]
+
+    def observe(self, name: str, value: float, help_text: str = "", buckets=DEFAULT_BUCKETS, **labels):
+        """记录一次直方图观测值"""
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            _, bucket_bounds, series = self._histograms.setdefault(name, (help_text, tuple(buckets), {}))
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [[0] * len(bucket_bounds), 0.0, 0]
+            index = bisect_left(bucket_bounds, value)
+            if index < len(bucket_bounds):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def inc(self, name: str, amount: float = 1, help_text: str = "", **labels):
+        """计数器加一（或 amount）"""
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            _, series = self._counters.setdefault(name, (help_text, {}))
+            series[key] = series.get(key, 0) + amount
+
+    def register_gauge(self, name: str, help_text: str, collect: Callable[[], Any]):
+        """
+        注册仪表，输出时调用 collect 取值
+
+        Args:
+            collect: 返回数值，或 [(标签字典, 数值), ...]；返回 None 时跳过
+        """
+        with self._lock:
+            self._gauges = [g for g in self._gauges if g[0] != name]
+            self._gauges.append((name, help_text, collect))
+
+    def render(self) -> str:
+        """Prometheus 文本格式"""
+        lines = []
+
+        with self._lock:
+            histograms = {
+                name: (help_text, bounds, {key: (list(s[0]), s[1], s[2]) for key, s in series.items()})
+                for name, (help_text, bounds, series) in self._histograms.items()
+            }
+            counters = {name: (help_text, dict(series)) for name, (help_text, series) in self._counters.items()}
+            gauges = list(self._gauges)
+
+        for name, (help_text, bounds, series) in sorted(histograms.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, (counts, total, count) in sorted(series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(bounds, counts):
+                    cumulative += bucket_count
+                    le = 'le="%s"' % _format_value(bound)
+                    lines.append(f"{name}_bucket{_format_labels(key, le)} {cumulative}")
+                le = 'le="+Inf"'
+                lines.append(f"{name}_bucket{_format_labels(key, le)} {count}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(round(total, 6))}")
+                lines.append(f"{name}_count{_format_labels(key)} {count}")
+
+        for name, (help_text, series) in sorted(counters.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+        for name, help_text, collect in gauges:
+            try:
+                value = collect()
+            except Exception as e:
+                print(f"采集指标 {name} 失败: {e}")
+                continue
+            if value is None:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            samples: List[Tuple[Dict[str, Any], float]] = value if isinstance(value, list) else [({}, value)]
+            for labels, sample in samples:
+                key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+                lines.append(f"{name}{_format_labels(key)} {_format_value(sample)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def process_rss_bytes():
+    """当前进程的常驻内存（字节），无法获取时返回 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    # 非 Linux 平台退回峰值内存（Windows 上没有 resource 模块）
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def record_timings(timings: Dict[str, float]):
+    """把识别结果中的分阶段耗时计入直方图"""
+    for stage, seconds in (timings or {}).items():
+        metrics.observe("asr_stage_seconds", seconds, "各阶段耗时（秒）", stage=stage)
+
+
+# 全局指标
+metrics = MetricsRegistry()
+metrics.register_gauge("process_resident_memory_bytes", "进程常驻内存（字节）", process_rss_bytes)
+_started_at = time.time()
+metrics.register_gauge("process_uptime_seconds", "进程运行时间（秒）", lambda: round(time.time() - _started_at, 1))
@@ -0,0 +1,325 @@
+"""
+子模型组件模块
+ASR、VAD、标点和说话人模型按设备只加载一次，识别流水线由这些组件组合而成
+"""
+import os
+import copy
+import json
+import time
+import hashlib
+import tempfile
+from threading import Lock
+from typing import Optional, Dict, Any, Tuple, Iterable
+
+from backend.utils.config import ASR_MODEL_CONFIG, MODEL_LOAD_CONFIG
+from backend.metrics import metrics
+
+
+def get_auto_model():
+    """
+    导入 funasr.AutoModel
+
+    funasr 会连带导入 torch，耗时数秒到数十秒，因此只在第一次加载模型时导入，
+    服务和命令行工具启动时不受影响。
+
+    Raises:
+        RuntimeError: funasr 未安装
+    """
+    try:
+        from funasr import AutoModel
+    except ImportError:
+        raise RuntimeError("funasr 库未安装，请先安装: pip install funasr")
+    return AutoModel
+
+
+def _torch_modules(component) -> Iterable[Tuple[str, Any]]:
+    """组件中带参数的子模型 (属性名, 模块)"""
+    names = ("spk_model", "cb_model") if isinstance(component, dict) else ("model", "vad_model", "punc_model", "spk_model")
+    for attr in names:
+        module = component.get(attr) if isinstance(component, dict) else getattr(component, attr, None)
+        if hasattr(module, "state_dict") and hasattr(module, "load_state_dict"):
+            yield attr, module
+
+
+def _write_atomic(path: str, write):
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def map_module_weights(module, path: str):
+    """
+    把模块参数换成映射权重缓存文件的张量
+
+    缓存文件不存在或与模块的参数名、形状、类型不一致时先由当前参数生成。
+    映射的页面由操作系统页缓存提供，多个识别进程加载同一模型时共享同一份物理内存，
+    原先各进程私有的参数副本随之释放。
+
+    Args:
+        module: torch.nn.Module（CPU 上）
+        path: 缓存文件路径
+    """
+    import torch
+
+    state = module.state_dict()
+    if not state:
+        return
+    signature = {key: [list(value.shape), str(value.dtype)] for key, value in state.items()}
+    signature_path = path + ".json"
+
+    cached_signature = None
+    if os.path.exists(path) and os.path.exists(signature_path):
+        try:
+            with open(signature_path, "r", encoding="utf-8") as f:
+                cached_signature = json.load(f)
+        except ValueError:
+            pass
+
+    if cached_signature != signature:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tensors = {key: value.detach().cpu().contiguous() for key, value in state.items()}
+        _write_atomic(path, lambda temp_path: torch.save(tensors, temp_path))
+
+        def write_signature(temp_path):
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(signature, f)
+        _write_atomic(signature_path, write_signature)
+
+    mapped = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    module.load_state_dict(mapped, assign=True)
+
+
+def _checkpoint_identity(component, attr: str) -> list:
+    """
+    子模型权重文件的身份 [[路径, 修改时间, 大小], ...]
+
+    取 FunASR 解析出的权重文件（init_param），没有时取模型目录（model_path）下的文件；
+    重新下载或更新模型后身份变化，对应的权重缓存随之重建。
+    """
+    kwargs_attr = {"model": "kwargs", "vad_model": "vad_kwargs", "punc_model": "punc_kwargs", "spk_model": "spk_kwargs"}.get(attr)
+    if kwargs_attr is None:
+        return []
+    kwargs = component.get(kwargs_attr) if isinstance(component, dict) else getattr(component, kwargs_attr, None)
+    kwargs = kwargs or {}
+
+    paths = kwargs.get("init_param") or kwargs.get("model_path")
+    if not paths:
+        return []
+    files = []
+    for path in (paths if isinstance(paths, (list, tuple)) else [paths]):
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, entry) for entry in os.listdir(path)))
+        else:
+            files.append(path)
+
+    identity = []
+    for path in files:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            identity.append([os.path.abspath(path), stat.st_mtime_ns, stat.st_size])
+    return identity
+
+
+def _remove_stale_weights(prefix: str, keep: str):
+    """删除同一子模型旧的权重缓存（其他进程仍在映射时删除失败，下次再删）"""
+    weights_dir = os.path.dirname(keep)
+    for entry in os.listdir(weights_dir):
+        path = os.path.join(weights_dir, entry)
+        if entry.startswith(prefix) and path not in (keep, keep + ".json"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _map_component_weights(name: str, device: str, component):
+    """按 MODEL_LOAD_CONFIG['mmap_weights'] 把 CPU 组件的参数映射到权重缓存（失败时保留原参数）"""
+    if not MODEL_LOAD_CONFIG['mmap_weights'] or device != "cpu":
+        return
+
+    for attr, module in _torch_modules(component):
+        # 模型配置或权重文件变化时使用新的缓存文件
+        identity = {"config": ASR_MODEL_CONFIG, "checkpoint": _checkpoint_identity(component, attr)}
+        key = hashlib.sha1(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        prefix = f"{name}-{attr}-"
+        path = os.path.join(MODEL_LOAD_CONFIG['weights_dir'], f"{prefix}{key}.pt")
+        try:
+            map_module_weights(module, path)
+            _remove_stale_weights(prefix, path)
+        except Exception as e:
+            print(f"权重缓存不可用，使用常规加载的参数 ({name}.{attr}): {e}")
+
+
+class ModelComponents:
+    """
+    可复用的子模型缓存
+
+    - base:    ASR + VAD + 标点，封装在一个 AutoModel 中
+    - speaker: 说话人嵌入模型（cam++）及聚类后端
+
+    启用说话人分离的流水线是 base 的浅拷贝再挂上 speaker 组件，
+    因此两种流水线同时存在时只多占用说话人模型的内存。
+    """
+
+    def __init__(self):
+        self._components = {}  # (组件名, 设备) -> 组件
+        self._lock = Lock()
+        self._load_locks = {}
+        # 每次加载的 {"component", "device", "seconds"}，识别子进程据此向服务进程上报加载耗时
+        self.load_history = []
+
+    def _get(self, name: str, device: str, loader):
+        key = (name, device)
+        with self._lock:
+            if key in self._components:
+                return self._components[key]
+            load_lock = self._load_locks.setdefault(key, Lock())
+
+        with load_lock:
+            with self._lock:
+                if key in self._components:
+                    return self._components[key]
+
+            start_time = time.time()
+            component = loader(device)
+            _map_component_weights(name, device, component)
+            load_time = time.time() - start_time
+            print(f"子模型 {name} 加载完成 (设备: {device}), 耗时: {load_time:.2f} 秒")
+            metrics.observe("asr_model_load_seconds", load_time, "子模型加载耗时（秒）", component=name, device=device)
+
+            with self._lock:
+                self._components[key] = component
+                self.load_history.append({"component": name, "device": device, "seconds": load_time})
+        return component
+
+    def get_base(self, device: str):
+        """获取 ASR + VAD + 标点 组件"""
+        return self._get("base", device, self._load_base)
+
+    def get_speaker(self, device: str) -> Dict[str, Any]:
+        """获取说话人分离组件"""
+        return self._get("speaker", device, self._load_speaker)
+
+    def compose(self, device: str, enable_speaker_diarization: bool = False):
+        """
+        组合识别流水线
+
+        Args:
+            device: 设备类型，"cpu" 或 "cuda"（调用方需已确认可用）
+            enable_speaker_diarization: 是否启用说话人分离
+
+        Returns:
+            可直接调用 generate 的 AutoModel
+        """
+        base = self.get_base(device)
+        if not enable_speaker_diarization:
+            return base
+
+        try:
+            speaker = self.get_speaker(device)
+        except Exception as e:
+            # 当前 funasr 版本不支持单独构建说话人模型时，退回加载完整流水线
+            print(f"单独加载说话人模型失败，改为加载完整流水线: {e}")
+            return self._get("full_speaker", device, self._load_full_speaker)
+
+        pipeline = copy.copy(base)
+        # 配置字典各自独立，避免 generate 时互相修改
+        pipeline.kwargs = dict(base.kwargs)
+        pipeline.vad_kwargs = dict(base.vad_kwargs)
+        pipeline.punc_kwargs = dict(base.punc_kwargs)
+        pipeline.spk_model = speaker["spk_model"]
+        pipeline.spk_kwargs = dict(speaker["spk_kwargs"])
+        pipeline.cb_model = speaker["cb_model"]
+        pipeline.spk_mode = speaker["spk_mode"]
+        return pipeline
+
+    def component_keys(self, device: str, enable_speaker_diarization: bool) -> Tuple[Tuple[str, str], ...]:
+        """流水线依赖的组件"""
+        if enable_speaker_diarization:
+            return ("base", device), ("speaker", device), ("full_speaker", device)
+        return (("base", device),)
+
+    def prune(self, in_use: Iterable[Tuple[str, str]]):
+        """
+        释放不再被任何流水线使用的组件
+
+        Args:
+            in_use: 仍在使用的组件键
+        """
+        in_use = set(in_use)
+        with self._lock:
+            for key in [key for key in self._components if key not in in_use]:
+                del self._components[key]
+                print(f"释放子模型 {key[0]} (设备: {key[1]})")
+
+    @staticmethod
+    def _model_kwargs(device: str) -> Dict[str, Any]:
+        model_kwargs = {"disable_update": True}
+        # 只有在设备是 cuda 时才添加 device 参数
+        if device == "cuda":
+            model_kwargs["device"] = "cuda"
+        return model_kwargs
+
+    @staticmethod
+    def _load_base(device: str):
+        """加载 ASR + VAD + 标点"""
+        AutoModel = get_auto_model()
+        return AutoModel(
+            model=ASR_MODEL_CONFIG['model_name'],
+            vad_model=ASR_MODEL_CONFIG['vad_model'],
+            punc_model=ASR_MODEL_CONFIG['punc_model'],
+            **ModelComponents._model_kwargs(device)
+        )
+
+    @staticmethod
+    def _load_full_speaker(device: str):
+        """加载包含说话人模型的完整流水线（后备方案）"""
+        AutoModel = get_auto_model()
+        return AutoModel(
+            model=ASR_MODEL_CONFIG['model_name'],
+            vad_model=ASR_MODEL_CONFIG['vad_model'],
+            punc_model=ASR_MODEL_CONFIG['punc_model'],
+            spk_model=ASR_MODEL_CONFIG['spk_model'],
+            **ModelComponents._model_kwargs(device)
+        )
+
+    @staticmethod
+    def _load_speaker(device: str) -> Dict[str, Any]:
+        """只加载说话人嵌入模型和聚类后端，不重复加载 ASR/VAD/标点"""
+        AutoModel = get_auto_model()
+        from funasr.models.campplus.cluster_backend import ClusterBackend
+
+        torch_device = "cuda" if device == "cuda" else "cpu"
+        spk_model, spk_kwargs = AutoModel.build_model(
+            model=ASR_MODEL_CONFIG['spk_model'],
+            device=torch_device,
+            disable_update=True,
+        )
+
+        return {
+            "spk_model": spk_model,
+            "spk_kwargs": spk_kwargs,
+            "cb_model": ClusterBackend().to(torch_device),
+            "spk_mode": "punc_segment",
+        }
+
+
+# 全局子模型缓存
+_model_components: Optional[ModelComponents] = None
+_components_lock = Lock()
+
+
+def get_model_components() -> ModelComponents:
+    """获取子模型缓存单例"""
+    global _model_components
+    if _model_components is None:
+        with _components_lock:
+            if _model_components is None:
+                _model_components = ModelComponents()
+    return _model_components
@@ -0,0 +1,168 @@
+"""
+模型池模块
+按 (设备, 是否说话人分离) 缓存多个已加载的识别流水线，切换配置时无需重新加载
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Dict, Any, Tuple, List
+
+from backend.asr_engine import ASREngine, module_memory_bytes
+from backend.model_components import get_model_components
+from backend.utils.config import MODEL_POOL_CONFIG
+
+
+class ModelRegistry:
+    """识别流水线池（LRU 淘汰）"""
+
+    def __init__(self, max_models: Optional[int] = None, memory_budget_mb: Optional[int] = None):
+        """
+        初始化模型池
+
+        Args:
+            max_models: 同时保留的流水线数量上限（默认使用 MODEL_POOL_CONFIG['max_models']）
+            memory_budget_mb: 模型参数占用的内存上限（MB，0 表示不限制）
+        """
+        if max_models is None:
+            max_models = MODEL_POOL_CONFIG['max_models']
+        if memory_budget_mb is None:
+            memory_budget_mb = MODEL_POOL_CONFIG['memory_budget_mb']
+
+        self.max_models = max(1, max_models)
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.load_count = 0
+        self.eviction_count = 0
+
+        self._engines = OrderedDict()  # (device, speaker_diarization) -> ASREngine
+        self._lock = Lock()
+        self._load_locks = {}
+
+    def get(self, device: str = "cpu", enable_speaker_diarization: bool = False) -> ASREngine:
+        """
+        获取流水线，未加载时加载（同一配置只会加载一次）
+
+        Args:
+            device: 设备类型，"cpu" 或 "cuda"
+            enable_speaker_diarization: 是否启用说话人分离
+
+        Returns:
+            ASR 引擎实例
+        """
+        key = (device, bool(enable_speaker_diarization))
+
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is not None:
+                self._engines.move_to_end(key)
+                return engine
+            load_lock = self._load_locks.setdefault(key, Lock())
+
+        with load_lock:
+            # 等待期间可能已被其他线程加载
+            with self._lock:
+                engine = self._engines.get(key)
+                if engine is not None:
+                    self._engines.move_to_end(key)
+                    return engine
+                # 先按数量上限腾出位置，避免新旧模型同时占用内存；新流水线要用到的子模型保留
+                incoming = get_model_components().component_keys(device, enable_speaker_diarization)
+                while len(self._engines) >= self.max_models:
+                    self._evict_oldest(keep_components=incoming)
+
+            engine = ASREngine(device=device, enable_speaker_diarization=enable_speaker_diarization)
+
+            with self._lock:
+                self._engines[key] = engine
+                self.load_count += 1
+                self._enforce_memory_budget(keep=key)
+
+        return engine
+
+    def peek(self, device: Optional[str] = None, enable_speaker_diarization: Optional[bool] = None) -> Optional[ASREngine]:
+        """
+        查找已加载的流水线，不会触发加载
+
+        Args:
+            device: 设备类型（None 表示任意）
+            enable_speaker_diarization: 是否启用说话人分离（None 表示任意）
+
+        Returns:
+            最近使用的匹配流水线，没有时返回 None
+        """
+        with self._lock:
+            for (key_device, key_speaker), engine in reversed(self._engines.items()):
+                if device is not None and key_device != device:
+                    continue
+                if enable_speaker_diarization is not None and key_speaker != bool(enable_speaker_diarization):
+                    continue
+                return engine
+        return None
+
+    def loaded(self) -> List[Dict[str, Any]]:
+        """已加载的流水线列表（最近使用的在前）"""
+        with self._lock:
+            items = list(reversed(self._engines.items()))
+
+        return [{
+            "device": engine._device,
+            "speaker_diarization": key[1],
+            "memory_mb": round(engine.memory_bytes() / (1024 * 1024), 1),
+            "loaded_at": engine.loaded_at,
+        } for key, engine in items]
+
+    def evict(self, device: str, enable_speaker_diarization: bool) -> bool:
+        """卸载指定流水线"""
+        with self._lock:
+            engine = self._engines.pop((device, bool(enable_speaker_diarization)), None)
+            if engine is None:
+                return False
+            self._release(engine)
+        return True
+
+    def _evict_oldest(self, keep: Optional[Tuple[str, bool]] = None, keep_components=()):
+        """淘汰最久未使用的流水线（调用方需持有锁）"""
+        key = next(k for k in self._engines if k != keep)
+        engine = self._engines.pop(key)
+        self.eviction_count += 1
+        print(f"卸载模型 (设备: {key[0]}, 说话人分离: {key[1]})")
+        self._release(engine, keep_components)
+
+    def _enforce_memory_budget(self, keep: Tuple[str, bool]):
+        """超出内存预算时淘汰其他流水线（调用方需持有锁）"""
+        if not self.memory_budget:
+            return
+        while len(self._engines) > 1 and self._total_memory_bytes() > self.memory_budget:
+            self._evict_oldest(keep=keep)
+
+    def _total_memory_bytes(self) -> int:
+        """已加载流水线的参数内存，共享的子模型只计算一次（调用方需持有锁）"""
+        return module_memory_bytes(m for engine in self._engines.values() for m in engine.modules())
+
+    def _release(self, engine: ASREngine, keep_components=()):
+        """
+        释放流水线及不再被其他流水线使用的子模型（调用方需持有锁）
+        正在使用它的批处理仍持有引用，结束后才会真正释放内存
+        """
+        in_use = [key for e in self._engines.values() for key in e.component_keys]
+        get_model_components().prune(in_use + list(keep_components))
+
+        if engine._device == "cuda":
+            try:
+                import torch
+                torch.cuda.empty_cache()
+            except ImportError:
+                pass
+
+
+# 全局模型池
+_model_registry: Optional[ModelRegistry] = None
+_registry_lock = Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """获取模型池单例"""
+    global _model_registry
+    if _model_registry is None:
+        with _registry_lock:
+            if _model_registry is None:
+                _model_registry = ModelRegistry()
+    return _model_registry
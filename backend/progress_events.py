@@ -0,0 +1,111 @@
+"""
+进度事件模块
+把批量识别过程中的事件推送给订阅者（Server-Sent Events）
+"""
+import json
+import queue
+from threading import Lock
+from typing import Dict, Any, Iterator, Optional
+
+from backend.utils.config import PROGRESS_CONFIG
+
+
+class ProgressEventBroker:
+    """进度事件广播器：每个订阅者一个队列"""
+
+    def __init__(self, queue_size: Optional[int] = None):
+        """
+        初始化广播器
+
+        Args:
+            queue_size: 每个订阅者的事件队列长度（默认使用 PROGRESS_CONFIG['event_queue_size']）
+        """
+        if queue_size is None:
+            queue_size = PROGRESS_CONFIG['event_queue_size']
+
+        self._queue_size = queue_size
+        self._subscribers = {}  # 队列 -> 只接收该任务事件的任务 ID（None 表示全部）
+        self._lock = Lock()
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        """
+        发布事件
+
+        队列已满的订阅者（客户端消费过慢）会被断开，由客户端重连后通过 /api/progress 补齐。
+
+        Args:
+            event: 事件类型，如 file_start, file_done, job_done
+            data: 事件数据（含 job_id 时只推送给订阅了该任务或全部任务的订阅者）
+        """
+        message = f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        job_id = data.get("job_id")
+
+        with self._lock:
+            subscribers = [
+                subscriber for subscriber, subscribed_job in self._subscribers.items()
+                if job_id is None or subscribed_job is None or subscribed_job == job_id
+            ]
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                self._drop(subscriber)
+
+    def subscribe(self, heartbeat_s: Optional[float] = None, job_id: Optional[str] = None) -> Iterator[str]:
+        """
+        订阅事件流
+
+        Args:
+            heartbeat_s: 无事件时发送心跳注释的间隔（秒）
+            job_id: 只接收该任务的事件（不带任务 ID 的事件如 idle 仍会收到），None 表示全部任务
+
+        Yields:
+            SSE 格式的消息
+        """
+        if heartbeat_s is None:
+            heartbeat_s = PROGRESS_CONFIG['heartbeat_s']
+
+        subscriber = queue.Queue(maxsize=self._queue_size)
+        with self._lock:
+            self._subscribers[subscriber] = job_id
+
+        try:
+            # 通知客户端连接已建立，可以补拉错过的结果
+            yield "event: connected\ndata: {}\n\n"
+            while True:
+                try:
+                    message = subscriber.get(timeout=heartbeat_s)
+                except queue.Empty:
+                    yield ": ping\n\n"
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self._drop(subscriber)
+
+    def _drop(self, subscriber: queue.Queue):
+        """移除订阅者，并尽量唤醒其生成器使其退出"""
+        with self._lock:
+            self._subscribers.pop(subscriber, None)
+        while True:
+            try:
+                subscriber.put_nowait(None)
+                return
+            except queue.Full:
+                # 丢弃积压的事件，给结束标记腾出位置
+                try:
+                    subscriber.get_nowait()
+                except queue.Empty:
+                    pass
+
+    @property
+    def subscriber_count(self) -> int:
+        """当前订阅者数量"""
+        with self._lock:
+            return len(self._subscribers)
+
+
+# 全局进度事件广播器
+progress_events = ProgressEventBroker()
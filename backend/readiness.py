@@ -0,0 +1,103 @@
+"""
+服务就绪状态模块
+HTTP 服务先启动，模型在后台线程加载；加载完成前页面、扫描、任务查询等接口照常响应，
+提交的识别任务在加载完成后才开始调度（见 JobManager._prepare）
+"""
+import time
+import threading
+from threading import Lock
+from typing import Callable, Dict, Any, Optional
+
+# 状态: starting（尚未开始加载）, loading, ready, failed
+STARTING, LOADING, READY, FAILED = "starting", "loading", "ready", "failed"
+
+
+class ServiceReadiness:
+    """模型后台加载及就绪状态"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.state = STARTING
+        self.error = None
+        self.load_started_at = None
+        self.ready_at = None
+        self._lock = Lock()
+        self._thread = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    @property
+    def failed(self) -> bool:
+        return self.state == FAILED
+
+    @property
+    def loading(self) -> bool:
+        """模型是否还在（等待）加载"""
+        return self.state in (STARTING, LOADING)
+
+    def start(self, loader: Callable[[], None]) -> Optional[threading.Thread]:
+        """
+        在后台线程中加载模型（只执行一次）
+
+        Args:
+            loader: 加载函数，抛出异常时状态为 failed
+
+        Returns:
+            加载线程，已开始加载时返回 None
+        """
+        with self._lock:
+            if self._thread is not None:
+                return None
+            self._thread = threading.Thread(target=self._run, args=(loader,), daemon=True)
+            self.state = LOADING
+            self.load_started_at = time.time()
+
+        self._thread.start()
+        return self._thread
+
+    def _run(self, loader: Callable[[], None]):
+        try:
+            loader()
+        except Exception as e:
+            self.error = str(e)
+            self.state = FAILED
+        else:
+            self.state = READY
+        finally:
+            self.ready_at = time.time()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待加载结束，返回是否就绪"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.ready
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        就绪状态
+
+        Returns:
+            ready: 模型是否已加载
+            state: starting / loading / ready / failed
+            error: 加载失败的原因
+            uptime: 进程启动后的时间（秒）
+            load_seconds: 模型加载耗时（秒，未结束时为已用时间）
+        """
+        load_seconds = None
+        if self.load_started_at is not None:
+            load_seconds = round((self.ready_at or time.time()) - self.load_started_at, 2)
+
+        return {
+            "ready": self.ready,
+            "state": self.state,
+            "error": self.error,
+            "uptime": round(time.time() - self.started_at, 2),
+            "load_seconds": load_seconds,
+        }
+
+
+# 全局就绪状态
+readiness = ServiceReadiness()
@@ -1,25 +1,284 @@
 """
 结果导出模块
-将识别结果保存为 Markdown 文件
+将识别结果保存为 Markdown 文件，以及 SRT/VTT 字幕、JSONL 和 Parquet 等便于程序处理的格式
 """
 import os
+import json
+import time
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List
+from threading import Lock
+from typing import Dict, Any, List, Optional, Iterable
+
+from backend.metrics import metrics
+from backend.utils.config import OUTPUT_DIR, EXPORT_CONFIG
+
+
+def write_atomic(output_path: str, content: str):
+    """
+    原子写入文本文件：先写入同目录下的临时文件，再重命名覆盖目标文件
+    进程中途退出时不会留下写了一半的文件
+
+    Args:
+        output_path: 目标文件路径
+        content: 文件内容
+    """
+    directory = os.path.dirname(output_path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def unique_file_name(prefix: str, extension: str) -> str:
+    """
+    生成不会与其他导出重名的文件名：时间戳 + 随机后缀
+    同一秒内结束的多个任务（或同一输出目录下的多个进程）不会互相覆盖
+
+    Args:
+        prefix: 文件名前缀，如 "summary"
+        extension: 扩展名，如 ".md"
+
+    Returns:
+        如 summary_20240101_120000_1a2b3c4d.md
+    """
+    return f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}{extension}"
+
+
+class SummaryWriter:
+    """
+    增量写入汇总文件
+
+    结果列表边产生边写入磁盘上的临时文件，内存中只保留统计数；
+    close 时写出统计信息并把结果列表接在后面，原子替换为最终文件。
+    """
+
+    def __init__(self, output_dir: str = None):
+        """
+        Args:
+            output_dir: 输出目录（默认使用配置的输出目录）
+        """
+        if output_dir is None:
+            output_dir = OUTPUT_DIR
 
-from backend.utils.config import OUTPUT_DIR
+        os.makedirs(output_dir, exist_ok=True)
+
+        self.output_path = os.path.join(output_dir, unique_file_name("summary", ".md"))
+        # 先以独占方式创建占位文件，close 时原子替换；文件名已存在时报错而不是覆盖
+        open(self.output_path, 'x').close()
+        self.total = 0
+        self.success_count = 0
+        self.total_time = 0.0
+
+        self._body = tempfile.TemporaryFile('w+', encoding='utf-8')
+
+    def add(self, result: Dict[str, Any]):
+        """追加一条识别结果"""
+        self.total += 1
+        self.total_time += result.get("process_time", 0)
+
+        audio_name = os.path.basename(result.get("audio_path", ""))
+        status = "✅ 成功" if result.get("success") else "❌ 失败"
+
+        parts = [f"### {self.total}. {audio_name}\n\n", f"**状态**: {status}\n\n"]
+        if result.get("success"):
+            self.success_count += 1
+            text = result.get("text", "")
+            parts.append(f"**识别内容**: {text[:100]}{'...' if len(text) > 100 else ''}\n\n")
+        else:
+            parts.append(f"**错误信息**: {result.get('error', '')}\n\n")
+        parts.append("---\n\n")
+
+        self._body.write("".join(parts))
+
+    def close(self) -> str:
+        """
+        写出汇总文件
+
+        Returns:
+            汇总文件路径
+        """
+        total = self.total
+        failed_count = total - self.success_count
+        header = f"""# 批量识别汇总报告
+
+**生成时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+## 统计信息
+
+- **总文件数**: {total}
+- **成功识别**: {self.success_count}
+- **识别失败**: {failed_count}
+- **总耗时**: {self.total_time:.2f} 秒
+- **平均耗时**: {self.total_time / total if total > 0 else 0:.2f} 秒/文件
+
+## 识别结果列表
+
+"""
+
+        directory = os.path.dirname(self.output_path)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(header)
+                self._body.seek(0)
+                shutil.copyfileobj(self._body, f)
+            os.replace(temp_path, self.output_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        finally:
+            self._body.close()
+
+        return self.output_path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._body.close()
+            try:
+                os.remove(self.output_path)
+            except OSError:
+                pass
+
+
+class JsonlWriter:
+    """JSONL 导出：每个文件一行完整的识别结果 JSON，结果到达即追加写入"""
+
+    def __init__(self, output_dir: str):
+        self.output_path = os.path.join(output_dir, unique_file_name("results", ".jsonl"))
+        self._file = open(self.output_path, 'x', encoding='utf-8')
+
+    def add(self, result: Dict[str, Any]):
+        """追加一条识别结果"""
+        self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> str:
+        self._file.close()
+        return self.output_path
+
+
+def _require_pyarrow():
+    """导入 pyarrow（Parquet 导出的可选依赖）"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet 导出需要安装 pyarrow: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+class ParquetWriter:
+    """
+    Parquet 导出：每个文件一行，按行组分批写入临时文件，close 时原子重命名
+
+    列: audio_path, success, text, error, process_time, duration, speaker_count,
+        sentences（list<struct<start, end, text, speaker>>，毫秒）, timings（map<string, double>）
+    """
+
+    def __init__(self, output_dir: str, row_group_size: Optional[int] = None):
+        pa, pq = _require_pyarrow()
+        if row_group_size is None:
+            row_group_size = EXPORT_CONFIG['parquet_row_group']
+
+        self._pa = pa
+        self._schema = pa.schema([
+            ("audio_path", pa.string()),
+            ("success", pa.bool_()),
+            ("text", pa.string()),
+            ("error", pa.string()),
+            ("process_time", pa.float64()),
+            ("duration", pa.float64()),
+            ("speaker_count", pa.int32()),
+            ("sentences", pa.list_(pa.struct([
+                ("start", pa.int64()),
+                ("end", pa.int64()),
+                ("text", pa.string()),
+                ("speaker", pa.string()),
+            ]))),
+            ("timings", pa.map_(pa.string(), pa.float64())),
+        ])
+        self._row_group_size = max(1, row_group_size)
+        self._rows = []
+
+        self.output_path = os.path.join(output_dir, unique_file_name("results", ".parquet"))
+        # 先以独占方式创建占位文件，close 时用临时文件原子替换
+        open(self.output_path, 'x').close()
+        fd, self._temp_path = tempfile.mkstemp(dir=output_dir, prefix=".", suffix=".tmp")
+        os.close(fd)
+        self._writer = pq.ParquetWriter(self._temp_path, self._schema)
+
+    def add(self, result: Dict[str, Any]):
+        """追加一条识别结果，攒满一个行组后写入"""
+        self._rows.append({
+            "audio_path": result.get("audio_path", ""),
+            "success": bool(result.get("success")),
+            "text": result.get("text", ""),
+            "error": result.get("error") or None,
+            "process_time": float(result.get("process_time", 0)),
+            "duration": result.get("duration"),
+            "speaker_count": result.get("speaker_count"),
+            "sentences": [{
+                "start": int(round(sentence.get("start", 0))),
+                "end": int(round(sentence.get("end", 0))),
+                "text": sentence.get("text", ""),
+                "speaker": None if sentence.get("speaker") is None else str(sentence["speaker"]),
+            } for sentence in result.get("sentences") or []],
+            "timings": list((result.get("timings") or {}).items()),
+        })
+        if len(self._rows) >= self._row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+    def close(self) -> str:
+        try:
+            self._flush()
+            self._writer.close()
+            os.replace(self._temp_path, self.output_path)
+        except BaseException:
+            for path in (self._temp_path, self.output_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            raise
+        return self.output_path
 
 
 class ResultExporter:
     """结果导出器"""
 
     @staticmethod
-    def export_to_markdown(result: Dict[str, Any], output_dir: str = None) -> str:
+    def export_to_markdown(result: Dict[str, Any], output_dir: str = None, generated_at: str = None) -> str:
         """
         将单个识别结果导出为 Markdown 文件
 
         Args:
             result: 识别结果字典
             output_dir: 输出目录（默认使用配置的输出目录）
+            generated_at: 识别时间文本（批量导出时共用同一个时间）
 
         Returns:
             导出文件的完整路径
@@ -30,53 +289,101 @@ class ResultExporter:
         # 确保输出目录存在
         os.makedirs(output_dir, exist_ok=True)
 
+        return ResultExporter._write_markdown(result, output_dir, generated_at)
+
+    @staticmethod
+    def _write_markdown(result: Dict[str, Any], output_dir: str, generated_at: str = None) -> str:
+        """生成并原子写入单个 Markdown 文件（调用方需确保目录存在）"""
+        return ResultExporter._write_file(result, output_dir, "markdown", generated_at)
+
+    @staticmethod
+    def _write_file(result: Dict[str, Any], output_dir: str, fmt: str, generated_at: str = None) -> Optional[str]:
+        """
+        按单文件格式（见 FILE_FORMATS）生成并原子写入导出文件（调用方需确保目录存在）
+
+        Returns:
+            导出文件路径；结果没有可导出的内容（如字幕缺少时间戳）时返回 None
+        """
+        extension, formatter = FILE_FORMATS[fmt]
+        content = formatter(result, generated_at)
+        if content is None:
+            return None
+
         # 获取音频文件名（不含扩展名）
         audio_name = os.path.splitext(os.path.basename(result["audio_path"]))[0]
 
-        # 生成输出文件名
-        output_filename = f"{audio_name}.md"
-        output_path = os.path.join(output_dir, output_filename)
+        # 生成输出文件名并写入
+        output_path = os.path.join(output_dir, f"{audio_name}{extension}")
+        write_atomic(output_path, content)
 
-        # 构建 Markdown 内容
-        content = ResultExporter._format_markdown(result)
+        return output_path
 
-        # 写入文件
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+    @staticmethod
+    def export(
+        results: Iterable[Dict[str, Any]],
+        output_dir: str = None,
+        formats: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        按指定格式导出识别结果
 
-        return output_path
+        Args:
+            results: 识别结果列表
+            output_dir: 输出目录
+            formats: 导出格式（见 EXPORT_FORMATS，默认使用 EXPORT_CONFIG['formats']）
+
+        Returns:
+            同 BackgroundExporter.close
+        """
+        exporter = BackgroundExporter(output_dir, formats)
+        for result in results:
+            exporter.submit(result)
+        return exporter.close()
 
     @staticmethod
-    def export_batch(results: List[Dict[str, Any]], output_dir: str = None) -> List[str]:
+    def export_batch(
+        results: Iterable[Dict[str, Any]],
+        output_dir: str = None,
+        max_workers: Optional[int] = None
+    ) -> List[str]:
         """
-        批量导出识别结果
+        批量导出识别结果（线程池并行写入）
 
         Args:
             results: 识别结果列表
             output_dir: 输出目录
+            max_workers: 写文件的线程数（默认使用 EXPORT_CONFIG['max_workers']）
 
         Returns:
-            导出文件路径列表
+            导出文件路径列表（与成功结果的顺序一致）
         """
-        output_paths = []
+        if output_dir is None:
+            output_dir = OUTPUT_DIR
+        if max_workers is None:
+            max_workers = EXPORT_CONFIG['max_workers']
 
-        for result in results:
-            if result.get("success") and result.get("text"):
-                try:
-                    output_path = ResultExporter.export_to_markdown(result, output_dir)
-                    output_paths.append(output_path)
-                except Exception as e:
-                    print(f"导出失败 {result.get('audio_path')}: {e}")
+        os.makedirs(output_dir, exist_ok=True)
+        generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        def export_one(result):
+            try:
+                return ResultExporter._write_markdown(result, output_dir, generated_at)
+            except Exception as e:
+                print(f"导出失败 {result.get('audio_path')}: {e}")
+                return None
 
-        return output_paths
+        to_export = (r for r in results if r.get("success") and r.get("text"))
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            return [path for path in executor.map(export_one, to_export) if path is not None]
 
     @staticmethod
-    def _format_markdown(result: Dict[str, Any]) -> str:
+    def _format_markdown(result: Dict[str, Any], generated_at: str = None) -> str:
         """
         格式化为 Markdown 内容
 
         Args:
             result: 识别结果
+            generated_at: 识别时间文本（默认为当前时间）
 
         Returns:
             Markdown 格式的字符串
@@ -88,98 +395,129 @@ class ResultExporter:
         error = result.get("error", "")
         speaker_diarization_enabled = result.get("speaker_diarization_enabled", False)
 
+        if generated_at is None:
+            generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
         # 获取文件信息
         audio_name = os.path.basename(audio_path)
 
+        # 各段内容先放入列表，最后一次性拼接
+        parts = ["# 音频识别结果\n\n", f"**文件名**: {audio_name}\n", f"**文件路径**: {audio_path}\n"]
+
         # 如果有错误，显示错误信息
         if not success:
-            content = "# 音频识别结果\n\n"
-            content += f"**文件名**: {audio_name}\n"
-            content += f"**文件路径**: {audio_path}\n"
-            content += "**识别状态**: 失败\n"
-            content += f"**识别时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            content += "## 错误信息\n\n"
-            content += f"{error}\n"
-        else:
-            # 获取文件大小
+            parts.append("**识别状态**: 失败\n")
+            parts.append(f"**识别时间**: {generated_at}\n\n")
+            parts.append("## 错误信息\n\n")
+            parts.append(f"{error}\n")
+            return "".join(parts)
+
+        # 获取文件大小（一次 stat 调用）
+        try:
+            file_size = ResultExporter._format_size(os.stat(audio_path).st_size)
+        except OSError:
             file_size = "未知"
-            if os.path.exists(audio_path):
-                size_bytes = os.path.getsize(audio_path)
-                file_size = ResultExporter._format_size(size_bytes)
-
-            content = "# 音频识别结果\n\n"
-            content += f"**文件名**: {audio_name}\n"
-            content += f"**文件路径**: {audio_path}\n"
-            content += f"**文件大小**: {file_size}\n"
-            content += "**识别状态**: 成功\n"
-            content += f"**识别时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-            content += f"**处理耗时**: {process_time} 秒\n\n"
-
-            # 如果启用了说话人分离
-            if speaker_diarization_enabled and result.get("sentences"):
-                sentences = result.get("sentences", [])
-                speakers = result.get("speakers", [])
-                speaker_count = result.get("speaker_count", 0)
-
-                # 确保 speakers 都是字符串
-                speakers = [str(s) for s in speakers]
-
-                content += f"**说话人数量**: {speaker_count}\n"
-                content += f"**说话人**: {', '.join(speakers)}\n\n"
-                content += "---\n\n"
-                content += "## 识别文本（按说话人标注）\n\n"
-
-                # 创建说话人名称映射
-                speaker_names = {}
-                for i, spk in enumerate(speakers):
-                    speaker_names[str(spk)] = f"说话人{chr(65 + i)}"  # 说话人A, 说话人B, ...
-
-                # 按时间顺序输出，每句话标注说话人
-                for sentence in sentences:
-                    speaker = str(sentence.get("speaker", "unknown"))
-                    speaker_name = speaker_names.get(speaker, speaker)
-                    start_time = sentence.get("start", 0) / 1000
-                    end_time = sentence.get("end", 0) / 1000
-                    sentence_text = sentence.get("text", "")
-
-                    time_range = "({:.1f}s - {:.1f}s)".format(start_time, end_time)
-                    content += "**[{}]** {}\n\n{}\n\n".format(speaker_name, time_range, sentence_text)
-
-                content += "---\n\n"
-                content += "## 按说话人分类\n\n"
-
-                # 按说话人分组
-                speaker_text = {}
-                for sentence in sentences:
-                    speaker = str(sentence.get("speaker", "unknown"))
-                    if speaker not in speaker_text:
-                        speaker_text[speaker] = []
-                    speaker_text[speaker].append(sentence)
-
-                # 输出每个说话人的内容
-                for speaker, speaker_sentences in speaker_text.items():
-                    speaker_name = speaker_names.get(speaker, speaker)
-                    content += f"### {speaker_name}\n\n"
-
-                    for sentence in speaker_sentences:
-                        start_time = sentence.get("start", 0) / 1000
-                        end_time = sentence.get("end", 0) / 1000
-                        sentence_text = sentence.get("text", "")
-                        content += f"[{start_time:.1f}s - {end_time:.1f}s] {sentence_text}\n\n"
-
-                content += "---\n\n"
-                content += "## 完整文本\n\n"
-                content += f"{text}\n\n"
-                content += "---\n\n"
-                content += "*本文件由 Fun-ASR 语音识别系统自动生成（含说话人分离）*\n"
-            else:
-                # 没有说话人分离，直接输出文本
-                content += "## 识别文本\n\n"
-                content += f"{text}\n\n"
-                content += "---\n\n"
-                content += "*本文件由 Fun-ASR 语音识别系统自动生成*\n"
 
-        return content
+        parts.append(f"**文件大小**: {file_size}\n")
+        parts.append("**识别状态**: 成功\n")
+        parts.append(f"**识别时间**: {generated_at}\n")
+        parts.append(f"**处理耗时**: {process_time} 秒\n\n")
+
+        # 如果启用了说话人分离
+        if speaker_diarization_enabled and result.get("sentences"):
+            sentences = result.get("sentences", [])
+            # 确保 speakers 都是字符串
+            speakers = [str(s) for s in result.get("speakers", [])]
+            speaker_count = result.get("speaker_count", 0)
+
+            parts.append(f"**说话人数量**: {speaker_count}\n")
+            parts.append(f"**说话人**: {', '.join(speakers)}\n\n")
+            parts.append("---\n\n")
+            parts.append("## 识别文本（按说话人标注）\n\n")
+
+            # 创建说话人名称映射
+            speaker_names = {}
+            for i, spk in enumerate(speakers):
+                speaker_names[spk] = f"说话人{chr(65 + i)}"  # 说话人A, 说话人B, ...
+
+            # 按时间顺序输出，每句话标注说话人，同时按说话人分组
+            speaker_text = {}
+            for sentence in sentences:
+                speaker = str(sentence.get("speaker", "unknown"))
+                speaker_name = speaker_names.get(speaker, speaker)
+                start_time = sentence.get("start", 0) / 1000
+                end_time = sentence.get("end", 0) / 1000
+                sentence_text = sentence.get("text", "")
+
+                parts.append(f"**[{speaker_name}]** ({start_time:.1f}s - {end_time:.1f}s)\n\n{sentence_text}\n\n")
+                speaker_text.setdefault(speaker, []).append(
+                    f"[{start_time:.1f}s - {end_time:.1f}s] {sentence_text}\n\n"
+                )
+
+            parts.append("---\n\n")
+            parts.append("## 按说话人分类\n\n")
+
+            # 输出每个说话人的内容
+            for speaker, lines in speaker_text.items():
+                parts.append(f"### {speaker_names.get(speaker, speaker)}\n\n")
+                parts.extend(lines)
+
+            parts.append("---\n\n")
+            parts.append("## 完整文本\n\n")
+            parts.append(f"{text}\n\n")
+            parts.append("---\n\n")
+            parts.append("*本文件由 Fun-ASR 语音识别系统自动生成（含说话人分离）*\n")
+        else:
+            # 没有说话人分离，直接输出文本
+            parts.append("## 识别文本\n\n")
+            parts.append(f"{text}\n\n")
+            parts.append("---\n\n")
+            parts.append("*本文件由 Fun-ASR 语音识别系统自动生成*\n")
+
+        return "".join(parts)
+
+    @staticmethod
+    def _format_subtitles(result: Dict[str, Any], fmt: str) -> Optional[str]:
+        """
+        根据 sentences 的起止时间（毫秒）生成 SRT 或 WebVTT 字幕
+        没有 sentences 时用整段文本生成一条覆盖全部时长的字幕；时长也未知时返回 None
+
+        Args:
+            result: 识别结果
+            fmt: "srt" 或 "vtt"
+
+        Returns:
+            字幕文本
+        """
+        if not result.get("success") or not result.get("text"):
+            return None
+
+        cues = [s for s in result.get("sentences") or [] if s.get("text")]
+        if not cues:
+            if not result.get("duration"):
+                return None
+            cues = [{"start": 0, "end": result["duration"] * 1000, "text": result["text"]}]
+
+        # 与 Markdown 一致的说话人名称
+        speaker_names = {str(spk): f"说话人{chr(65 + i)}" for i, spk in enumerate(result.get("speakers", []))}
+        separator = "," if fmt == "srt" else "."
+
+        def timestamp(ms):
+            ms = max(0, int(round(ms)))
+            return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}{separator}{ms % 1000:03d}"
+
+        parts = [] if fmt == "srt" else ["WEBVTT\n\n"]
+        for i, cue in enumerate(cues, 1):
+            text = cue["text"]
+            if cue.get("speaker") is not None:
+                speaker = str(cue["speaker"])
+                speaker_name = speaker_names.get(speaker, speaker)
+                text = f"[{speaker_name}] {text}" if fmt == "srt" else f"<v {speaker_name}>{text}"
+            if fmt == "srt":
+                parts.append(f"{i}\n")
+            parts.append(f"{timestamp(cue.get('start', 0))} --> {timestamp(cue.get('end', 0))}\n{text}\n\n")
+
+        return "".join(parts)
 
     @staticmethod
     def _format_size(size_bytes: int) -> str:
@@ -191,9 +529,9 @@ class ResultExporter:
         return f"{size_bytes:.2f} TB"
 
     @staticmethod
-    def create_summary(results: List[Dict[str, Any]], output_dir: str = None) -> str:
+    def create_summary(results: Iterable[Dict[str, Any]], output_dir: str = None) -> str:
         """
-        创建批量识别汇总文件
+        创建批量识别汇总文件（边遍历边写入磁盘，不在内存中拼接整份内容）
 
         Args:
             results: 所有识别结果
@@ -202,52 +540,158 @@ class ResultExporter:
         Returns:
             汇总文件路径
         """
+        with SummaryWriter(output_dir) as writer:
+            for result in results:
+                writer.add(result)
+        return writer.output_path
+
+
+def check_formats(formats: List[str]) -> List[str]:
+    """
+    校验导出格式
+
+    Returns:
+        去重后的格式列表
+
+    Raises:
+        ValueError: 不支持的格式
+        ImportError: 格式依赖的可选库未安装
+    """
+    formats = list(dict.fromkeys(formats))
+    unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if unknown or not formats:
+        raise ValueError(f"不支持的导出格式: {', '.join(unknown)}（可选: {', '.join(EXPORT_FORMATS)}）")
+    if "parquet" in formats:
+        _require_pyarrow()
+    return formats
+
+
+class BackgroundExporter:
+    """
+    识别过程中的后台导出
+
+    每个结果识别完成后提交进来，单文件格式（Markdown、字幕）由线程池写入，
+    汇总文件、JSONL、Parquet 由单独的线程按提交顺序追加，导出与识别重叠进行；
+    close 时等待全部写完并生成汇总文件。
+    """
+
+    def __init__(self, output_dir: str = None, formats: Optional[List[str]] = None, max_workers: Optional[int] = None):
+        """
+        Args:
+            output_dir: 输出目录（默认使用配置的输出目录）
+            formats: 导出格式（见 EXPORT_FORMATS，默认使用 EXPORT_CONFIG['formats']）；包含 markdown 时同时生成汇总文件
+            max_workers: 写单文件格式的线程数（默认使用 EXPORT_CONFIG['max_workers']）
+        """
         if output_dir is None:
             output_dir = OUTPUT_DIR
+        if max_workers is None:
+            max_workers = EXPORT_CONFIG['max_workers']
 
-        os.makedirs(output_dir, exist_ok=True)
-
-        output_path = os.path.join(output_dir, f"summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md")
-
-        # 统计信息
-        total = len(results)
-        success_count = sum(1 for r in results if r.get("success"))
-        failed_count = total - success_count
-        total_time = sum(r.get("process_time", 0) for r in results)
+        self.formats = check_formats(formats or EXPORT_CONFIG['formats'])
+        self.output_dir = output_dir
+        self.counts = {fmt: 0 for fmt in self.formats}  # 本次写出的结果数
+        self.already_exported_count = 0  # 之前已导出过单文件格式、本次不再写出的结果数
+        self.failed_count = 0
 
-        content = f"""# 批量识别汇总报告
-
-**生成时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-## 统计信息
-
-- **总文件数**: {total}
-- **成功识别**: {success_count}
-- **识别失败**: {failed_count}
-- **总耗时**: {total_time:.2f} 秒
-- **平均耗时**: {total_time / total if total > 0 else 0:.2f} 秒/文件
-
-## 识别结果列表
-
-"""
-
-        for i, result in enumerate(results, 1):
-            audio_name = os.path.basename(result.get("audio_path", ""))
-            status = "✅ 成功" if result.get("success") else "❌ 失败"
-            text = result.get("text", "")
-            error = result.get("error", "")
+        os.makedirs(output_dir, exist_ok=True)
 
-            content += f"### {i}. {audio_name}\n\n"
-            content += f"**状态**: {status}\n\n"
+        self._file_formats = [fmt for fmt in self.formats if fmt in FILE_FORMATS]
+        self._summary = SummaryWriter(output_dir) if "markdown" in self.formats else None
+        self._streams = {fmt: STREAM_FORMATS[fmt](output_dir) for fmt in self.formats if fmt in STREAM_FORMATS}
+        self._generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._lock = Lock()
+        self._file_executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        self._stream_executor = ThreadPoolExecutor(max_workers=1)  # 单线程，保证汇总和 JSONL 等的条目顺序
+
+    @property
+    def exported_count(self) -> int:
+        """第一个导出格式的结果数（单文件格式包含之前已导出的结果）"""
+        fmt = self.formats[0]
+        if fmt in FILE_FORMATS:
+            return self.counts[fmt] + self.already_exported_count
+        return self.counts[fmt]
+
+    def submit(self, result: Dict[str, Any], write_file: bool = True):
+        """
+        提交一个识别结果（立即返回）
 
-            if result.get("success"):
-                content += f"**识别内容**: {text[:100]}{'...' if len(text) > 100 else ''}\n\n"
+        Args:
+            result: 识别结果字典
+            write_file: 是否写出单文件格式（False 时只写入汇总、JSONL 等，用于已导出过的结果）
+        """
+        if self._summary or self._streams:
+            self._stream_executor.submit(self._append, result)
+        if self._file_formats and result.get("success") and result.get("text"):
+            if write_file:
+                self._file_executor.submit(self._export_one, result)
             else:
-                content += f"**错误信息**: {error}\n\n"
-
-            content += "---\n\n"
-
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+                with self._lock:
+                    self.already_exported_count += 1
+
+    def _append(self, result: Dict[str, Any]):
+        if self._summary:
+            self._summary.add(result)
+        for fmt, writer in self._streams.items():
+            try:
+                writer.add(result)
+            except Exception as e:
+                print(f"导出 {fmt} 失败 {result.get('audio_path')}: {e}")
+                with self._lock:
+                    self.failed_count += 1
+                continue
+            with self._lock:
+                self.counts[fmt] += 1
+
+    def _export_one(self, result: Dict[str, Any]):
+        start_time = time.time()
+        for fmt in self._file_formats:
+            try:
+                output_path = ResultExporter._write_file(result, self.output_dir, fmt, self._generated_at)
+            except Exception as e:
+                print(f"导出失败 {result.get('audio_path')}: {e}")
+                with self._lock:
+                    self.failed_count += 1
+                continue
+            if output_path:
+                with self._lock:
+                    self.counts[fmt] += 1
+
+        metrics.observe("asr_stage_seconds", time.time() - start_time, "各阶段耗时（秒）", stage="export")
+
+    def close(self) -> Dict[str, Any]:
+        """
+        等待已提交的结果全部写完并生成汇总文件
 
-        return output_path
+        Returns:
+            {"output_dir", "formats", "exported_count", "counts", "already_exported_count", "failed_count",
+             "summary_path", "paths"}，counts 为各格式本次写出的结果数，paths 为 JSONL、Parquet 等单个导出文件的路径
+        """
+        self._file_executor.shutdown(wait=True)
+        self._stream_executor.shutdown(wait=True)
+
+        return {
+            "output_dir": self.output_dir,
+            "formats": self.formats,
+            "exported_count": self.exported_count,
+            "counts": dict(self.counts),
+            "already_exported_count": self.already_exported_count,
+            "failed_count": self.failed_count,
+            "summary_path": self._summary.close() if self._summary else None,
+            "paths": {fmt: writer.close() for fmt, writer in self._streams.items()},
+        }
+
+
+# 单文件格式: 名称 -> (扩展名, 格式化函数(result, generated_at) -> 内容或 None)
+FILE_FORMATS = {
+    "markdown": (".md", ResultExporter._format_markdown),
+    "srt": (".srt", lambda result, generated_at=None: ResultExporter._format_subtitles(result, "srt")),
+    "vtt": (".vtt", lambda result, generated_at=None: ResultExporter._format_subtitles(result, "vtt")),
+}
+
+# 整批写入一个文件的格式: 名称 -> 写入器类（add(result) / close() -> 路径）
+STREAM_FORMATS = {
+    "jsonl": JsonlWriter,
+    "parquet": ParquetWriter,
+}
+
+EXPORT_FORMATS = tuple(FILE_FORMATS) + tuple(STREAM_FORMATS)
@@ -0,0 +1,279 @@
+"""
+流式识别模块
+接收分块上传的 PCM 音频，增量运行 VAD 和流式 Paraformer，实时返回中间结果和整句结果
+"""
+import time
+import uuid
+from threading import Lock
+from typing import Optional, Dict, Any, List
+
+from backend.utils.config import STREAMING_CONFIG
+from backend.model_components import get_auto_model
+
+
+class StreamingASREngine:
+    """流式识别模型（所有会话共享，推理串行执行）"""
+
+    def __init__(self, device: str = "cpu"):
+        """
+        加载流式识别所需的模型
+
+        Args:
+            device: 设备类型，"cpu" 或 "cuda"
+        """
+        AutoModel = get_auto_model()
+        self.device = device
+        self._lock = Lock()
+
+        print(f"正在加载流式识别模型 (设备: {device})...")
+        start_time = time.time()
+
+        common_kwargs = {"disable_update": True}
+        if device == "cuda":
+            common_kwargs["device"] = "cuda"
+
+        self.asr_model = AutoModel(model=STREAMING_CONFIG['model_name'], **common_kwargs)
+        self.vad_model = AutoModel(model=STREAMING_CONFIG['vad_model'], **common_kwargs)
+        self.punc_model = None
+        if STREAMING_CONFIG['punc_model']:
+            self.punc_model = AutoModel(model=STREAMING_CONFIG['punc_model'], **common_kwargs)
+
+        print(f"流式识别模型加载完成, 耗时: {time.time() - start_time:.2f} 秒")
+
+    @property
+    def chunk_samples(self) -> int:
+        """每个识别块的采样数（chunk_size[1] 个 60ms 帧）"""
+        return STREAMING_CONFIG['chunk_size'][1] * 960
+
+    def recognize_chunk(self, chunk, cache: dict, is_final: bool) -> str:
+        """识别一个音频块，返回新增的文本"""
+        with self._lock:
+            result = self.asr_model.generate(
+                input=chunk,
+                cache=cache,
+                is_final=is_final,
+                chunk_size=STREAMING_CONFIG['chunk_size'],
+                encoder_chunk_look_back=STREAMING_CONFIG['encoder_chunk_look_back'],
+                decoder_chunk_look_back=STREAMING_CONFIG['decoder_chunk_look_back'],
+            )
+        return result[0].get("text", "") if result else ""
+
+    def detect_speech(self, chunk, cache: dict, is_final: bool) -> list:
+        """
+        对一个音频块做流式 VAD
+
+        Returns:
+            [[开始ms, 结束ms], ...]，-1 表示该端点尚未出现在本块中
+        """
+        chunk_ms = len(chunk) * 1000 // STREAMING_CONFIG['sample_rate']
+        with self._lock:
+            result = self.vad_model.generate(
+                input=chunk,
+                cache=cache,
+                is_final=is_final,
+                chunk_size=chunk_ms,
+            )
+        return result[0].get("value", []) if result else []
+
+    def punctuate(self, text: str) -> str:
+        """为整句文本恢复标点"""
+        if not text or self.punc_model is None:
+            return text
+        with self._lock:
+            result = self.punc_model.generate(input=text)
+        return result[0].get("text", text) if result else text
+
+
+class StreamingSession:
+    """单路流式识别会话"""
+
+    def __init__(self, engine: StreamingASREngine):
+        self.session_id = uuid.uuid4().hex[:12]
+        self.engine = engine
+        self.last_active = time.time()
+        self.lock = Lock()
+
+        self._asr_cache = {}
+        self._vad_cache = {}
+        self._buffer = None
+        self._samples_received = 0
+        self._partial_text = ""
+        self._sentence_start = None
+        self.sentences = []
+        self.finished = False
+
+    def feed(self, pcm_bytes: bytes) -> List[Dict[str, Any]]:
+        """
+        输入一段 16 位小端 PCM 音频
+
+        Args:
+            pcm_bytes: 原始音频字节
+
+        Returns:
+            本次产生的事件列表：
+            {"type": "partial", "text": 当前句子的中间结果}
+            {"type": "final", "text": 整句结果, "start": 开始ms, "end": 结束ms}
+        """
+        import numpy as np
+
+        self.last_active = time.time()
+        samples = np.frombuffer(pcm_bytes[:len(pcm_bytes) // 2 * 2], dtype='<i2').astype(np.float32) / 32768.0
+
+        if self._buffer is None or len(self._buffer) == 0:
+            self._buffer = samples
+        else:
+            self._buffer = np.concatenate([self._buffer, samples])
+
+        events = []
+        chunk_samples = self.engine.chunk_samples
+        while len(self._buffer) >= chunk_samples:
+            chunk = self._buffer[:chunk_samples]
+            self._buffer = self._buffer[chunk_samples:]
+            events.extend(self._process_chunk(chunk, is_final=False))
+
+        return events
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """
+        结束输入，处理剩余音频并输出最后一句
+
+        Returns:
+            本次产生的事件列表
+        """
+        import numpy as np
+
+        self.last_active = time.time()
+        if self.finished:
+            return []
+
+        chunk = self._buffer if self._buffer is not None else np.zeros(0, dtype=np.float32)
+        self._buffer = None
+        events = self._process_chunk(chunk, is_final=True)
+
+        # 输入结束时仍未检测到语音结束端点，直接输出当前句子
+        if self._partial_text:
+            events.append(self._finalize_sentence(self._position_ms()))
+
+        self.finished = True
+        return events
+
+    @property
+    def text(self) -> str:
+        """已确定的完整文本"""
+        return "".join(sentence["text"] for sentence in self.sentences)
+
+    def _position_ms(self) -> int:
+        return self._samples_received * 1000 // STREAMING_CONFIG['sample_rate']
+
+    def _process_chunk(self, chunk, is_final: bool) -> List[Dict[str, Any]]:
+        """
+        对一个音频块运行 VAD 和流式识别
+
+        先做 VAD：本块出现句子结束端点时以 is_final=True 识别本块，输出解码器因前瞻而滞留的文本，
+        再重置识别缓存，下一句从新的解码状态开始，句尾的字不会落到下一句中。
+        句子起止时间都取 VAD 端点（整个音频流中的毫秒位置）。
+        """
+        events = []
+        self._samples_received += len(chunk)
+
+        segments = self.engine.detect_speech(chunk, self._vad_cache, is_final)
+        flush = is_final or any(end_ms != -1 for _, end_ms in segments)
+
+        new_text = self.engine.recognize_chunk(chunk, self._asr_cache, flush)
+        if flush:
+            self._asr_cache = {}
+        if new_text:
+            self._partial_text += new_text
+            events.append({"type": "partial", "text": self._partial_text})
+
+        for beg_ms, end_ms in segments:
+            if beg_ms != -1:
+                self._sentence_start = beg_ms
+            if end_ms != -1:
+                if self._partial_text:
+                    events.append(self._finalize_sentence(end_ms))
+                self._sentence_start = None
+
+        return events
+
+    def _finalize_sentence(self, end_ms: int) -> Dict[str, Any]:
+        """输出整句结果并开始新句子"""
+        start_ms = self._sentence_start
+        if start_ms is None:
+            # 没有收到开始端点（如输入结束时），从上一句结束处开始
+            start_ms = self.sentences[-1]["end"] if self.sentences else 0
+        sentence = {
+            "text": self.engine.punctuate(self._partial_text),
+            "start": start_ms,
+            "end": end_ms,
+        }
+        self.sentences.append(sentence)
+        self._partial_text = ""
+        self._sentence_start = None
+        return {"type": "final", **sentence}
+
+
+class StreamingSessionManager:
+    """流式会话管理：创建、查找、超时清理"""
+
+    def __init__(self):
+        self._sessions = {}
+        self._engines = {}
+        self._load_locks = {}  # device -> Lock，同一设备的模型只加载一次
+        self._lock = Lock()
+
+    def _get_engine(self, device: str) -> StreamingASREngine:
+        with self._lock:
+            if device in self._engines:
+                return self._engines[device]
+            load_lock = self._load_locks.setdefault(device, Lock())
+
+        # 加载期间只持有该设备的锁：同一设备的并发请求等待这一次加载，其他会话操作不受影响
+        with load_lock:
+            with self._lock:
+                if device in self._engines:
+                    return self._engines[device]
+
+            engine = StreamingASREngine(device=device)
+
+            with self._lock:
+                self._engines[device] = engine
+        return engine
+
+    def create(self, device: str = "cpu") -> StreamingSession:
+        """
+        创建会话
+
+        Raises:
+            RuntimeError: 会话数已达上限
+        """
+        self.cleanup()
+        with self._lock:
+            if len(self._sessions) >= STREAMING_CONFIG['max_sessions']:
+                raise RuntimeError("流式识别会话数已达上限")
+
+        session = StreamingSession(self._get_engine(device))
+        with self._lock:
+            self._sessions[session.session_id] = session
+        return session
+
+    def get(self, session_id: str) -> Optional[StreamingSession]:
+        """获取会话"""
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def close(self, session_id: str):
+        """关闭会话"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def cleanup(self):
+        """移除长时间没有输入的会话"""
+        deadline = time.time() - STREAMING_CONFIG['session_timeout_s']
+        with self._lock:
+            for session_id in [sid for sid, s in self._sessions.items() if s.last_active < deadline]:
+                del self._sessions[session_id]
+
+
+# 全局流式会话管理器
+streaming_sessions = StreamingSessionManager()
@@ -0,0 +1,226 @@
+"""
+识别结果缓存模块
+按音频内容哈希 + 模型配置缓存识别结果，重复提交的文件无需再次推理
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from threading import Lock
+from typing import Optional, Dict, Any
+
+from backend.utils.config import CACHE_CONFIG
+
+# 缓存格式版本，结果字段变化时递增以废弃旧缓存
+CACHE_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access);
+-- 条目数和总大小由触发器维护，写入时不必扫描整张表；多个识别进程共用同一数据库时同样准确
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE totals SET entries = entries + 1, size = size + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE totals SET entries = entries - 1, size = size - OLD.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+    UPDATE totals SET size = size - OLD.size + NEW.size WHERE id = 0;
+END;
+-- 只在首次创建（或由旧版本升级）时统计一次已有条目
+INSERT OR IGNORE INTO totals (id, entries, size) SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM entries;
+"""
+
+
+class TranscriptionCache:
+    """识别结果磁盘缓存（LRU 淘汰）"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: Optional[int] = None):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录（默认使用 CACHE_CONFIG['dir']）
+            max_size_mb: 缓存总大小上限（MB，默认使用 CACHE_CONFIG['max_size_mb']）
+        """
+        if cache_dir is None:
+            cache_dir = CACHE_CONFIG['dir']
+        if max_size_mb is None:
+            max_size_mb = CACHE_CONFIG['max_size_mb']
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, 'cache.db'), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def file_hash(self, audio_path: str) -> str:
+        """
+        计算文件内容哈希
+        修改时间和大小未变时直接复用上次的哈希，避免重复读取整个文件
+
+        Args:
+            audio_path: 音频文件路径
+
+        Returns:
+            内容哈希（十六进制）
+        """
+        stat = os.stat(audio_path)
+        abs_path = os.path.abspath(audio_path)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime_ns, size, content_hash FROM file_hashes WHERE path = ?", (abs_path,)
+            ).fetchone()
+        if row is not None and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            return row[2]
+
+        digest = hashlib.blake2b(digest_size=20)
+        with open(audio_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        content_hash = digest.hexdigest()
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, mtime_ns, size, content_hash) VALUES (?, ?, ?, ?)",
+                (abs_path, stat.st_mtime_ns, stat.st_size, content_hash)
+            )
+
+        return content_hash
+
+    def make_key(self, audio_path: str, model_signature: Dict[str, Any]) -> str:
+        """
+        生成缓存键：内容哈希 + 模型配置 + 设备
+
+        Args:
+            audio_path: 音频文件路径
+            model_signature: 模型配置（见 ASREngine.model_signature）
+
+        Returns:
+            缓存键
+        """
+        signature = json.dumps(model_signature, sort_keys=True)
+        raw = f"{CACHE_VERSION}|{self.file_hash(audio_path)}|{signature}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存结果
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            识别结果字典，未命中时返回 None
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT result FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """
+        写入缓存结果，超出大小上限时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键
+            result: 识别结果字典
+        """
+        data = json.dumps(result, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+
+        with self._lock, self._conn:
+            # 用 UPSERT 而不是 INSERT OR REPLACE：REPLACE 删除旧行时不触发删除触发器，总大小会偏大
+            self._conn.execute(
+                "INSERT INTO entries (key, result, size, last_access) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET result = excluded.result, size = excluded.size, "
+                "last_access = excluded.last_access",
+                (key, data, size, time.time())
+            )
+            total = self._conn.execute("SELECT size FROM totals WHERE id = 0").fetchone()[0]
+            if total > self.max_size:
+                self._evict(total - int(self.max_size * 0.9))
+
+    def _evict(self, bytes_to_free: int):
+        """按最近访问时间淘汰条目，只读取到腾出足够空间为止（调用方需持有锁）"""
+        freed = 0
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if freed >= bytes_to_free:
+                break
+            stale.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            count, total = self._conn.execute("SELECT entries, size FROM totals WHERE id = 0").fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "size_mb": round(total / (1024 * 1024), 2),
+            "max_size_mb": round(self.max_size / (1024 * 1024), 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+        }
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM file_hashes")
+
+
+# 全局缓存实例
+_transcription_cache: Optional[TranscriptionCache] = None
+_cache_lock = Lock()
+
+
+def get_transcription_cache() -> Optional[TranscriptionCache]:
+    """
+    获取识别结果缓存单例
+
+    Returns:
+        缓存实例，未启用缓存时返回 None
+    """
+    global _transcription_cache
+    if not CACHE_CONFIG['enabled']:
+        return None
+    if _transcription_cache is None:
+        with _cache_lock:
+            if _transcription_cache is None:
+                _transcription_cache = TranscriptionCache()
+    return _transcription_cache
@@ -20,21 +20,107 @@ ASR_MODEL_CONFIG = {
     'model_name': 'paraformer-zh',  # 使用中文模型
     'vad_model': 'fsmn-vad',
     'punc_model': 'ct-punc',
+    'spk_model': 'cam++',  # 说话人分离模型
+}
+
+# 模型池配置
+MODEL_POOL_CONFIG = {
+    'max_models': 2,  # 同时保留的识别流水线数量（按 设备 + 是否说话人分离 区分）
+    'memory_budget_mb': 0,  # 模型参数占用内存上限（MB），0 表示只按数量限制
+}
+
+# 模型加载配置
+MODEL_LOAD_CONFIG = {
+    'warmup': True,  # 加载后用一段合成音频跑一次 VAD、识别和标点，首个请求不再承担首次推理的初始化开销
+    'warmup_seconds': 1.0,  # 预热音频时长（秒）
+    'mmap_weights': False,  # CPU 模型参数改为映射权重缓存文件（需要 torch>=2.1），多个识别进程共享同一份物理内存
+    'weights_dir': os.path.join(MODELS_DIR, 'weights'),  # 权重缓存目录，模型配置或参数形状变化时自动重建
+}
+
+# 流式识别配置
+STREAMING_CONFIG = {
+    'model_name': 'paraformer-zh-streaming',  # 流式中文识别模型
+    'vad_model': 'fsmn-vad',
+    'punc_model': 'ct-punc',  # 整句输出时恢复标点，留空则不加标点
+    'sample_rate': 16000,  # 输入音频采样率（16 位单声道 PCM）
+    'chunk_size': [0, 10, 5],  # 流式块配置，[1] 为每块的 60ms 帧数（10 即 600ms）
+    'encoder_chunk_look_back': 4,
+    'decoder_chunk_look_back': 1,
+    'session_timeout_s': 300,  # 会话无输入超时（秒）
+    'max_sessions': 16,  # 同时存在的会话数上限
 }
 
 # 批处理配置
 BATCH_CONFIG = {
-    'max_workers': 2,  # 最大并发数，根据CPU/GPU调整
-    'chunk_size': 30,  # 音频分块时长（秒）
+    'max_workers': 2,  # 最大并发数（每个进程加载一份模型副本），根据CPU/GPU和内存调整，1 表示单进程
+    'chunk_size': 30,  # 长音频模式下每次解码、VAD 的窗口时长（秒）
+    'long_audio_threshold_s': 600,  # 超过该时长的音频按窗口分段处理，内存占用与时长无关（0 表示不启用）
+    'batch_size_s': 300,  # 跨文件批量推理时每批次的音频总时长上限（秒）
+    'files_per_batch': 16,  # 每次跨文件批量推理包含的文件数
+    'prefetch_files': 4,  # 推理的同时在后台提前解码的文件数（0 表示不预取）
+    'decode_workers': 2,  # 后台解码线程数
+    'buffered_files': 8,  # 跨文件批量推理时最多同时保留的已切分文件数，攒够即推理（越大打包越充分，内存占用越高）
+}
+
+# 文件夹扫描配置
+SCAN_CONFIG = {
+    'max_workers': 8,  # 并行扫描子目录的线程数
+    'use_index': True,  # 使用持久化目录索引，重复扫描时跳过未变化的目录
+    'index_path': os.path.join(BASE_DIR, 'data', 'scan_index.db'),
+    'page_size': 500,  # 分页扫描时每页返回的文件数
+    'max_sessions': 8,  # 保留的后台扫描会话数
+    'probe_duration': True,  # 扫描时读取文件头获取时长和采样率（结果随目录索引缓存）
+    'probe_workers': 8,  # 读取文件头的线程数
+}
+
+# 任务持久化配置
+JOB_CONFIG = {
+    'db_path': os.path.join(BASE_DIR, 'data', 'jobs.db'),  # 任务数据库（SQLite）
+    'max_attempts': 3,  # 单个文件最多识别次数，超过后不再重试
+    'resume_on_startup': True,  # 启动时自动恢复中断的任务
+    'default_priority': 1,  # 任务默认优先级（权重）
+    'max_priority': 10,  # 任务优先级上限
+    'unknown_duration_s': 60,  # 时长未知的文件在公平调度中按此时长计算
+    'max_recent_jobs': 20,  # 内存中保留的已结束任务数（更早的任务从数据库读取）
+    'scan_batch_size': 100,  # 文件夹任务每扫描到多少个文件入队一次（工作池空闲时立即入队）
+}
+
+# 识别结果缓存配置
+CACHE_CONFIG = {
+    'enabled': True,
+    'dir': os.path.join(BASE_DIR, 'data', 'cache'),  # 缓存目录
+    'max_size_mb': 512,  # 缓存总大小上限（MB），超出后按 LRU 淘汰
+}
+
+# 进度查询配置
+PROGRESS_CONFIG = {
+    'page_size': 100,  # /api/progress 默认每次返回的结果数
+    'max_page_size': 1000,  # /api/progress 单次最多返回的结果数
+    'event_queue_size': 1000,  # 每个进度推送订阅者最多积压的事件数
+    'heartbeat_s': 15,  # 进度推送无事件时的心跳间隔（秒）
+}
+
+# 结果导出配置
+EXPORT_CONFIG = {
+    'max_workers': 8,  # 批量导出时并行写文件的线程数
+    'formats': ['markdown'],  # 默认导出格式: markdown, srt, vtt, jsonl, parquet（parquet 需要安装 pyarrow）
+    'parquet_row_group': 1000,  # Parquet 每个行组的行数
 }
 
 # Flask 配置
 FLASK_CONFIG = {
     'host': '127.0.0.1',
     'port': 5000,
-    'debug': True,
+    'debug': True,  # 开发服务器（--dev）是否启用调试模式和自动重载，生产模式始终关闭
     'threaded': True,
 }
 
+# 生产服务配置（waitress）
+SERVER_CONFIG = {
+    'threads': 32,  # 处理请求的线程数（每个进度推送连接占用一个线程）
+    'connection_limit': 1000,  # 同时保持的连接数上限
+    'drain_timeout_s': 300,  # 收到退出信号后等待执行中任务完成的最长时间（秒），超时的任务下次启动时继续
+}
+
 # 确保输出目录存在
 os.makedirs(OUTPUT_DIR, exist_ok=True)
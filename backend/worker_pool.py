@@ -0,0 +1,362 @@
+"""
+识别工作池模块
+将批量识别任务分发到多个进程，每个进程持有独立的模型副本
+"""
+import os
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from queue import Empty
+from threading import Lock
+from typing import Iterator, Tuple, Dict, Any, Optional, Callable
+
+from backend.metrics import metrics
+from backend.utils import config as app_config
+from backend.utils.config import BATCH_CONFIG
+
+# 子进程默认的识别配置 (device, enable_speaker_diarization)
+_worker_config = None
+# 子进程向服务进程上报模型池状态的队列，及上次上报时的 (加载次数, 卸载次数, 已上报的子模型加载记录数)
+_status_queue = None
+_reported = (0, 0, 0)
+
+
+def _config_snapshot() -> Dict[str, Dict[str, Any]]:
+    """当前进程的各项 *_CONFIG（spawn 启动的子进程重新导入配置模块，运行时的修改需要显式传入）"""
+    return {
+        name: dict(value) for name, value in vars(app_config).items()
+        if name.endswith("_CONFIG") and isinstance(value, dict)
+    }
+
+
+def _init_worker(
+    device: str,
+    enable_speaker_diarization: bool,
+    torch_threads: int,
+    config_snapshot: Optional[Dict[str, Dict[str, Any]]] = None,
+    status_queue=None
+):
+    """
+    子进程初始化：加载本进程独享的模型副本
+
+    Args:
+        device: 设备类型，"cpu" 或 "cuda"
+        enable_speaker_diarization: 是否启用说话人分离
+        torch_threads: 每个进程使用的 PyTorch 线程数
+        config_snapshot: 服务进程的配置（见 _config_snapshot）
+        status_queue: 模型池状态上报队列
+    """
+    global _worker_config, _status_queue
+
+    for name, values in (config_snapshot or {}).items():
+        getattr(app_config, name).update(values)
+    _status_queue = status_queue
+
+    # 限制每个进程的计算线程数，避免多个副本争抢 CPU
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+    from backend.asr_engine import get_asr_engine
+    _worker_config = (device, enable_speaker_diarization)
+    get_asr_engine(device=device, enable_speaker_diarization=enable_speaker_diarization)
+    _report_status()
+
+
+def _report_status():
+    """
+    模型池有变化时向服务进程上报本进程的状态
+
+    模型加载在子进程中，服务进程的模型池和指标看不到；/metrics 输出的模型指标由服务进程汇总各子进程上报的状态。
+    """
+    global _reported
+    if _status_queue is None:
+        return
+
+    from backend.model_components import get_model_components
+    from backend.model_registry import get_model_registry
+    registry = get_model_registry()
+    history = get_model_components().load_history
+    state = (registry.load_count, registry.eviction_count, len(history))
+    if state == _reported:
+        return
+
+    _status_queue.put({
+        "pid": os.getpid(),
+        "load_count": registry.load_count,
+        "eviction_count": registry.eviction_count,
+        "pipelines": registry.loaded(),
+        "component_loads": history[_reported[2]:],
+    })
+    _reported = state
+
+
+def _transcribe_in_worker(audio_paths: list, config: Optional[tuple] = None) -> list:
+    """
+    在子进程中跨文件批量识别一组文件
+
+    Args:
+        audio_paths: 音频文件路径列表
+        config: (device, enable_speaker_diarization)，默认使用进程初始化时的配置；
+                其他配置的流水线由本进程的模型池按需加载
+    """
+    from backend.asr_engine import get_asr_engine
+    device, enable_speaker_diarization = config or _worker_config
+    try:
+        return get_asr_engine(device=device, enable_speaker_diarization=enable_speaker_diarization).transcribe_batch(audio_paths)
+    finally:
+        _report_status()
+
+
+def _worker_ready() -> int:
+    """空任务：子进程初始化（加载模型）完成后才会执行，返回进程号"""
+    return os.getpid()
+
+
+def _failed_result(audio_path: str, error: Exception) -> Dict[str, Any]:
+    """构造与 ASREngine.transcribe 一致的失败结果"""
+    return {
+        "success": False,
+        "text": "",
+        "audio_path": audio_path,
+        "process_time": 0,
+        "error": str(error)
+    }
+
+
+class ASRWorkerPool:
+    """多进程识别工作池"""
+
+    def __init__(
+        self,
+        device: str = "cpu",
+        enable_speaker_diarization: bool = False,
+        max_workers: Optional[int] = None
+    ):
+        """
+        初始化工作池
+
+        Args:
+            device: 设备类型，"cpu" 或 "cuda"
+            enable_speaker_diarization: 是否启用说话人分离
+            max_workers: 进程数（默认使用 BATCH_CONFIG['max_workers']）
+        """
+        if max_workers is None:
+            max_workers = BATCH_CONFIG['max_workers']
+
+        self.device = device
+        self.enable_speaker_diarization = enable_speaker_diarization
+        self.max_workers = max(1, int(max_workers))
+        self._executor = None
+        self._lock = Lock()
+        self._status_queue = None
+        self._worker_status = {}  # 进程号 -> 子进程上报的模型池状态
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """按需启动进程池"""
+        with self._lock:
+            if self._executor is None:
+                torch_threads = max(1, (os.cpu_count() or 1) // self.max_workers)
+                # 使用 spawn 启动，避免 fork 后 PyTorch/CUDA 状态不一致
+                context = multiprocessing.get_context("spawn")
+                self._status_queue = context.Queue()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(
+                        self.device, self.enable_speaker_diarization, torch_threads,
+                        _config_snapshot(), self._status_queue,
+                    ),
+                )
+            return self._executor
+
+    def poll_status(self) -> Dict[int, Dict[str, Any]]:
+        """
+        读取子进程上报的模型池状态，子模型加载耗时计入本进程的 asr_model_load_seconds
+
+        Returns:
+            进程号 -> {"pid", "load_count", "eviction_count", "pipelines"}
+        """
+        with self._lock:
+            while self._status_queue is not None:
+                try:
+                    status = self._status_queue.get_nowait()
+                except Empty:
+                    break
+                for load in status.pop("component_loads"):
+                    metrics.observe(
+                        "asr_model_load_seconds", load["seconds"], "子模型加载耗时（秒）",
+                        component=load["component"], device=load["device"]
+                    )
+                self._worker_status[status["pid"]] = status
+            return dict(self._worker_status)
+
+    def warm_up(self, poll_interval: float = 0.2) -> int:
+        """
+        启动全部子进程并等待各进程加载好模型
+
+        空任务只会由完成初始化的进程执行，逐轮提交直到每个进程都执行过一次。
+
+        Args:
+            poll_interval: 每轮之间的等待时间（秒）
+
+        Returns:
+            就绪的进程数
+
+        Raises:
+            BrokenProcessPool: 子进程初始化失败（如模型加载失败）
+        """
+        executor = self._get_executor()
+        ready = set()
+        while True:
+            futures = [executor.submit(_worker_ready) for _ in range(self.max_workers)]
+            ready.update(future.result() for future in futures)
+            if len(ready) >= self.max_workers:
+                return len(ready)
+            time.sleep(poll_interval)
+
+    def submit(
+        self,
+        audio_paths: list,
+        device: Optional[str] = None,
+        enable_speaker_diarization: Optional[bool] = None
+    ) -> Future:
+        """
+        提交一组文件，由任一子进程跨文件批量识别
+
+        Args:
+            audio_paths: 音频文件路径列表
+            device: 设备类型（默认使用工作池的设备）
+            enable_speaker_diarization: 是否启用说话人分离（默认使用工作池的配置）
+
+        Returns:
+            Future，结果为与 audio_paths 一一对应的识别结果列表
+        """
+        config = (
+            self.device if device is None else device,
+            self.enable_speaker_diarization if enable_speaker_diarization is None else bool(enable_speaker_diarization),
+        )
+        return self._get_executor().submit(_transcribe_in_worker, audio_paths, config)
+
+    def imap(
+        self,
+        audio_paths: list,
+        should_stop: Optional[Callable[[], bool]] = None,
+        group_size: Optional[int] = None
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        并行识别音频文件，按输入顺序逐个返回结果
+
+        文件按 group_size 分组提交，组内使用 ASREngine.transcribe_batch 跨文件批量推理。
+        同时在途的任务数限制为进程数的两倍，便于中途停止时尽快退出。
+
+        Args:
+            audio_paths: 音频文件路径列表
+            should_stop: 返回 True 时停止提交新任务
+            group_size: 每个任务包含的文件数（默认使用 BATCH_CONFIG['files_per_batch']）
+
+        Yields:
+            (文件索引, 识别结果)
+        """
+        if group_size is None:
+            group_size = BATCH_CONFIG['files_per_batch']
+        group_size = max(1, group_size)
+
+        executor = self._get_executor()
+        window = self.max_workers * 2
+        pending = deque()
+        next_index = 0
+        total = len(audio_paths)
+
+        while next_index < total or pending:
+            stopped = should_stop is not None and should_stop()
+
+            # 补充在途任务
+            while not stopped and next_index < total and len(pending) < window:
+                group = audio_paths[next_index:next_index + group_size]
+                pending.append((next_index, group, executor.submit(_transcribe_in_worker, group)))
+                next_index += len(group)
+
+            if stopped:
+                for _, _, future in pending:
+                    future.cancel()
+                return
+
+            start_index, group, future = pending.popleft()
+            try:
+                group_results = future.result()
+            except Exception as e:
+                group_results = [_failed_result(audio_path, e) for audio_path in group]
+
+            for offset, result in enumerate(group_results):
+                yield start_index + offset, result
+
+    def shutdown(self, wait: bool = True):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            if self._status_queue is not None:
+                self._status_queue.close()
+                self._status_queue = None
+            self._worker_status = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+
+def iter_transcribe(
+    audio_paths: list,
+    device: str = "cpu",
+    enable_speaker_diarization: bool = False,
+    max_workers: Optional[int] = None,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    批量识别音频文件，按配置选择单进程或多进程执行
+
+    Args:
+        audio_paths: 音频文件路径列表
+        device: 设备类型，"cpu" 或 "cuda"
+        enable_speaker_diarization: 是否启用说话人分离
+        max_workers: 进程数（默认使用 BATCH_CONFIG['max_workers']）
+        should_stop: 返回 True 时停止处理
+
+    Yields:
+        (文件索引, 识别结果)
+    """
+    if max_workers is None:
+        max_workers = BATCH_CONFIG['max_workers']
+
+    # 文件数不足时不值得为每个进程加载一份模型
+    max_workers = min(max_workers, len(audio_paths))
+
+    if max_workers <= 1:
+        from backend.asr_engine import get_asr_engine
+        asr_engine = get_asr_engine(device=device, enable_speaker_diarization=enable_speaker_diarization)
+
+        group_size = max(1, BATCH_CONFIG['files_per_batch'])
+        for start_index in range(0, len(audio_paths), group_size):
+            if should_stop is not None and should_stop():
+                return
+            group = audio_paths[start_index:start_index + group_size]
+            try:
+                group_results = asr_engine.transcribe_batch(group)
+            except Exception as e:
+                group_results = [_failed_result(audio_path, e) for audio_path in group]
+            for offset, result in enumerate(group_results):
+                yield start_index + offset, result
+        return
+
+    start_time = time.time()
+    with ASRWorkerPool(device, enable_speaker_diarization, max_workers) as pool:
+        yield from pool.imap(audio_paths, should_stop=should_stop)
+    print(f"多进程识别完成 ({max_workers} 个进程), 耗时: {time.time() - start_time:.2f} 秒")
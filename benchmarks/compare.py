@@ -0,0 +1,64 @@
+"""
+对比两次基准测试结果
+
+用法:
+    python benchmarks/compare.py benchmarks/results/before.json benchmarks/results/after.json
+"""
+import sys
+import json
+
+
+def flatten(data: dict, prefix: str = "") -> dict:
+    """把嵌套字典展开为 {"a.b.c": 数值}，只保留数值项"""
+    items = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            items.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            items[name] = value
+    return items
+
+
+def compare(before: dict, after: dict) -> list:
+    """
+    Returns:
+        [(指标, 之前, 之后, 变化百分比), ...]
+    """
+    before_items = flatten({k: v for k, v in before.items() if k != "config"})
+    after_items = flatten({k: v for k, v in after.items() if k != "config"})
+
+    rows = []
+    for name in sorted(set(before_items) | set(after_items)):
+        old, new = before_items.get(name), after_items.get(name)
+        change = None
+        if old and new is not None:
+            change = (new - old) / old * 100
+        rows.append((name, old, new, change))
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print(__doc__)
+        return 1
+
+    with open(argv[0], encoding="utf-8") as f:
+        before = json.load(f)
+    with open(argv[1], encoding="utf-8") as f:
+        after = json.load(f)
+
+    if before.get("config") != after.get("config"):
+        print("注意: 两次运行的配置不同\n")
+
+    width = max((len(row[0]) for row in compare(before, after)), default=10)
+    print(f"{'指标':<{width}}  {'之前':>12}  {'之后':>12}  {'变化':>8}")
+    for name, old, new, change in compare(before, after):
+        change_text = f"{change:+.1f}%" if change is not None else "-"
+        print(f"{name:<{width}}  {old if old is not None else '-':>12}  {new if new is not None else '-':>12}  {change_text:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
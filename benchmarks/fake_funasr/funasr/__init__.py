@@ -0,0 +1,139 @@
+"""
+基准测试用的 funasr 替身
+提供与 funasr.AutoModel 相同的调用接口，按能量做 VAD，按配置的延迟模拟推理耗时，输出确定的文本
+
+延迟通过环境变量配置（子进程继承）:
+    FAKE_ASR_LOAD_S      模型加载耗时（秒）
+    FAKE_ASR_LATENCY_MS  每次推理调用的固定耗时（毫秒）
+    FAKE_ASR_RTF         每秒音频的推理耗时（秒）
+"""
+import os
+import time
+
+_SAMPLE_RATE = 16000
+_FRAME = 160  # 10ms
+_CHARS = "今天天气很好我们一起去公园散步然后回家吃饭"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _sleep(seconds: float):
+    if seconds > 0:
+        time.sleep(seconds)
+
+
+class _FakeModule:
+    """子模型占位（没有参数）"""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+
+
+class AutoModel:
+    """funasr.AutoModel 替身"""
+
+    def __init__(self, model=None, vad_model=None, punc_model=None, spk_model=None, **kwargs):
+        _sleep(_env_float("FAKE_ASR_LOAD_S", 0.5))
+
+        self.latency = _env_float("FAKE_ASR_LATENCY_MS", 20) / 1000
+        self.rtf = _env_float("FAKE_ASR_RTF", 0.02)
+
+        self.model = _FakeModule("asr")
+        self.kwargs = {"model": model, **kwargs}
+        self.vad_model = _FakeModule("vad") if vad_model else None
+        self.vad_kwargs = {"model": vad_model, "max_single_segment_time": 30000}
+        self.punc_model = _FakeModule("punc") if punc_model else None
+        self.punc_kwargs = {"model": punc_model}
+        self.spk_model = _FakeModule("spk") if spk_model else None
+        self.spk_kwargs = {"model": spk_model}
+        self.cb_model = None
+        self.spk_mode = "punc_segment"
+
+    @staticmethod
+    def build_model(**kwargs):
+        # 不支持单独构建子模型，ModelComponents 会退回加载完整流水线
+        raise NotImplementedError("fake funasr does not build standalone models")
+
+    def inference(self, input, model=None, kwargs=None, **cfg):
+        kind = getattr(model, "kind", "asr")
+        if kind == "vad":
+            return [{"key": "vad", "value": self._vad(input)}]
+        if kind == "punc":
+            _sleep(self.latency / 4)
+            return [{"key": "punc", "text": self._punctuate(input)}]
+
+        inputs = input if isinstance(input, list) else [input]
+        seconds = sum(len(speech) for speech in inputs) / _SAMPLE_RATE
+        _sleep(self.latency + self.rtf * seconds)
+        return [{"key": f"asr{i}", "text": self._text(len(speech) / _SAMPLE_RATE)} for i, speech in enumerate(inputs)]
+
+    def generate(self, input, batch_size_s=300, **cfg):
+        speech = self._load(input)
+        segments = self._vad(speech)
+
+        pieces = [speech[beg * 16:end * 16] for beg, end in segments]
+        texts = [item["text"] for item in self.inference(pieces, model=self.model)] if pieces else []
+        text = self._punctuate("".join(texts))
+
+        result = {"key": "fake", "text": text}
+        if self.spk_model is not None:
+            _sleep(self.latency + self.rtf * len(speech) / _SAMPLE_RATE / 4)
+            result["sentence_info"] = [
+                {"text": piece_text, "start": beg, "end": end, "spk": i % 2}
+                for i, ((beg, end), piece_text) in enumerate(zip(segments, texts))
+            ]
+        return [result]
+
+    @staticmethod
+    def _load(input):
+        if isinstance(input, str):
+            import soundfile as sf
+            data, _ = sf.read(input, dtype="float32", always_2d=True)
+            return data.mean(axis=1)
+        return input
+
+    def _vad(self, speech) -> list:
+        """按 10ms 帧能量切分语音段，静音超过 300ms 断句"""
+        import numpy as np
+
+        _sleep(self.rtf * len(speech) / _SAMPLE_RATE / 10)
+
+        frames = len(speech) // _FRAME
+        if frames == 0:
+            return []
+        energy = np.abs(speech[:frames * _FRAME].reshape(frames, _FRAME)).mean(axis=1)
+        voiced = energy > 0.02
+
+        segments = []
+        start = None
+        silence = 0
+        for i, is_voiced in enumerate(voiced):
+            if is_voiced:
+                if start is None:
+                    start = i
+                silence = 0
+            elif start is not None:
+                silence += 1
+                if silence >= 30:
+                    segments.append([start * 10, (i - silence + 1) * 10])
+                    start = None
+        if start is not None:
+            segments.append([start * 10, frames * 10])
+        return segments
+
+    @staticmethod
+    def _text(seconds: float) -> str:
+        count = max(1, int(seconds * 4))
+        return "".join(_CHARS[i % len(_CHARS)] for i in range(count))
+
+    @staticmethod
+    def _punctuate(text: str) -> str:
+        return "".join(
+            char + ("，" if (i + 1) % 20 == 0 else "")
+            for i, char in enumerate(text)
+        ) + ("。" if text else "")
@@ -0,0 +1,115 @@
+"""
+合成测试音频
+生成由“语音”（调幅的谐波 + 噪声）和静音交替组成的 16kHz 单声道文件，时长分布可配置
+"""
+import os
+import wave
+from typing import List, Tuple
+
+
+def parse_mix(mix: str) -> List[Tuple[float, float]]:
+    """
+    解析时长分布
+
+    Args:
+        mix: "时长秒:占比,..."，例如 "10:0.6,60:0.3,600:0.1"
+
+    Returns:
+        [(时长秒, 占比), ...]，占比已归一化
+    """
+    pairs = []
+    for part in mix.split(","):
+        duration, _, share = part.strip().partition(":")
+        pairs.append((float(duration), float(share or 1)))
+
+    total = sum(share for _, share in pairs)
+    if not pairs or total <= 0:
+        raise ValueError(f"无效的时长分布: {mix}")
+    return [(duration, share / total) for duration, share in pairs]
+
+
+def synth_speech(duration_s: float, sample_rate: int, rng):
+    """
+    合成一段音频：1~4 秒的“语音”与 0.3~1 秒的静音交替
+
+    Args:
+        duration_s: 时长（秒）
+        sample_rate: 采样率
+        rng: numpy.random.Generator
+
+    Returns:
+        numpy.ndarray float32 采样
+    """
+    import numpy as np
+
+    total = int(duration_s * sample_rate)
+    audio = np.zeros(total, dtype=np.float32)
+
+    position = int(rng.uniform(0.1, 0.5) * sample_rate)
+    while position < total:
+        length = min(int(rng.uniform(1.0, 4.0) * sample_rate), total - position)
+        t = np.arange(length, dtype=np.float32) / sample_rate
+        pitch = rng.uniform(100, 250)
+        voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 5))
+        envelope = 0.5 * (1 - np.cos(2 * np.pi * 4 * t))  # 约 4Hz 的音节起伏
+        audio[position:position + length] = 0.2 * voice * envelope + rng.normal(0, 0.01, length)
+        position += length + int(rng.uniform(0.3, 1.0) * sample_rate)
+
+    return np.clip(audio, -1.0, 1.0)
+
+
+def write_audio(file_path: str, audio, sample_rate: int):
+    """写入音频文件，.wav 使用标准库 wave，其他格式使用 soundfile"""
+    import numpy as np
+
+    if file_path.endswith(".wav"):
+        with wave.open(file_path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes((audio * 32767).astype("<i2").tobytes())
+    else:
+        import soundfile as sf
+        sf.write(file_path, np.asarray(audio), sample_rate)
+
+
+def generate_audio_folder(
+    root: str,
+    count: int,
+    mix: str = "10:0.6,60:0.3,300:0.1",
+    audio_format: str = "wav",
+    sample_rate: int = 16000,
+    files_per_dir: int = 50,
+    seed: int = 0
+) -> List[Tuple[str, float]]:
+    """
+    生成测试音频文件夹
+
+    Args:
+        root: 输出目录
+        count: 文件数
+        mix: 时长分布（见 parse_mix），每个文件在基准时长上随机浮动 ±20%
+        audio_format: "wav" 或 "flac"
+        sample_rate: 采样率
+        files_per_dir: 每个子目录的文件数
+        seed: 随机种子，相同参数生成相同的文件
+
+    Returns:
+        [(文件路径, 时长秒), ...]
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    durations, shares = zip(*parse_mix(mix))
+
+    files = []
+    for i in range(count):
+        sub_dir = os.path.join(root, f"dir_{i // max(1, files_per_dir):04d}")
+        os.makedirs(sub_dir, exist_ok=True)
+
+        duration = float(rng.choice(durations, p=shares)) * rng.uniform(0.8, 1.2)
+        file_path = os.path.join(sub_dir, f"audio_{i:05d}.{audio_format}")
+        write_audio(file_path, synth_speech(duration, sample_rate, rng), sample_rate)
+        files.append((file_path, round(duration, 2)))
+
+    return files
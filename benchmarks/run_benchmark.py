@@ -0,0 +1,253 @@
+"""
+识别流水线基准测试
+
+生成合成音频文件夹，用 funasr 替身（见 fake_funasr）替换真实模型，测量：
+扫描耗时、解码延迟、识别吞吐（文件/秒、实时率）、单文件及各阶段延迟分位数、导出耗时和峰值内存。
+结果写入 JSON，可用 compare.py 对比两次运行。
+
+用法:
+    python benchmarks/run_benchmark.py --files 200 --mix "10:0.6,60:0.3,300:0.1" --workers 2
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 添加项目根目录到 Python 路径；funasr 替身放在最前面，优先于已安装的 funasr
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+if os.environ.get("BENCH_REAL_MODEL") != "1":
+    sys.path.insert(0, os.path.join(BENCH_DIR, "fake_funasr"))
+
+# 多进程识别时子进程会重新导入本模块，以下配置在子进程中同样生效
+from backend.utils import config
+
+config.CACHE_CONFIG['enabled'] = False  # 结果缓存会让重复运行直接命中
+config.SCAN_CONFIG['use_index'] = False
+
+from backend.audio_processor import AudioProcessor
+from backend.folder_scanner import FolderScanner, ScanIndex
+from backend.result_exporter import ResultExporter
+from backend.worker_pool import iter_transcribe
+from benchmarks.fixtures import generate_audio_folder
+
+
+def percentiles(values: list) -> dict:
+    """延迟分布（秒）"""
+    if not values:
+        return {"count": 0}
+    values = sorted(values)
+
+    def rank(p):
+        return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 4),
+        "p50": round(rank(50), 4),
+        "p90": round(rank(90), 4),
+        "p99": round(rank(99), 4),
+        "max": round(values[-1], 4),
+    }
+
+
+def peak_memory_mb() -> dict:
+    """本进程和已结束子进程的峰值常驻内存（Linux 上 ru_maxrss 单位为 KB）"""
+    self_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {"self": round(self_kb / 1024, 1), "children": round(children_kb / 1024, 1)}
+
+
+def bench_scan(folder: str, work_dir: str):
+    """冷扫描（新索引）和热扫描（索引命中），同时返回扫描到的文件"""
+    index = ScanIndex(os.path.join(work_dir, "scan_index.db"))
+
+    start_time = time.perf_counter()
+    files = FolderScanner(index=index).scan(folder)
+    cold = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    FolderScanner(index=index).scan(folder)
+    warm = time.perf_counter() - start_time
+
+    return {
+        "files": len(files),
+        "cold_s": round(cold, 4),
+        "warm_s": round(warm, 4),
+        "cold_files_per_s": round(len(files) / cold, 1) if cold else None,
+        "durations_probed": sum(1 for f in files if f["duration"] is not None),
+    }, files
+
+
+def bench_decode(paths: list) -> dict:
+    """逐个解码的延迟"""
+    latencies = []
+    for path in paths:
+        start_time = time.perf_counter()
+        AudioProcessor.load_audio(path)
+        latencies.append(time.perf_counter() - start_time)
+    return {"latency_s": percentiles(latencies)}
+
+
+def bench_recognition(paths: list, audio_seconds: float, workers: int, speaker_diarization: bool):
+    """识别吞吐和单文件延迟"""
+    results = [None] * len(paths)
+
+    start_time = time.perf_counter()
+    for i, result in iter_transcribe(paths, "cpu", speaker_diarization, max_workers=workers):
+        results[i] = result
+    wall = time.perf_counter() - start_time
+
+    failed = [r for r in results if not r or not r.get("success")]
+
+    # 分阶段耗时（见结果中的 timings）
+    stage_times = {}
+    for result in results:
+        for stage, seconds in ((result or {}).get("timings") or {}).items():
+            stage_times.setdefault(stage, []).append(seconds)
+
+    return {
+        "workers": workers,
+        "wall_s": round(wall, 3),
+        "files_per_s": round(len(paths) / wall, 2) if wall else None,
+        "audio_seconds": round(audio_seconds, 1),
+        "rtf": round(wall / audio_seconds, 4) if audio_seconds else None,
+        "failed": len(failed),
+        "process_time_s": percentiles([r["process_time"] for r in results if r]),
+        "stages_s": {stage: percentiles(times) for stage, times in sorted(stage_times.items())},
+        "stage_totals_s": {stage: round(sum(times), 3) for stage, times in sorted(stage_times.items())},
+    }, results
+
+
+def bench_export(results: list, work_dir: str) -> dict:
+    """导出 Markdown 和汇总文件"""
+    output_dir = os.path.join(work_dir, "outputs")
+    os.makedirs(output_dir, exist_ok=True)
+
+    start_time = time.perf_counter()
+    ResultExporter.export_batch(results, output_dir)
+    batch = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    ResultExporter.create_summary(results, output_dir)
+    summary = time.perf_counter() - start_time
+
+    return {
+        "export_batch_s": round(batch, 4),
+        "summary_s": round(summary, 4),
+        "files_per_s": round(len(results) / batch, 1) if batch else None,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="识别流水线基准测试")
+    parser.add_argument("--files", type=int, default=100, help="合成音频文件数")
+    parser.add_argument("--mix", default="10:0.6,60:0.3,300:0.1", help="时长分布 \"时长秒:占比,...\"")
+    parser.add_argument("--format", default="wav", choices=["wav", "flac"], help="音频格式")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--workers", type=int, default=1, help="识别进程数（1 为单进程）")
+    parser.add_argument("--speaker-diarization", action="store_true", help="启用说话人分离流水线")
+    parser.add_argument("--load-s", type=float, default=0.5, help="模型替身的加载耗时（秒）")
+    parser.add_argument("--latency-ms", type=float, default=20, help="模型替身每次调用的固定耗时（毫秒）")
+    parser.add_argument("--model-rtf", type=float, default=0.02, help="模型替身每秒音频的推理耗时（秒）")
+    parser.add_argument("--fixtures", help="测试音频目录（已存在时直接复用，默认生成到临时目录）")
+    parser.add_argument("--output", help="结果 JSON 路径（默认 benchmarks/results/bench-时间.json）")
+    parser.add_argument("--keep", action="store_true", help="保留临时目录")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # 子进程继承环境变量，funasr 替身据此模拟延迟
+    os.environ["FAKE_ASR_LOAD_S"] = str(args.load_s)
+    os.environ["FAKE_ASR_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["FAKE_ASR_RTF"] = str(args.model_rtf)
+
+    work_dir = tempfile.mkdtemp(prefix="asr-bench-")
+    fixtures_dir = args.fixtures or os.path.join(work_dir, "audio")
+
+    try:
+        print(f"生成测试音频: {args.files} 个文件 -> {fixtures_dir}")
+        start_time = time.perf_counter()
+        if args.fixtures and os.path.isdir(args.fixtures) and os.listdir(args.fixtures):
+            fixture_time = None
+        else:
+            generate_audio_folder(fixtures_dir, args.files, args.mix, args.format, seed=args.seed)
+            fixture_time = round(time.perf_counter() - start_time, 2)
+
+        print("扫描...")
+        scan, files = bench_scan(fixtures_dir, work_dir)
+        files.sort(key=lambda f: f["path"])
+        paths = [f["path"] for f in files]
+        audio_seconds = sum(f["duration"] or 0 for f in files)
+
+        print("解码...")
+        decode = bench_decode(paths)
+
+        print(f"识别 ({args.workers} 个进程)...")
+        recognition, results = bench_recognition(paths, audio_seconds, args.workers, args.speaker_diarization)
+
+        print("导出...")
+        export = bench_export([r for r in results if r], work_dir)
+
+        report = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "config": {
+                "files": len(paths),
+                "mix": args.mix,
+                "format": args.format,
+                "seed": args.seed,
+                "workers": args.workers,
+                "speaker_diarization": args.speaker_diarization,
+                "fake_model": os.environ.get("BENCH_REAL_MODEL") != "1",
+                "load_s": args.load_s,
+                "latency_ms": args.latency_ms,
+                "model_rtf": args.model_rtf,
+                "batch": dict(config.BATCH_CONFIG),
+            },
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "fixtures_s": fixture_time,
+            "scan": scan,
+            "decode": decode,
+            "recognition": recognition,
+            "export": export,
+            "peak_memory_mb": peak_memory_mb(),
+        }
+
+        output = args.output or os.path.join(
+            BENCH_DIR, "results", f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        print(json.dumps({
+            "files_per_s": recognition["files_per_s"],
+            "rtf": recognition["rtf"],
+            "scan_cold_s": scan["cold_s"],
+            "export_s": export["export_batch_s"],
+            "peak_memory_mb": report["peak_memory_mb"],
+        }, ensure_ascii=False))
+        print(f"结果已写入: {output}")
+        return report
+
+    finally:
+        if args.keep:
+            print(f"临时目录: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,14 @@ const API_BASE = '/api';
 // 全局状态
 const state = {
     files: [],
+    fileIndex: new Map(),
     results: [],
+    jobId: null,
     isProcessing: false,
     progressInterval: null,
+    eventSource: null,
+    progressCursor: 0,
+    isPolling: false,
     device: 'cpu',
     cudaAvailable: false
 };
@@ -40,20 +45,21 @@ const elements = {
     toastMessage: document.querySelector('.toast-message'),
     gpuOption: document.getElementById('gpuOption'),
     deviceStatus: document.getElementById('deviceStatus'),
-    speakerDiarization: document.getElementById('speakerDiarization')
+    speakerDiarization: document.getElementById('speakerDiarization'),
+    autoExport: document.getElementById('autoExport')
 };
 
 // ==================== API 调用 ====================
 
 /**
- * 扫描文件夹
+ * 扫描文件夹（后台扫描，结果通过 getScanPage 分页读取）
  */
 async function scanFolder(folderPath) {
     try {
         const response = await fetch(`${API_BASE}/scan-folder`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ folder_path: folderPath })
+            body: JSON.stringify({ folder_path: folderPath, stream: true })
         });
 
         const data = await response.json();
@@ -68,10 +74,24 @@ async function scanFolder(folderPath) {
     }
 }
 
+/**
+ * 读取一页扫描结果
+ */
+async function getScanPage(scanId, since = 0) {
+    const response = await fetch(`${API_BASE}/scan-folder/${scanId}?since=${since}`);
+    const data = await response.json();
+
+    if (!response.ok || data.error) {
+        throw new Error(data.error || '扫描失败');
+    }
+
+    return data;
+}
+
 /**
  * 开始识别
  */
-async function startRecognition(files, device = 'cpu', speakerDiarization = false) {
+async function startRecognition(files, device = 'cpu', speakerDiarization = false, autoExport = false) {
     try {
         const response = await fetch(`${API_BASE}/start-recognition`, {
             method: 'POST',
@@ -79,7 +99,8 @@ async function startRecognition(files, device = 'cpu', speakerDiarization = fals
             body: JSON.stringify({
                 files,
                 device,
-                speaker_diarization: speakerDiarization
+                speaker_diarization: speakerDiarization,
+                export_on_complete: autoExport
             })
         });
 
@@ -110,11 +131,11 @@ async function getDeviceStatus() {
 }
 
 /**
- * 停止识别
+ * 停止识别（只停止本页面提交的任务）
  */
 async function stopRecognition() {
     try {
-        const response = await fetch(`${API_BASE}/stop-recognition`, {
+        const response = await fetch(`${API_BASE}/jobs/${state.jobId}/stop`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' }
         });
@@ -127,11 +148,11 @@ async function stopRecognition() {
 }
 
 /**
- * 获取进度
+ * 获取进度（只返回游标之后的新结果）
  */
-async function getProgress() {
+async function getProgress(since = 0) {
     try {
-        const response = await fetch(`${API_BASE}/progress`);
+        const response = await fetch(`${API_BASE}/jobs/${state.jobId}/progress?since=${since}`);
         return await response.json();
     } catch (error) {
         console.error('获取进度失败:', error);
@@ -140,14 +161,14 @@ async function getProgress() {
 }
 
 /**
- * 导出结果
+ * 导出结果（服务端直接读取任务结果，无需上传）
  */
-async function exportResults(results) {
+async function exportResults() {
     try {
-        const response = await fetch(`${API_BASE}/export-results`, {
+        const response = await fetch(`${API_BASE}/jobs/${state.jobId}/export`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ results })
+            body: JSON.stringify({})
         });
 
         const data = await response.json();
@@ -214,7 +235,10 @@ function updateFilesTable() {
                 <div class="file-name">${file.name}</div>
                 <div class="file-path">${file.path}</div>
             </td>
-            <td>${file.size_mb} MB</td>
+            <td>
+                <div>${file.size_mb} MB</div>
+                ${file.duration != null ? `<div class="file-path">${formatDuration(file.duration)}</div>` : ''}
+            </td>
             <td>
                 <span class="status-badge status-${file.status}">
                     ${getStatusText(file.status)}
@@ -230,6 +254,30 @@ function updateFilesTable() {
     });
 }
 
+/**
+ * 格式化时长（秒）
+ */
+function formatDuration(seconds) {
+    seconds = Math.round(seconds);
+    const hours = Math.floor(seconds / 3600);
+    const minutes = Math.floor((seconds % 3600) / 60);
+    const secs = seconds % 60;
+    const pad = (n) => String(n).padStart(2, '0');
+    return hours > 0 ? `${pad(hours)}:${pad(minutes)}:${pad(secs)}` : `${pad(minutes)}:${pad(secs)}`;
+}
+
+/**
+ * 根据音频路径查找文件序号（服务端按时长调度，结果顺序与文件列表不同）
+ */
+function findFileIndex(result) {
+    // 后端返回文件在任务中的序号，同一路径出现多次时也能对应到正确的文件
+    if (result.file_index !== undefined && result.file_index < state.files.length) {
+        return result.file_index;
+    }
+    const index = state.fileIndex.get(result.audio_path);
+    return index === undefined ? -1 : index;
+}
+
 /**
  * 获取状态文本
  */
@@ -252,21 +300,174 @@ function updateProgress(progressData) {
     const percentage = total > 0 ? Math.round((current_index / total) * 100) : 0;
     elements.progressFill.style.width = `${percentage}%`;
     elements.progressPercentage.textContent = `${percentage}%`;
-    elements.progressText.textContent = `${current_index} / ${total}`;
-    elements.currentFile.textContent = current_file || '-';
+    let progressText = `${current_index} / ${total}`;
+    if (progressData.rtf != null) {
+        progressText += ` · RTF ${progressData.rtf.toFixed(2)}`;
+    }
+    if (progressData.eta_seconds != null) {
+        progressText += ` · 剩余约 ${formatDuration(progressData.eta_seconds)}`;
+    }
+    elements.progressText.textContent = progressText;
+    if (current_file !== undefined) {
+        elements.currentFile.textContent = current_file || '-';
+    }
 
-    // 更新文件列表中的状态
+    // 合并新结果并更新文件列表中的状态
     if (progressData.results && progressData.results.length > 0) {
-        progressData.results.forEach((result, index) => {
-            if (state.files[index]) {
-                state.files[index].status = result.success ? 'completed' : 'failed';
-                state.files[index].result = result;
+        progressData.results.forEach((result, offset) => {
+            const index = progressData.since + offset;
+            state.results[index] = result;
+            const file = state.files[findFileIndex(result)];
+            if (file) {
+                file.status = result.success ? 'completed' : 'failed';
+                file.result = result;
             }
         });
+        state.progressCursor = progressData.next_index;
         updateFilesTable();
     }
 }
 
+/**
+ * 拉取进度，结果较多时连续翻页直到追上服务端
+ */
+async function pollProgress() {
+    let progressData = await getProgress(state.progressCursor);
+
+    while (progressData) {
+        updateProgress(progressData);
+        if (!progressData.has_more) {
+            break;
+        }
+        progressData = await getProgress(state.progressCursor);
+    }
+
+    return progressData;
+}
+
+/**
+ * 同步一次进度（补拉游标之后的结果），服务端处理结束时收尾
+ */
+async function syncProgress() {
+    // 上一次同步尚未结束时跳过
+    if (state.isPolling) {
+        return;
+    }
+
+    state.isPolling = true;
+    let progressData;
+    try {
+        progressData = await pollProgress();
+    } finally {
+        state.isPolling = false;
+    }
+
+    if (progressData && state.isProcessing && !progressData.is_processing && !progressData.has_more) {
+        finishRecognition(progressData);
+    }
+}
+
+/**
+ * 开始轮询进度（推送不可用时的后备方案）
+ */
+function startPolling() {
+    if (!state.progressInterval) {
+        state.progressInterval = setInterval(syncProgress, 500);
+    }
+}
+
+/**
+ * 订阅进度推送（Server-Sent Events），不支持或连接失败时退回轮询
+ */
+function subscribeProgress() {
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+
+    const source = new EventSource(`${API_BASE}/progress/stream?job_id=${encodeURIComponent(state.jobId)}`);
+    state.eventSource = source;
+
+    // 连接建立后补拉连接前已完成的结果
+    source.addEventListener('connected', syncProgress);
+
+    source.addEventListener('file_start', (event) => {
+        const data = JSON.parse(event.data);
+        elements.currentFile.textContent = data.current_file || '-';
+    });
+
+    const onFileResult = (event) => {
+        const data = JSON.parse(event.data);
+
+        // 序号不连续说明有事件遗漏，改为从游标处补拉
+        if (data.index !== state.progressCursor) {
+            syncProgress();
+            return;
+        }
+
+        updateProgress({
+            current_index: data.index + 1,
+            total: data.total,
+            rtf: data.rtf,
+            eta_seconds: data.eta_seconds,
+            results: [data.result],
+            since: data.index,
+            next_index: data.index + 1
+        });
+    };
+    source.addEventListener('file_done', onFileResult);
+    source.addEventListener('file_error', onFileResult);
+
+    source.addEventListener('job_done', syncProgress);
+    source.addEventListener('idle', syncProgress);
+
+    source.onerror = () => {
+        source.close();
+        state.eventSource = null;
+        if (state.isProcessing) {
+            startPolling();
+        }
+    };
+}
+
+/**
+ * 停止接收进度更新
+ */
+function stopProgressUpdates() {
+    if (state.progressInterval) {
+        clearInterval(state.progressInterval);
+        state.progressInterval = null;
+    }
+    if (state.eventSource) {
+        state.eventSource.close();
+        state.eventSource = null;
+    }
+}
+
+/**
+ * 识别完成后的收尾
+ */
+function finishRecognition(progressData) {
+    stopProgressUpdates();
+    state.isProcessing = false;
+
+    elements.resultsList.innerHTML = '';
+    state.results.forEach((result) => {
+        addResultPreview(result, findFileIndex(result));
+    });
+
+    updateButtons();
+
+    // 已在识别过程中自动导出，无需再手动导出
+    const exportInfo = progressData && progressData.export;
+    if (exportInfo && exportInfo.formats) {
+        elements.exportBtn.disabled = true;
+        showToast(`识别完成！已导出 ${exportInfo.exported_count} 个文件到 ${exportInfo.output_dir}`, 'success');
+    } else {
+        showToast('识别完成！', 'success');
+    }
+}
+
 /**
  * 添加结果预览
  */
@@ -397,13 +598,29 @@ elements.scanBtn.addEventListener('click', async () => {
     setLoading(true, '正在扫描文件夹...');
 
     try {
-        const data = await scanFolder(folderPath);
+        let data = await scanFolder(folderPath);
+        const files = [];
+
+        // 逐页读取扫描结果，直到后台扫描结束
+        while (true) {
+            data.files.forEach(f => files.push({
+                ...f,
+                status: 'pending',
+                result: null
+            }));
+            setLoading(true, `正在扫描文件夹... 已找到 ${data.count} 个音频文件`);
+
+            if (data.done && !data.has_more) {
+                break;
+            }
+            if (!data.has_more) {
+                await new Promise(resolve => setTimeout(resolve, 200));
+            }
+            data = await getScanPage(data.scan_id, files.length);
+        }
 
-        state.files = data.files.map(f => ({
-            ...f,
-            status: 'pending',
-            result: null
-        }));
+        state.files = files;
+        state.fileIndex = new Map(files.map((file, index) => [file.path, index]));
         state.results = [];
 
         updateFilesTable();
@@ -438,39 +655,19 @@ elements.startBtn.addEventListener('click', async () => {
     const speakerDiarization = elements.speakerDiarization.checked;
 
     try {
-        await startRecognition(state.files, selectedDevice, speakerDiarization);
+        const data = await startRecognition(state.files, selectedDevice, speakerDiarization, elements.autoExport.checked);
 
+        state.jobId = data.job_id;
         state.isProcessing = true;
+        state.results = [];
+        state.progressCursor = 0;
         elements.progressSection.style.display = 'block';
         elements.resultsSection.style.display = 'block';
         elements.resultsList.innerHTML = '';
 
         updateButtons();
 
-        state.progressInterval = setInterval(async () => {
-            const progressData = await getProgress();
-
-            if (progressData) {
-                updateProgress(progressData);
-
-                if (progressData.results) {
-                    state.results = progressData.results;
-                }
-
-                if (!progressData.is_processing) {
-                    clearInterval(state.progressInterval);
-                    state.isProcessing = false;
-
-                    elements.resultsList.innerHTML = '';
-                    state.results.forEach((result, index) => {
-                        addResultPreview(result, index);
-                    });
-
-                    updateButtons();
-                    showToast('识别完成！', 'success');
-                }
-            }
-        }, 500);
+        subscribeProgress();
 
     } catch (error) {
         state.isProcessing = false;
@@ -486,9 +683,7 @@ elements.stopBtn.addEventListener('click', async () => {
     if (confirm('确定要停止识别吗？')) {
         await stopRecognition();
 
-        if (state.progressInterval) {
-            clearInterval(state.progressInterval);
-        }
+        stopProgressUpdates();
 
         state.isProcessing = false;
         updateButtons();
@@ -508,7 +703,7 @@ elements.exportBtn.addEventListener('click', async () => {
     setLoading(true, '正在导出结果...');
 
     try {
-        const data = await exportResults(state.results);
+        const data = await exportResults();
 
         showToast(
             `成功导出 ${data.exported_count} 个文件到 ${data.output_dir}`,
@@ -529,6 +724,7 @@ elements.exportBtn.addEventListener('click', async () => {
 elements.clearBtn.addEventListener('click', () => {
     if (confirm('确定要清空列表吗？')) {
         state.files = [];
+        state.fileIndex = new Map();
         state.results = [];
 
         elements.filesTableBody.innerHTML = `
@@ -566,10 +762,17 @@ elements.folderPath.addEventListener('keypress', (e) => {
  */
 async function checkDeviceStatus() {
     const status = await getDeviceStatus();
-    state.cudaAvailable = status.cuda_available;
-
     const statusText = elements.deviceStatus.querySelector('.status-text');
 
+    // 服务刚启动、模型仍在后台加载时暂不检测 GPU，稍后重试
+    if (status.cuda_available === null) {
+        statusText.textContent = '模型加载中...';
+        setTimeout(checkDeviceStatus, 2000);
+        return;
+    }
+
+    state.cudaAvailable = status.cuda_available;
+
     if (status.cuda_available) {
         elements.deviceStatus.className = 'device-status cuda-available';
         statusText.textContent = 'GPU 可用';
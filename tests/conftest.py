@@ -0,0 +1,50 @@
+"""
+测试公共配置
+使用 benchmarks/fake_funasr 代替真实模型，数据库、缓存、索引都写入临时目录
+"""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmarks", "fake_funasr"))
+
+os.environ.setdefault("FAKE_ASR_LOAD_S", "0")
+os.environ.setdefault("FAKE_ASR_LATENCY_MS", "0")
+os.environ.setdefault("FAKE_ASR_RTF", "0")
+
+import pytest  # noqa: E402
+
+from backend.utils import config  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_config(tmp_path, monkeypatch):
+    """任务数据库、识别缓存、目录索引和导出目录指向临时目录"""
+    monkeypatch.setitem(config.JOB_CONFIG, "db_path", str(tmp_path / "jobs.db"))
+    monkeypatch.setitem(config.CACHE_CONFIG, "dir", str(tmp_path / "cache"))
+    monkeypatch.setitem(config.CACHE_CONFIG, "enabled", False)
+    monkeypatch.setitem(config.SCAN_CONFIG, "index_path", str(tmp_path / "scan_index.db"))
+    monkeypatch.setitem(config.MODEL_LOAD_CONFIG, "warmup", False)
+    monkeypatch.setitem(config.MODEL_LOAD_CONFIG, "mmap_weights", False)
+
+    # 按上面的路径重新创建的单例
+    from backend import folder_scanner, job_store, transcription_cache
+    monkeypatch.setattr(job_store, "_job_store", None)
+    monkeypatch.setattr(folder_scanner, "_scan_index", None)
+    monkeypatch.setattr(transcription_cache, "_transcription_cache", None)
+
+
+def write_speech(path: str, duration_s: float = 8.0, seed: int = 0) -> str:
+    """写一个含多段语音的 16kHz wav 文件"""
+    import numpy as np
+    from benchmarks.fixtures import synth_speech, write_audio
+
+    write_audio(path, synth_speech(duration_s, 16000, np.random.default_rng(seed)), 16000)
+    return path
+
+
+@pytest.fixture
+def speech_file(tmp_path):
+    """8 秒、含多段语音的 16kHz wav 文件"""
+    return write_speech(str(tmp_path / "speech.wav"))
@@ -0,0 +1,65 @@
+"""HTTP 接口"""
+import re
+import time
+
+from backend import app as app_module
+from backend.app import app
+from backend.job_manager import JobManager
+from backend.job_store import get_job_store
+from backend.utils import config
+
+from conftest import write_speech
+
+
+def _metric(text, name, **labels):
+    """指标各序列之和（只统计带有给定标签的序列）"""
+    total = 0
+    for line in text.splitlines():
+        match = re.match(rf"{name}(\{{.*\}})? (\S+)$", line)
+        if match and all(f'{key}="{value}"' in (match.group(1) or "") for key, value in labels.items()):
+            total += float(match.group(2))
+    return total
+
+
+def test_single_request_streaming_rejected_without_body_streaming(monkeypatch):
+    monkeypatch.setitem(app.config, "STREAMING_REQUEST_BODY", False)
+
+    response = app.test_client().post("/api/stream/recognize", data=b"\0" * 3200)
+
+    assert response.status_code == 501
+    assert "/api/stream/start" in response.get_json()["error"]
+
+
+def test_metrics_aggregate_worker_processes(tmp_path, monkeypatch):
+    monkeypatch.setitem(config.CACHE_CONFIG, "enabled", True)
+    manager = JobManager(max_workers=2, group_size=1)
+    monkeypatch.setattr(app_module, "get_job_manager", lambda: manager)
+    client = app.test_client()
+    load_seconds_before = _metric(client.get("/metrics").get_data(as_text=True), "asr_model_load_seconds_count")
+
+    paths = [write_speech(str(tmp_path / f"{k}.wav"), 2.0, seed=k) for k in range(2)]
+    try:
+        assert manager.warm_up() == 2
+        # 第二次提交相同的文件命中子进程中的结果缓存
+        for _ in range(2):
+            run = manager.submit(get_job_store().create_job(paths))
+            deadline = time.time() + 60
+            while run.is_processing and time.time() < deadline:
+                time.sleep(0.05)
+            assert run.status == "completed"
+
+        # 子进程的上报经队列异步到达
+        deadline = time.time() + 10
+        while manager.model_stats()["load_count"] < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        text = client.get("/metrics").get_data(as_text=True)
+    finally:
+        manager.drain(timeout=0)
+
+    assert _metric(text, "asr_model_loads") == 2
+    assert _metric(text, "asr_models_loaded") == 2
+    assert len(re.findall(r"^asr_model_memory_bytes\{", text, re.M)) == 2
+    assert _metric(text, "asr_model_load_seconds_count") - load_seconds_before >= 2
+    assert _metric(text, "asr_cache_lookups", result="hit") == 2
+    assert _metric(text, "asr_cache_lookups", result="miss") == 2
+    assert _metric(text, "asr_cache_hit_ratio") == 0.5
@@ -0,0 +1,53 @@
+"""跨文件批量识别"""
+from backend.asr_engine import ASREngine
+from backend.utils import config
+
+from conftest import write_speech
+
+
+def _transcribe(paths, buffered_files, monkeypatch):
+    monkeypatch.setitem(config.BATCH_CONFIG, "buffered_files", buffered_files)
+    return ASREngine().transcribe_batch(paths)
+
+
+def test_rolling_batches_match_single_pass(tmp_path, monkeypatch):
+    paths = [write_speech(str(tmp_path / f"{k}.wav"), 2.0 + k, seed=k) for k in range(5)]
+
+    single_pass = _transcribe(paths, 100, monkeypatch)
+    rolling = _transcribe(paths, 2, monkeypatch)
+
+    assert [r["success"] for r in rolling] == [True] * 5
+    assert [r["text"] for r in rolling] == [r["text"] for r in single_pass]
+    assert [r["sentences"] for r in rolling] == [r["sentences"] for r in single_pass]
+
+
+def test_rolling_batches_bound_buffered_files(tmp_path, monkeypatch):
+    paths = [write_speech(str(tmp_path / f"{k}.wav"), 2.0, seed=k) for k in range(5)]
+    engine = ASREngine()
+    calls = []
+    infer = engine._infer_segments
+
+    def record(segments, *args):
+        calls.append({segment[1] for segment in segments})
+        infer(segments, *args)
+
+    monkeypatch.setattr(engine, "_infer_segments", record)
+    monkeypatch.setitem(config.BATCH_CONFIG, "buffered_files", 2)
+    results = engine.transcribe_batch(paths + [str(tmp_path / "missing.wav")])
+
+    assert [len(files) for files in calls] == [2, 2, 1]
+    assert results[-1]["success"] is False
+
+
+def test_cached_results_keep_the_shape_of_each_path(speech_file, monkeypatch):
+    monkeypatch.setitem(config.CACHE_CONFIG, "enabled", True)
+    engine = ASREngine()
+
+    single = engine.transcribe(speech_file)
+    batched = engine.transcribe_batch([speech_file])[0]
+
+    # 完整流水线的结果不含 sentences，不能作为跨文件批量识别的缓存结果返回
+    assert "sentences" not in single
+    assert batched["sentences"] and not batched.get("cached")
+    assert engine.transcribe_batch([speech_file])[0]["cached"] is True
+    assert engine.transcribe(speech_file)["cached"] is True
@@ -0,0 +1,32 @@
+"""按窗口流式解码"""
+import numpy as np
+import pytest
+import soundfile as sf
+
+from backend.audio_processor import AudioProcessor
+
+from conftest import write_speech
+
+
+def test_windows_concatenate_to_full_audio(tmp_path):
+    path = write_speech(str(tmp_path / "a.wav"), 5.0)
+    full, _ = sf.read(path, dtype="float32")
+
+    windows = list(AudioProcessor.iter_audio_windows(path, 1.5))
+
+    assert [len(w) for w in windows] == [24000, 24000, 24000, 8000]
+    np.testing.assert_allclose(np.concatenate(windows), full, atol=1e-6)
+
+
+def test_resampled_windows_match_single_pass(tmp_path):
+    soxr = pytest.importorskip("soxr")
+    t = np.arange(int(44100 * 3.3)) / 44100
+    tone = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    path = str(tmp_path / "tone.wav")
+    sf.write(path, tone, 44100, subtype="FLOAT")
+
+    windows = list(AudioProcessor.iter_audio_windows(path, 1.0))
+    expected = soxr.resample(tone, 44100, 16000)
+
+    assert len(windows) == 4
+    np.testing.assert_allclose(np.concatenate(windows), expected, atol=1e-4)
@@ -0,0 +1,106 @@
+"""离线批量识别：分片和输出清单"""
+import json
+import os
+import zlib
+
+import pytest
+
+from backend.batch_runner import (
+    MANIFEST_NAME, BatchRunner, collect_folder, in_shard, parse_shard, read_output_manifest, repair_output_manifest
+)
+
+from conftest import write_speech
+
+
+def _record(audio_path, success=True):
+    return json.dumps({"audio_path": audio_path, "success": success}) + "\n"
+
+
+def test_repair_truncates_partial_last_line(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(_record("a.wav") + '{"audio_path": "b.wav", "succ', encoding="utf-8")
+
+    assert repair_output_manifest(str(manifest)) == len('{"audio_path": "b.wav", "succ')
+    assert manifest.read_text(encoding="utf-8") == _record("a.wav")
+
+    # 修复后追加的记录独占一行
+    with open(manifest, "a", encoding="utf-8") as f:
+        f.write(_record("c.wav"))
+    assert [r["audio_path"] for r in read_output_manifest(str(manifest))] == ["a.wav", "c.wav"]
+
+
+def test_repair_keeps_complete_manifest(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    content = _record("a.wav") + _record("b.wav", success=False)
+    manifest.write_text(content, encoding="utf-8")
+
+    assert repair_output_manifest(str(manifest)) == 0
+    assert manifest.read_text(encoding="utf-8") == content
+    assert repair_output_manifest(str(tmp_path / "missing.jsonl")) == 0
+
+
+def test_parse_shard():
+    assert parse_shard("0/1") == (0, 1)
+    assert parse_shard("3/8") == (3, 8)
+    for value in ("8/8", "-1/4", "1/0", "1", "a/b", "1/2/3"):
+        with pytest.raises(ValueError):
+            parse_shard(value)
+
+
+def test_shards_partition_keys_by_crc32():
+    keys = [f"2024-{month:02d}/call-{k}.wav" for month in range(1, 13) for k in range(50)]
+    shards = [[key for key in keys if in_shard(key, (index, 4))] for index in range(4)]
+
+    # 每个文件恰好属于一个分片，且与 CRC32 取模一致
+    assert sorted(key for shard in shards for key in shard) == sorted(keys)
+    for index, shard in enumerate(shards):
+        assert all(zlib.crc32(key.encode("utf-8")) % 4 == index for key in shard)
+        assert len(shard) > len(keys) // 8
+    assert all(in_shard(key, (0, 1)) for key in keys)
+
+
+def test_shard_assignment_is_stable_when_files_are_added():
+    keys = [f"a/{k}.wav" for k in range(100)]
+    before = {key: [in_shard(key, (i, 3)) for i in range(3)].index(True) for key in keys}
+    after = {key: [in_shard(key, (i, 3)) for i in range(3)].index(True) for key in keys + ["b/new.wav"]}
+    assert all(after[key] == shard for key, shard in before.items())
+
+
+def test_read_output_manifest_skips_partial_and_invalid_lines(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(
+        _record("a.wav")
+        + '{"audio_path": "b.wav", "succ\n'
+        + "[1, 2]\n"
+        + json.dumps({"success": True}) + "\n"
+        + _record("c.wav", success=False)
+        + '{"audio_path": "d.wav"',
+        encoding="utf-8",
+    )
+
+    assert [(r["audio_path"], r["success"]) for r in read_output_manifest(str(manifest))] == [
+        ("a.wav", True), ("c.wav", False)]
+    assert list(read_output_manifest(str(tmp_path / "missing.jsonl"))) == []
+
+
+def test_runner_resumes_from_interrupted_manifest(tmp_path):
+    audio = tmp_path / "audio"
+    audio.mkdir()
+    for k in range(3):
+        write_speech(str(audio / f"{k}.wav"), 2.0, seed=k)
+    entries = collect_folder(str(audio))
+    output_dir = str(tmp_path / "out")
+
+    first = BatchRunner(entries, output_dir, formats=["jsonl"], max_workers=1).run()
+    assert (first["success_count"], first["skipped_count"]) == (3, 0)
+
+    # 模拟中断：只保留第一条记录和写了一半的第二条
+    manifest = tmp_path / "out" / MANIFEST_NAME
+    lines = manifest.read_text(encoding="utf-8").splitlines(keepends=True)
+    manifest.write_text(lines[0] + lines[1][:20], encoding="utf-8")
+
+    second = BatchRunner(entries, output_dir, formats=["jsonl"], max_workers=1).run()
+    assert (second["success_count"], second["skipped_count"]) == (2, 1)
+    records = list(read_output_manifest(str(manifest)))
+    assert sorted(os.path.basename(r["audio_path"]) for r in records) == ["0.wav", "1.wav", "2.wav"]
+    assert len(manifest.read_text(encoding="utf-8").splitlines()) == 3
@@ -0,0 +1,78 @@
+"""任务文件表"""
+from backend.job_manager import JobItemTable
+
+
+def _item(index, status, attempts=0, result=None):
+    return {"index": index, "path": f"/audio/{index}.wav", "status": status, "attempts": attempts, "result": result}
+
+
+def test_status_transitions_and_counts():
+    table = JobItemTable(["a.wav", "b.wav", "c.wav"])
+    assert table.counts() == {"pending": 3, "running": 0, "completed": 0, "failed": 0}
+
+    table.mark_running([0, 1])
+    assert table.status(0) == "running"
+    assert table.counts()["running"] == 2
+
+    assert table.set_result(1, {"success": False, "error": "x"}) == 0
+    assert table.set_result(0, {"success": True, "text": "好"}) == 1
+    assert table.status(0) == "completed" and table.status(1) == "failed"
+    assert table.counts() == {"pending": 1, "running": 0, "completed": 1, "failed": 1}
+    assert table.done_count == 2
+
+    # 只有执行中的文件才会恢复为待处理
+    table.mark_running([2])
+    table.mark_pending([0, 2])
+    assert table.status(0) == "completed" and table.status(2) == "pending"
+    assert table.pending_indexes() == [2]
+
+
+def test_page_follows_completion_order():
+    table = JobItemTable(["a.wav", "b.wav", "c.wav"])
+    for index in (2, 0, 1):
+        table.set_result(index, {"success": True, "text": str(index)})
+
+    assert [r["file_index"] for r in table.page()] == [2, 0, 1]
+    assert [r["file_index"] for r in table.page(1, limit=1)] == [0]
+    assert table.page(3) == []
+    # results 按文件顺序
+    assert [r["text"] for r in table.results()] == ["0", "1", "2"]
+
+
+def test_append_adds_pending_files():
+    table = JobItemTable(["a.wav"])
+    assert table.append(["b.wav", "c.wav"]) == 1
+    assert len(table) == 3
+    assert table.path(2) == "c.wav"
+    assert table.paths() == ["a.wav", "b.wav", "c.wav"]
+    assert table.pending_indexes() == [0, 1, 2]
+    assert table.counts()["pending"] == 3
+
+
+def test_from_store_retries_failed_files_below_max_attempts():
+    failed = {"success": False, "error": "解码失败"}
+    table = JobItemTable.from_store([
+        _item(0, "completed", 1, {"success": True, "text": "好"}),
+        _item(1, "failed", 1, failed),
+        _item(2, "failed", 3, failed),
+        _item(3, "running", 1),
+        _item(4, "pending"),
+    ], max_attempts=3)
+
+    assert [table.status(i) for i in range(5)] == ["completed", "pending", "failed", "pending", "pending"]
+    assert table.pending_indexes() == [1, 3, 4]
+    assert table.counts() == {"pending": 3, "running": 0, "completed": 1, "failed": 1}
+    assert table.done_count == 2
+    assert [r["file_index"] for r in table.page()] == [0, 2]
+
+
+def test_from_store_without_max_attempts_keeps_failed():
+    table = JobItemTable.from_store([_item(0, "failed", 1, {"success": False})])
+    assert table.status(0) == "failed"
+    assert table.pending_indexes() == []
+
+
+def test_set_result_counts_attempts():
+    table = JobItemTable.from_store([_item(0, "failed", 1, {"success": False})], max_attempts=3)
+    table.set_result(0, {"success": False})
+    assert table._attempts[0] == 2
@@ -0,0 +1,74 @@
+"""任务调度器"""
+import threading
+import time
+
+from backend import job_manager as job_manager_module
+from backend.job_manager import JobManager
+from backend.job_store import get_job_store
+from backend.readiness import ServiceReadiness
+
+from conftest import write_speech
+
+
+def _wait_finished(run, timeout=30):
+    deadline = time.time() + timeout
+    while run.is_processing and time.time() < deadline:
+        time.sleep(0.05)
+    assert not run.is_processing
+
+
+def test_file_start_published_for_every_file_in_group(tmp_path, monkeypatch):
+    events = []
+    monkeypatch.setattr(job_manager_module.progress_events, "publish", lambda event, data: events.append((event, data)))
+
+    paths = [write_speech(str(tmp_path / f"{k}.wav"), 3.0, seed=k) for k in range(3)]
+    job_id = get_job_store().create_job(paths)
+    manager = JobManager(max_workers=1, group_size=3)
+    run = manager.submit(job_id)
+    _wait_finished(run)
+    manager.drain(timeout=0)
+
+    starts = [data for event, data in events if event == "file_start"]
+    assert sorted(data["file"] for data in starts) == ["0.wav", "1.wav", "2.wav"]
+    # 同一组的文件一起识别，不把第一个文件当作整组的当前文件
+    assert starts[-1]["current_file"].endswith("等 3 个文件")
+    assert run.status == "completed"
+    assert run.current_file == "" and run.current_files == []
+
+
+def test_jobs_wait_for_model_preload(tmp_path, monkeypatch):
+    loaded = threading.Event()
+    state = ServiceReadiness()
+    monkeypatch.setattr(job_manager_module, "readiness", state)
+    state.start(loaded.wait)
+
+    job_id = get_job_store().create_job([write_speech(str(tmp_path / "a.wav"), 2.0)])
+    manager = JobManager(max_workers=1)
+    run = manager.submit(job_id)
+
+    time.sleep(0.3)
+    assert run.status == "pending" and run.items.done_count == 0
+
+    loaded.set()
+    _wait_finished(run)
+    manager.drain(timeout=0)
+    assert run.status == "completed"
+
+
+def test_jobs_stop_when_model_preload_fails(tmp_path, monkeypatch):
+    def fail():
+        raise RuntimeError("funasr 库未安装")
+
+    state = ServiceReadiness()
+    monkeypatch.setattr(job_manager_module, "readiness", state)
+    state.start(fail).join()
+
+    job_id = get_job_store().create_job([write_speech(str(tmp_path / "a.wav"), 2.0)])
+    manager = JobManager(max_workers=1)
+    run = manager.submit(job_id)
+    _wait_finished(run)
+    manager.drain(timeout=0)
+
+    assert run.status == "stopped"
+    assert "funasr 库未安装" in run.error
+    assert run.items.counts()["pending"] == 1
@@ -0,0 +1,76 @@
+"""任务持久化与断点续跑"""
+import time
+
+from backend.job_manager import JobManager
+from backend.job_store import JobStore, get_job_store
+from backend.utils.config import JOB_CONFIG
+
+from conftest import write_speech
+
+
+def test_interrupted_job_is_resumable_after_reopen(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    store = JobStore(db_path)
+    job_id = store.create_job(["a.wav", "b.wav", "c.wav"], export_formats=["markdown", "jsonl"], priority=2)
+    stopped_id = store.create_job(["d.wav"])
+    store.set_job_status(job_id, "running")
+    store.set_job_status(stopped_id, "stopped")
+    store.save_result(job_id, 0, {"success": True, "text": "好", "audio_path": "a.wav"})
+    store.save_result(job_id, 1, {"success": False, "error": "解码失败", "audio_path": "b.wav"})
+    store.close()
+
+    # 模拟服务重启
+    store = JobStore(db_path)
+    assert store.get_resumable_jobs() == [job_id]
+
+    job = store.get_job(job_id)
+    assert job["status"] == "running"
+    assert job["export_formats"] == ["markdown", "jsonl"]
+    assert job["priority"] == 2
+    assert job["counts"] == {"completed": 1, "failed": 1, "pending": 1}
+
+    items = store.get_items(job_id)
+    assert [(item["status"], item["attempts"]) for item in items] == [("completed", 1), ("failed", 1), ("pending", 0)]
+    assert items[0]["result"]["text"] == "好"
+    assert items[2]["result"] is None
+
+
+def test_add_items_extends_folder_job(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    source = {"folder": "/audio", "filters": {"extensions": [".wav"]}}
+    job_id = store.create_job([], source=source)
+
+    assert store.add_items(job_id, ["a.wav", "b.wav"]) == 0
+    assert store.add_items(job_id, ["c.wav"]) == 2
+    job = store.get_job(job_id)
+    assert job["total"] == 3
+    assert job["source"] == source
+    assert [item["path"] for item in store.get_items(job_id)] == ["a.wav", "b.wav", "c.wav"]
+
+
+def test_resume_only_transcribes_unfinished_files(tmp_path):
+    paths = [write_speech(str(tmp_path / f"{k}.wav"), 2.0, seed=k) for k in range(3)]
+    store = get_job_store()
+    job_id = store.create_job(paths)
+    store.set_job_status(job_id, "running")
+    done = {"success": True, "text": "已完成", "audio_path": paths[0]}
+    store.save_result(job_id, 0, done)
+    # 已达到重试上限的失败文件不再识别
+    for _ in range(JOB_CONFIG["max_attempts"]):
+        store.save_result(job_id, 1, {"success": False, "error": "解码失败", "audio_path": paths[1]})
+
+    manager = JobManager(max_workers=1)
+    run = manager.submit(job_id)
+    deadline = time.time() + 30
+    while run.is_processing and time.time() < deadline:
+        time.sleep(0.05)
+    manager.drain(timeout=0)
+
+    assert run.status == "completed"
+    assert run.files_todo == 1
+    items = store.get_items(job_id)
+    assert [(item["status"], item["attempts"]) for item in items] == [
+        ("completed", 1), ("failed", JOB_CONFIG["max_attempts"]), ("completed", 1)]
+    assert items[0]["result"]["text"] == "已完成"
+    assert store.get_job(job_id)["status"] == "completed"
+    assert store.get_resumable_jobs() == []
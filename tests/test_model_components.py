@@ -0,0 +1,76 @@
+"""权重映射缓存"""
+import os
+
+import pytest
+
+from backend import model_components
+from backend.utils import config
+
+
+class Component:
+    """带 kwargs 的 AutoModel 替身，model 为待映射参数的子模型"""
+
+    def __init__(self, model, checkpoint):
+        self.model = model
+        self.kwargs = {"init_param": checkpoint}
+
+
+@pytest.fixture
+def weights_dir(tmp_path, monkeypatch):
+    monkeypatch.setitem(config.MODEL_LOAD_CONFIG, "mmap_weights", True)
+    monkeypatch.setitem(config.MODEL_LOAD_CONFIG, "weights_dir", str(tmp_path / "weights"))
+    return tmp_path / "weights"
+
+
+def _rewrite(path, data: bytes):
+    """写入新内容并推后修改时间（同一时间戳内重写也能区分）"""
+    path.write_bytes(data)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_updated_checkpoint_uses_new_cache_file(tmp_path, weights_dir, monkeypatch):
+    class Module:
+        def state_dict(self):
+            return {}
+
+        def load_state_dict(self, state, assign=False):
+            pass
+
+    mapped = []
+
+    def record(module, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "w").close()
+        mapped.append(path)
+
+    monkeypatch.setattr(model_components, "map_module_weights", record)
+    checkpoint = tmp_path / "model.pt"
+    _rewrite(checkpoint, b"old")
+    model_components._map_component_weights("base", "cpu", Component(Module(), str(checkpoint)))
+    model_components._map_component_weights("base", "cpu", Component(Module(), str(checkpoint)))
+    _rewrite(checkpoint, b"new")
+    model_components._map_component_weights("base", "cpu", Component(Module(), str(checkpoint)))
+
+    assert mapped[0] == mapped[1] != mapped[2]
+    assert sorted(os.listdir(weights_dir)) == [os.path.basename(mapped[2])]
+
+
+def test_cache_rebuilt_when_weights_change_with_same_shapes(tmp_path, weights_dir):
+    torch = pytest.importorskip("torch")
+    checkpoint = tmp_path / "model.pt"
+
+    old = torch.nn.Linear(4, 4)
+    torch.save(old.state_dict(), checkpoint)
+    model_components._map_component_weights("base", "cpu", Component(old, str(checkpoint)))
+
+    new = torch.nn.Linear(4, 4)
+    with torch.no_grad():
+        new.weight.add_(1.0)
+    expected = new.weight.detach().clone()
+    torch.save(new.state_dict(), checkpoint)
+    stat = os.stat(checkpoint)
+    os.utime(checkpoint, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    model_components._map_component_weights("base", "cpu", Component(new, str(checkpoint)))
+
+    assert torch.equal(new.weight, expected)
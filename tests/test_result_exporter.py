@@ -0,0 +1,35 @@
+"""后台导出"""
+import json
+import os
+
+from backend.result_exporter import BackgroundExporter
+
+
+def _result(name):
+    return {"success": True, "text": f"{name} 的识别结果", "audio_path": f"/audio/{name}.wav", "process_time": 1.0}
+
+
+def test_already_exported_results_are_counted(tmp_path):
+    exporter = BackgroundExporter(str(tmp_path), ["markdown", "jsonl"])
+    exporter.submit(_result("old"), write_file=False)
+    exporter.submit(_result("new"))
+    exporter.submit({"success": False, "error": "x", "audio_path": "/audio/bad.wav"}, write_file=False)
+    export = exporter.close()
+
+    assert export["exported_count"] == 2
+    assert export["already_exported_count"] == 1
+    assert export["counts"] == {"markdown": 1, "jsonl": 3}
+    # 之前已导出的结果不再写单个文件，但仍写入汇总和 JSONL
+    assert sorted(name for name in os.listdir(tmp_path) if not name.startswith(("summary_", "results_"))) == ["new.md"]
+    with open(export["paths"]["jsonl"], encoding="utf-8") as f:
+        assert len([json.loads(line) for line in f]) == 3
+
+
+def test_stream_format_count_includes_all_results(tmp_path):
+    exporter = BackgroundExporter(str(tmp_path), ["jsonl", "srt"])
+    exporter.submit(_result("old"), write_file=False)
+    exporter.submit(_result("new"))
+    export = exporter.close()
+
+    assert export["exported_count"] == 2
+    assert export["already_exported_count"] == 1
@@ -0,0 +1,131 @@
+"""目录索引的复用与失效"""
+import os
+
+import pytest
+
+from backend.folder_scanner import FolderScanner, ScanIndex
+
+from conftest import write_speech
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ScanIndex(str(tmp_path / "index" / "scan_index.db"))
+
+
+@pytest.fixture
+def scandir_calls(monkeypatch):
+    """记录 os.scandir 扫描过的目录"""
+    calls = []
+    scandir = os.scandir
+
+    def counting(path):
+        calls.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", counting)
+    return calls
+
+
+def _touch(path, content=b"RIFF"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+def _bump_mtime(dir_path):
+    """保证目录修改时间变化（部分文件系统的时间精度较低）"""
+    mtime_ns = os.stat(dir_path).st_mtime_ns + 1_000_000_000
+    os.utime(dir_path, ns=(mtime_ns, mtime_ns))
+
+
+def _scan(index, folder):
+    scanner = FolderScanner(max_workers=2, index=index, probe_duration=False)
+    return sorted(os.path.relpath(info["path"], folder) for info in scanner.scan(str(folder)))
+
+
+def test_unchanged_directories_are_reused(tmp_path, index, scandir_calls):
+    root = tmp_path / "audio"
+    _touch(str(root / "a.wav"))
+    _touch(str(root / "sub" / "b.mp3"))
+    _touch(str(root / "sub" / "notes.txt"))
+
+    assert _scan(index, root) == ["a.wav", os.path.join("sub", "b.mp3")]
+    assert len(scandir_calls) == 2
+
+    scandir_calls.clear()
+    assert _scan(index, root) == ["a.wav", os.path.join("sub", "b.mp3")]
+    assert scandir_calls == []
+
+
+def test_changed_directory_is_rescanned(tmp_path, index, scandir_calls):
+    root = tmp_path / "audio"
+    _touch(str(root / "a.wav"))
+    _touch(str(root / "sub" / "b.wav"))
+    _scan(index, root)
+
+    _touch(str(root / "sub" / "c.wav"))
+    _bump_mtime(str(root / "sub"))
+    scandir_calls.clear()
+
+    assert _scan(index, root) == ["a.wav", os.path.join("sub", "b.wav"), os.path.join("sub", "c.wav")]
+    # 只重新扫描变化的目录
+    assert scandir_calls == [str(root / "sub")]
+
+
+def test_removed_subdirectory_is_dropped_with_descendants(tmp_path, index):
+    root = tmp_path / "audio"
+    _touch(str(root / "keep" / "a.wav"))
+    _touch(str(root / "gone" / "deep" / "b.wav"))
+    _touch(str(root / "gone2" / "c.wav"))  # 与删除的目录同前缀
+    _scan(index, root)
+    assert index.get(str(root / "gone" / "deep")) is not None
+
+    os.remove(root / "gone" / "deep" / "b.wav")
+    os.rmdir(root / "gone" / "deep")
+    os.rmdir(root / "gone")
+    _bump_mtime(str(root))
+
+    assert _scan(index, root) == [os.path.join("gone2", "c.wav"), os.path.join("keep", "a.wav")]
+    assert index.get(str(root / "gone")) is None
+    assert index.get(str(root / "gone" / "deep")) is None
+    assert index.get(str(root / "gone2")) is not None
+
+
+def test_entries_without_durations_are_rescanned(tmp_path, index, scandir_calls):
+    root = tmp_path / "audio"
+    _touch(str(root / "a.wav"))
+    mtime_ns = os.stat(root).st_mtime_ns
+    # 旧版本索引：文件记录只有 (文件名, 大小)
+    index.update([(str(root), mtime_ns, [["a.wav", 4]], [])], [])
+
+    assert _scan(index, root) == ["a.wav"]
+    assert scandir_calls == [str(root)]
+    assert len(index.get(str(root))[1][0]) == 5
+
+
+def test_file_rewritten_in_place_is_probed_again(tmp_path, index, scandir_calls):
+    root = tmp_path / "audio"
+    os.makedirs(root)
+    path = write_speech(str(root / "a.wav"), 2.0)
+    scanner = FolderScanner(max_workers=2, index=index, probe_duration=True)
+    assert [info["duration"] for info in scanner.scan(str(root))] == [2.0]
+
+    # 原地改写文件：目录修改时间不变
+    dir_stat = os.stat(root)
+    write_speech(path, 4.0)
+    file_mtime_ns = os.stat(path).st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(file_mtime_ns, file_mtime_ns))
+    os.utime(root, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+    scandir_calls.clear()
+
+    assert [(info["duration"], info["size"]) for info in scanner.scan(str(root))] == [(4.0, os.path.getsize(path))]
+    assert scandir_calls == []
+    assert index.get(str(root))[1][0][2] == 4.0
+
+
+def test_index_persists_across_instances(tmp_path):
+    db_path = str(tmp_path / "scan_index.db")
+    ScanIndex(db_path).update([("/audio", 123, [["a.wav", 4, 1.5, 16000]], ["sub"])], [])
+
+    assert ScanIndex(db_path).get("/audio") == (123, [["a.wav", 4, 1.5, 16000]], ["sub"])
@@ -0,0 +1,86 @@
+"""流式识别会话管理"""
+import threading
+
+from backend import streaming_asr
+from backend.streaming_asr import StreamingSessionManager
+
+
+def test_engine_loaded_once_per_device(monkeypatch):
+    loads = []
+    release = threading.Event()
+
+    class SlowEngine:
+        def __init__(self, device="cpu"):
+            loads.append(device)
+            release.wait(1.0)
+
+    monkeypatch.setattr(streaming_asr, "StreamingASREngine", SlowEngine)
+    manager = StreamingSessionManager()
+    engines = []
+    threads = [threading.Thread(target=lambda: engines.append(manager._get_engine("cpu"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert loads == ["cpu"]
+    assert len({id(engine) for engine in engines}) == 1
+
+
+class LookaheadEngine:
+    """
+    模拟流式模型的前瞻：每个有声音的块对应一个字（幅度 0.1 为 A，0.2 为 B），
+    该字在下一个有声音的块到来或 is_final 时才输出；VAD 在有声块开始处给出开始端点，在其后第一个静音块开始处给出结束端点
+    """
+
+    chunk_samples = 9600  # 600ms
+
+    def recognize_chunk(self, chunk, cache, is_final):
+        level = float(abs(chunk).max()) if len(chunk) else 0.0
+        text = ""
+        if level > 0.01:
+            text = cache.pop("held", "")
+            cache["held"] = "AB"[round(level * 10) - 1]
+        if is_final:
+            text += cache.pop("held", "")
+        return text
+
+    def detect_speech(self, chunk, cache, is_final):
+        position = cache.get("position", 0)
+        cache["position"] = position + len(chunk) * 1000 // 16000
+        voiced = len(chunk) > 0 and float(abs(chunk).max()) > 0.01
+        segments = []
+        if voiced and not cache.get("open"):
+            cache["open"] = True
+            segments.append([position, -1])
+        elif not voiced and cache.get("open"):
+            cache["open"] = False
+            segments.append([-1, position])
+        if is_final and cache.get("open"):
+            cache["open"] = False
+            segments.append([-1, cache["position"]])
+        return segments
+
+    def punctuate(self, text):
+        return text
+
+
+def test_sentences_split_at_vad_end_points():
+    import numpy as np
+
+    session = streaming_asr.StreamingSession(LookaheadEngine())
+    levels = [0.1, 0.1, 0.1, 0, 0, 0.2, 0.2, 0]
+    audio = np.concatenate([np.full(9600, level, dtype=np.float32) for level in levels])
+    pcm = (audio * 32767).astype("<i2").tobytes()
+
+    events = []
+    for offset in range(0, len(pcm), 4800):
+        events.extend(session.feed(pcm[offset:offset + 4800]))
+    events.extend(session.finish())
+
+    assert [(e["text"], e["start"], e["end"]) for e in events if e["type"] == "final"] == [
+        ("AAA", 0, 1800),
+        ("BB", 3000, 4200),
+    ]
+    assert session.text == "AAABB"
@@ -0,0 +1,41 @@
+"""跨文件批量识别的结果导出为字幕"""
+import re
+
+from backend.asr_engine import ASREngine
+from backend.result_exporter import ResultExporter
+
+_SRT_CUE = re.compile(r"(\d+)\n(\d\d:\d\d:\d\d,\d{3}) --> (\d\d:\d\d:\d\d,\d{3})\n(.+)\n")
+
+
+def _ms(timestamp: str) -> int:
+    hms, ms = timestamp.split(",")
+    hours, minutes, seconds = (int(part) for part in hms.split(":"))
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000 + int(ms)
+
+
+def test_batched_result_has_sentences(speech_file):
+    engine = ASREngine()
+    result, = engine.transcribe_batch([speech_file])
+
+    assert result["success"]
+    sentences = result["sentences"]
+    assert len(sentences) > 1
+    for previous, sentence in zip(sentences, sentences[1:]):
+        assert previous["end"] <= sentence["start"]
+    assert all(0 <= s["start"] < s["end"] <= 8000 for s in sentences)
+
+
+def test_batched_result_round_trips_to_srt(speech_file):
+    engine = ASREngine()
+    result, = engine.transcribe_batch([speech_file])
+    result.pop("duration", None)
+
+    srt = ResultExporter._format_subtitles(result, "srt")
+
+    assert srt is not None
+    cues = _SRT_CUE.findall(srt)
+    assert [int(cue[0]) for cue in cues] == list(range(1, len(result["sentences"]) + 1))
+    for (_, start, end, text), sentence in zip(cues, result["sentences"]):
+        assert _ms(start) == sentence["start"]
+        assert _ms(end) == sentence["end"]
+        assert text == sentence["text"]
@@ -0,0 +1,105 @@
+"""识别结果缓存"""
+import os
+import shutil
+import time
+
+from backend.transcription_cache import TranscriptionCache
+
+SIGNATURE = {"model": "paraformer-zh", "vad_model": "fsmn-vad", "device": "cpu"}
+
+
+def _write(path, content: bytes):
+    with open(path, "wb") as f:
+        f.write(content)
+    return str(path)
+
+
+def test_key_depends_on_content_and_model(tmp_path):
+    cache = TranscriptionCache(str(tmp_path / "cache"))
+    a = _write(tmp_path / "a.wav", b"RIFF" + b"\x01" * 1000)
+    copy = str(tmp_path / "copy.wav")
+    shutil.copy(a, copy)
+    other = _write(tmp_path / "other.wav", b"RIFF" + b"\x02" * 1000)
+
+    key = cache.make_key(a, SIGNATURE)
+    assert cache.make_key(copy, SIGNATURE) == key
+    assert cache.make_key(other, SIGNATURE) != key
+    assert cache.make_key(a, {**SIGNATURE, "device": "cuda"}) != key
+    # 键与字段顺序无关
+    assert cache.make_key(a, dict(reversed(list(SIGNATURE.items())))) == key
+
+
+def test_modified_file_gets_new_key(tmp_path):
+    cache = TranscriptionCache(str(tmp_path / "cache"))
+    path = _write(tmp_path / "a.wav", b"RIFF" + b"\x01" * 1000)
+    key = cache.make_key(path, SIGNATURE)
+
+    _write(path, b"RIFF" + b"\x03" * 1200)
+    assert cache.make_key(path, SIGNATURE) != key
+
+
+def test_get_put_and_stats(tmp_path):
+    cache = TranscriptionCache(str(tmp_path / "cache"))
+    result = {"success": True, "text": "今天天气很好", "sentences": [{"text": "今天天气很好", "start": 0, "end": 900}]}
+
+    assert cache.get("k") is None
+    cache.put("k", result)
+    assert cache.get("k") == result
+
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+    cache.clear()
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_evicts_least_recently_used(tmp_path):
+    # 每条约 300 字节，上限约 1000 字节
+    cache = TranscriptionCache(str(tmp_path / "cache"), max_size_mb=1000 / (1024 * 1024))
+    result = {"success": True, "text": "x" * 270}
+
+    for key in ("a", "b", "c"):
+        cache.put(key, result)
+        time.sleep(0.01)
+    # 读取 a 后 b 成为最久未使用的条目
+    assert cache.get("a") is not None
+    time.sleep(0.01)
+    cache.put("d", result)
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in ("a", "c", "d"))
+    assert cache.stats()["size_mb"] * 1024 * 1024 <= 1000
+
+
+def test_cache_persists_across_instances(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    path = _write(tmp_path / "a.wav", b"RIFF" + b"\x01" * 1000)
+    cache = TranscriptionCache(cache_dir)
+    key = cache.make_key(path, SIGNATURE)
+    cache.put(key, {"success": True, "text": "好"})
+
+    reopened = TranscriptionCache(cache_dir)
+    assert reopened.make_key(path, SIGNATURE) == key
+    assert reopened.get(key) == {"success": True, "text": "好"}
+    assert os.path.exists(os.path.join(cache_dir, "cache.db"))
+
+
+def test_running_totals_match_entries(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    cache = TranscriptionCache(cache_dir, max_size_mb=2000 / (1024 * 1024))
+    # 另一个进程的连接写入同一数据库
+    other = TranscriptionCache(cache_dir, max_size_mb=2000 / (1024 * 1024))
+
+    for k in range(10):
+        (cache if k % 2 else other).put(f"k{k}", {"success": True, "text": "x" * (50 * k)})
+    cache.put("k1", {"success": True, "text": "y" * 400})  # 覆盖已有条目
+
+    count, total = cache._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+    assert 0 < total <= 2000
+    assert cache._conn.execute("SELECT entries, size FROM totals").fetchone() == (count, total)
+    assert cache.stats()["entries"] == count
+
+    other.clear()
+    assert cache._conn.execute("SELECT entries, size FROM totals").fetchone() == (0, 0)